@@ -13,6 +13,7 @@ from typing import Any, Callable
 
 import structlog
 
+from nss.deadline import expired, timeout_for
 from nss.guardian.vigil import check_tool_call
 from nss.models import ToolResult
 
@@ -72,12 +73,17 @@ class ToolSandbox:
             tool_name: Name of the registered tool.
             args: Arguments to pass to the tool.
             user_id: Requesting user's identifier.
-            timeout: Override default timeout.
+            timeout: Override default timeout.  Capped by the remaining
+                request deadline, if any.
             
         Returns:
             ToolResult with output and metadata.
+
+        Raises:
+            DeadlineExceededError: If the request deadline is already spent.
         """
-        effective_timeout = timeout or self._default_timeout
+        requested_timeout = timeout or self._default_timeout
+        effective_timeout = timeout_for("tool", requested_timeout) or requested_timeout
         start_time = time.monotonic()
         
         # Step 1: VIGIL safety check
@@ -108,10 +114,13 @@ class ToolSandbox:
         except FuturesTimeoutError:
             elapsed = (time.monotonic() - start_time) * 1000
             logger.warning("tool_timeout", tool=tool_name, timeout=effective_timeout)
+            error = "Execution timed out."
+            if effective_timeout < requested_timeout:
+                error = str(expired("tool"))
             return ToolResult(
                 output="",
                 execution_time_ms=elapsed,
-                sandbox_metadata={"error": "Execution timed out."},
+                sandbox_metadata={"error": error},
                 vigil_verdict="ALLOW",
             )
         except Exception as exc:
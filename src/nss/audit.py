@@ -17,6 +17,8 @@ from typing import Any
 
 import structlog
 
+from nss.timing import stage
+
 logger = structlog.get_logger(__name__)
 
 _REDIS_KEY = "nss:audit:log"
@@ -72,6 +74,17 @@ class AuditLogger:
         Returns:
             The audit_id of the created entry.
         """
+        with stage("audit"):
+            return self._log_event(event, user_id, layer, component, details)
+
+    def _log_event(
+        self,
+        event: str,
+        user_id: str,
+        layer: str,
+        component: str,
+        details: dict[str, Any] | None,
+    ) -> str:
         audit_id = str(uuid.uuid4())
         timestamp_us = int(time.time() * 1_000_000)
 
@@ -0,0 +1 @@
+"""NSS benchmarks and load-testing tools."""
@@ -0,0 +1,293 @@
+"""Worst-case (ReDoS) benchmark for regexes on the request hot path.
+
+Each :class:`RegexTarget` wraps one pattern (or the function that applies
+it) together with adversarial input generators -- long digit runs, nested
+parentheses, huge whitespace, near-miss tokens.  Scan time is measured at
+geometrically growing input sizes and a least-squares fit of
+``log(time)`` against ``log(size)`` gives the growth exponent: about 1 for
+linear scanning, 2 for quadratic backtracking.  Any exponent above
+``max_slope`` fails.
+
+Usage::
+
+    python -m nss.bench.redos --out redos-3.1.1.json
+
+The JSON report (one entry per target and generator) is meant to be kept
+per release so growth trends stay visible.  ``tests/test_bench`` runs the
+same suite with smaller inputs as a regression test; being timing-based it
+is marked ``benchmark`` and only runs with ``pytest -m benchmark``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import platform
+import re
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+from pydantic import BaseModel
+
+from nss import __version__
+
+DEFAULT_SIZES = (2_000, 4_000, 8_000, 16_000, 32_000)
+DEFAULT_MAX_SLOPE = 1.4
+
+Generator = Callable[[int], str]
+
+
+class RegexTarget(BaseModel):
+    """A hot-path regex (or regex-driven function) under test.
+
+    Attributes:
+        name: Dotted identifier, e.g. ``pii.PHONE``.
+        run: Callable applying the pattern to one input.
+        generators: Adversarial input generators keyed by name; each maps a
+            target length to an input of roughly that length.
+    """
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    name: str
+    run: Callable[[str], Any]
+    generators: dict[str, Generator]
+
+
+class SlopeResult(BaseModel):
+    """Measured growth of one target on one generator."""
+
+    target: str
+    generator: str
+    sizes: list[int]
+    seconds: list[float]
+    slope: float
+    ok: bool
+
+
+def _repeat(unit: str, n: int) -> str:
+    return (unit * (n // len(unit) + 1))[:n]
+
+
+def _consume(pattern: re.Pattern[str]) -> Callable[[str], Any]:
+    return lambda text: sum(1 for _ in pattern.finditer(text))
+
+
+def default_targets() -> list[RegexTarget]:
+    """Build the targets for every hot-path regex in the tree."""
+    from nss.gateway.pii_redaction import _PII_PATTERNS, redact_pii
+    from nss.gateway.pnc_compression import _FILLER_RE, compress
+    from nss.gateway.steer import normalize_prompt
+    from nss.guardian.mars import parse_risk_response
+    from nss.guardian.rules import default_rule_engine
+    from nss.guardian.sentinel import split_windows
+    from nss.llm.ollama_client import parse_confidence_tag
+
+    pii = dict(_PII_PATTERNS)
+    digits: dict[str, Generator] = {
+        "digit_run": lambda n: "1" * n,
+        "spaced_digits": lambda n: _repeat("1 ", n),
+        "dashed_digits": lambda n: _repeat("12-", n),
+        "nested_parens": lambda n: "(" * (n // 2) + "1" * (n // 2),
+    }
+    engine = default_rule_engine()
+
+    return [
+        RegexTarget(
+            name="pii.EMAIL",
+            run=_consume(pii["EMAIL"]),
+            generators={
+                "local_part_no_at": lambda n: "a" * n,
+                "domain_no_tld": lambda n: "a@" + "a" * (n - 2),
+                "dotted_domain": lambda n: "a@" + _repeat("a.", n - 2),
+            },
+        ),
+        RegexTarget(name="pii.PHONE", run=_consume(pii["PHONE"]), generators=digits),
+        RegexTarget(
+            name="pii.IBAN",
+            run=_consume(pii["IBAN"]),
+            generators={
+                "iban_prefix_run": lambda n: _repeat("DE12 ABCD ", n),
+                "alnum_run": lambda n: "DE12" + "A" * (n - 4),
+            },
+        ),
+        RegexTarget(name="pii.CREDIT_CARD", run=_consume(pii["CREDIT_CARD"]), generators=digits),
+        RegexTarget(
+            name="pii.IPV4",
+            run=_consume(pii["IPV4"]),
+            generators={"dotted_octets": lambda n: _repeat("1.", n), **digits},
+        ),
+        RegexTarget(
+            name="pii.redact_pii",
+            run=redact_pii,
+            generators={**digits, "mixed": lambda n: _repeat("a@b 1.2.3 +43 ", n)},
+        ),
+        RegexTarget(
+            name="sentinel.rules",
+            run=engine.scan,
+            generators={
+                "ldap_metachars": lambda n: "(" * n,
+                "ldap_no_attribute": lambda n: _repeat("(|(cn", n),
+                "separators": lambda n: _repeat(";|&&", n),
+                "open_script_tag": lambda n: "<script" + " " * (n - 7),
+                "event_handler_prefix": lambda n: _repeat("on", n),
+                "sql_comment": lambda n: _repeat("; ", n),
+            },
+        ),
+        RegexTarget(
+            name="sentinel.split_windows",
+            run=split_windows,
+            generators={"whitespace": lambda n: " " * n, "words": lambda n: _repeat("a ", n)},
+        ),
+        RegexTarget(
+            name="pnc.filler",
+            run=lambda t: _FILLER_RE.sub("", t),
+            generators={
+                "fillers": lambda n: _repeat("well um ", n),
+                "near_miss": lambda n: _repeat("basicall ", n),
+                "one_word": lambda n: "a" * n,
+            },
+        ),
+        RegexTarget(
+            name="pnc.compress",
+            run=lambda t: compress(t, max_tokens=10**9),
+            generators={
+                "whitespace": lambda n: " " * n,
+                "punctuation": lambda n: _repeat(". ", n),
+                "bangs": lambda n: "!" * n,
+            },
+        ),
+        RegexTarget(
+            name="steer.normalize_prompt",
+            run=normalize_prompt,
+            generators={
+                "whitespace": lambda n: " " * n + "x",
+                "tabs": lambda n: _repeat("\t \n", n),
+            },
+        ),
+        RegexTarget(
+            name="ollama.confidence_tag",
+            run=parse_confidence_tag,
+            generators={
+                "whitespace_before_tag": lambda n: " " * n + "[CONFIDENCE:",
+                "unterminated_tag": lambda n: "[CONFIDENCE: " + "1" * (n - 13),
+                "repeated_tags": lambda n: _repeat("[CONFIDENCE: 1", n),
+            },
+        ),
+        RegexTarget(
+            name="mars.parse_risk_response",
+            run=lambda t: _swallow(parse_risk_response, t),
+            generators={
+                "long_details": lambda n: '{"score": 0.1, "details": "' + "x" * n + '"}',
+                "whitespace": lambda n: " " * n + "{}",
+            },
+        ),
+    ]
+
+
+def _swallow(fn: Callable[[str], Any], text: str) -> None:
+    try:
+        fn(text)
+    except ValueError:
+        pass
+
+
+def _time(run: Callable[[str], Any], text: str, repeats: int, min_time: float) -> float:
+    """Best-of-*repeats* seconds per call (looping fast calls to *min_time*)."""
+    best = math.inf
+    for _ in range(repeats):
+        loops = 0
+        start = time.perf_counter()
+        while True:
+            run(text)
+            loops += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = min(best, elapsed / loops)
+    return best
+
+
+def growth_slope(sizes: list[int], seconds: list[float]) -> float:
+    """Least-squares slope of ``log(seconds)`` against ``log(sizes)``."""
+    xs = [math.log(s) for s in sizes]
+    ys = [math.log(max(t, 1e-9)) for t in seconds]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    var = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys, strict=True)) / var
+
+
+def measure(
+    target: RegexTarget,
+    sizes: tuple[int, ...] = DEFAULT_SIZES,
+    max_slope: float = DEFAULT_MAX_SLOPE,
+    repeats: int = 3,
+    min_time: float = 0.002,
+) -> list[SlopeResult]:
+    """Measure *target* on each of its generators."""
+    results = []
+    for gen_name, generate in target.generators.items():
+        seconds = [_time(target.run, generate(n), repeats, min_time) for n in sizes]
+        slope = growth_slope(list(sizes), seconds)
+        results.append(
+            SlopeResult(
+                target=target.name,
+                generator=gen_name,
+                sizes=list(sizes),
+                seconds=[round(s, 9) for s in seconds],
+                slope=round(slope, 3),
+                ok=slope <= max_slope,
+            ),
+        )
+    return results
+
+
+def run_suite(
+    sizes: tuple[int, ...] = DEFAULT_SIZES,
+    max_slope: float = DEFAULT_MAX_SLOPE,
+    repeats: int = 3,
+) -> dict[str, Any]:
+    """Measure every default target; returns the JSON report."""
+    results = [
+        r for target in default_targets() for r in measure(target, sizes, max_slope, repeats)
+    ]
+    return {
+        "nss_version": __version__,
+        "python": platform.python_version(),
+        "timestamp": int(time.time()),
+        "max_slope": max_slope,
+        "passed": all(r.ok for r in results),
+        "results": [r.model_dump() for r in results],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point for ``python -m nss.bench.redos``; returns 1 on failure."""
+    parser = argparse.ArgumentParser(description="Worst-case regex growth benchmark.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--max-slope", type=float, default=DEFAULT_MAX_SLOPE)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--out", help="Write the JSON report to this file.")
+    args = parser.parse_args(argv)
+
+    report = run_suite(tuple(args.sizes), args.max_slope, args.repeats)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    for r in report["results"]:
+        if not r["ok"]:
+            print(
+                f"SUPER-LINEAR: {r['target']} [{r['generator']}] slope={r['slope']}",
+                file=sys.stderr,
+            )
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
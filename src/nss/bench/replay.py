@@ -0,0 +1,293 @@
+"""Time-scaled replay of a captured gateway trace.
+
+Reads a file written by :class:`~nss.gateway.capture.TrafficCapture` and
+re-drives it against a gateway, preserving the recorded inter-arrival
+times divided by ``speed`` (1x-10x).  Each record becomes a synthetic
+request of the same shape:
+
+* ``/v1/process`` with a message of the recorded length, privacy tier and
+  role, containing the recorded number of PII entities; records sharing a
+  cache-key prefix get identical messages, so the response-cache hit
+  ratio is reproduced;
+* ``/v1/tools/execute`` with the recorded tool and argument size.
+
+Users keep their pseudonyms, so per-user effects (privacy budget, rate
+limits) follow the captured distribution.  The report compares replayed
+latency with the latency recorded at capture time.
+
+``--mock-ollama PROFILE`` additionally serves the mock Ollama
+(:mod:`nss.bench.mock_ollama`) on ``--mock-port`` for the duration of the
+replay; point the gateway's ``NSS_OLLAMA_BASE_URL`` at it.
+
+Usage::
+
+    nss-replay capture.jsonl --speed 4 --mock-ollama gpu --markdown replay.md
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import random
+import time
+from collections import Counter as TallyCounter
+from typing import Any
+
+import httpx
+import structlog
+from pydantic import BaseModel, Field, ValidationError
+
+from nss.auth import create_token
+from nss.bench.load import latency_summary, parse_server_timing, signed_headers
+from nss.config import config
+from nss.gateway.capture import CaptureRecord
+
+logger = structlog.get_logger(__name__)
+
+# PII-free filler, so the only entities in a message are the inserted ones.
+_FILLER = (
+    "Please summarise the main points of the attached policy document.",
+    "Welche Aufbewahrungsfristen gelten für Vertragsunterlagen?",
+    "Explain how the consent withdrawal process works for our customers.",
+    "Bitte erklären Sie den Unterschied zwischen den Datenschutzstufen.",
+    "What are the reporting obligations after a security incident?",
+)
+
+
+def load_trace(path: str) -> list[CaptureRecord]:
+    """Read a capture file, skipping malformed lines, ordered by arrival."""
+    records = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            try:
+                records.append(CaptureRecord.model_validate_json(line))
+            except ValidationError:
+                logger.warning("replay_record_skipped")
+    return sorted(records, key=lambda r: r.t)
+
+
+def synthetic_message(record: CaptureRecord) -> str:
+    """A message with *record*'s length and PII entity count.
+
+    Deterministic per cache-key prefix (equal keys give equal messages).
+    """
+    rng = random.Random(record.cache_key or f"{record.t}:{record.user}")
+    pii = " ".join(f"kontakt{i}@example.com" for i in range(record.pii_entities))
+    parts = [pii] if pii else []
+    length = len(pii)
+    while length < record.message_chars:
+        sentence = rng.choice(_FILLER)
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(parts)[: max(record.message_chars, len(pii))]
+
+
+def request_for(record: CaptureRecord) -> tuple[str, dict[str, Any]]:
+    """Path and JSON body replaying *record*."""
+    user_id = f"replay-{record.user or 'anonymous'}"
+    if record.endpoint == "tool":
+        args = {"query": "q" * max(0, record.args_chars - 13)}  # 13 = len('{"query": ""}')
+        return "/v1/tools/execute", {"tool_name": record.tool, "args": args, "user_id": user_id}
+    body = {
+        "user_id": user_id,
+        "message": synthetic_message(record),
+        "privacy_tier": record.privacy_tier,
+    }
+    return "/v1/process", body
+
+
+class ReplaySettings(BaseModel):
+    """Parameters of one replay.
+
+    Attributes:
+        gateway_url: Base URL of the gateway.
+        speed: Time compression (``2`` replays an hour of traffic in 30 min).
+        limit: Replay at most this many records (``0`` = all).
+        hmac_secret: Gateway HMAC secret.
+        jwt_secret: JWT signing secret.
+        timeout_s: Per-request timeout.
+    """
+
+    gateway_url: str = f"http://127.0.0.1:{config.gateway_port}"
+    speed: float = Field(default=1.0, ge=1.0, le=10.0)
+    limit: int = Field(default=0, ge=0)
+    hmac_secret: str = config.hmac_secret
+    jwt_secret: str = config.jwt_secret
+    timeout_s: float = 30.0
+
+
+class Replayer:
+    """Re-drives a captured trace.
+
+    Parameters:
+        settings: Replay parameters.
+        transport: Optional httpx transport for in-process runs.
+    """
+
+    def __init__(
+        self,
+        settings: ReplaySettings,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self._settings = settings
+        self._transport = transport
+        self._tokens: dict[str, str] = {}
+        self._results: list[tuple[CaptureRecord, str, float, dict[str, float]]] = []
+
+    def _token(self, role: str) -> str:
+        if role not in self._tokens:
+            self._tokens[role] = create_token(
+                "nss-replay", role, self._settings.jwt_secret, expiry_minutes=24 * 60,
+            )
+        return self._tokens[role]
+
+    async def _send(
+        self, client: httpx.AsyncClient, record: CaptureRecord, scheduled: float,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        path, body = request_for(record)
+        payload = json.dumps(body)
+        headers = signed_headers(
+            path, payload, self._token(record.role or "viewer"), self._settings.hmac_secret,
+        )
+        status, stages = "error", {}
+        try:
+            resp = await client.post(
+                f"{self._settings.gateway_url}{path}", content=payload, headers=headers,
+            )
+            status = str(resp.status_code)
+            stages = parse_server_timing(resp.headers.get("server-timing", ""))
+        except httpx.HTTPError as exc:
+            status = f"error:{type(exc).__name__}"
+        self._results.append((record, status, (loop.time() - scheduled) * 1000, stages))
+
+    async def run(self, records: list[CaptureRecord]) -> dict[str, Any]:
+        """Replay *records* (ordered by ``t``) and return the report."""
+        if self._settings.limit:
+            records = records[: self._settings.limit]
+        loop = asyncio.get_running_loop()
+        async with httpx.AsyncClient(
+            transport=self._transport, timeout=self._settings.timeout_s,
+        ) as client:
+            tasks = []
+            start = loop.time()
+            started = time.perf_counter()
+            origin = records[0].t if records else 0.0
+            for record in records:
+                scheduled = start + (record.t - origin) / self._settings.speed
+                delay = scheduled - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.create_task(self._send(client, record, scheduled)))
+            await asyncio.gather(*tasks)
+            elapsed = time.perf_counter() - started
+        span = records[-1].t - origin if records else 0.0
+        return self._report(span, elapsed)
+
+    def _report(self, span_s: float, elapsed_s: float) -> dict[str, Any]:
+        def summarise(rows: list[tuple[CaptureRecord, str, float, dict[str, float]]]) -> Any:
+            return {
+                "requests": len(rows),
+                "status_codes": dict(sorted(TallyCounter(r[1] for r in rows).items())),
+                "captured_status_codes": dict(
+                    sorted(TallyCounter(str(r[0].status) for r in rows).items()),
+                ),
+                "latency_ms": latency_summary([r[2] for r in rows]),
+                "captured_latency_ms": latency_summary([r[0].duration_ms for r in rows]),
+            }
+
+        stage_values: dict[str, list[float]] = {}
+        for _, _, _, stages in self._results:
+            for name, ms in stages.items():
+                stage_values.setdefault(name, []).append(ms)
+        endpoints = sorted({r[0].endpoint for r in self._results})
+        return {
+            "settings": self._settings.model_dump(exclude={"hmac_secret", "jwt_secret"}),
+            "trace_span_s": round(span_s, 3),
+            "elapsed_s": round(elapsed_s, 3),
+            "offered_rps": round(len(self._results) / max(elapsed_s, 1e-9), 3),
+            "overall": summarise(self._results),
+            "endpoints": {
+                name: summarise([r for r in self._results if r[0].endpoint == name])
+                for name in endpoints
+            },
+            "server_stages_ms": {
+                name: latency_summary(values) for name, values in stage_values.items()
+            },
+        }
+
+
+def render_markdown(report: dict[str, Any]) -> str:
+    """Render a replay report as Markdown."""
+    lines = [
+        "# nss-replay report",
+        "",
+        f"- Speed: {report['settings']['speed']}x "
+        f"({report['trace_span_s']} s of traffic in {report['elapsed_s']} s, "
+        f"{report['offered_rps']} rps)",
+        "",
+        "| Endpoint | Requests | p50 | p95 | p99 | captured p50 | captured p95 "
+        "| captured p99 | Status codes |",
+        "|---|---:|---:|---:|---:|---:|---:|---:|---|",
+    ]
+    rows = [*report["endpoints"].items(), ("**all**", report["overall"])]
+    for name, row in rows:
+        now, then = row["latency_ms"], row["captured_latency_ms"]
+        codes = ", ".join(f"{code}: {n}" for code, n in row["status_codes"].items())
+        lines.append(
+            f"| {name} | {row['requests']} | {now['p50']} | {now['p95']} | {now['p99']} | "
+            f"{then['p50']} | {then['p95']} | {then['p99']} | {codes} |",
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Entry point for ``nss-replay``."""
+    defaults = ReplaySettings()
+    parser = argparse.ArgumentParser(
+        prog="nss-replay", description="Replay a captured gateway trace.",
+    )
+    parser.add_argument("trace", help="Capture file (NSS_TRAFFIC_CAPTURE_PATH).")
+    parser.add_argument("--gateway-url", default=defaults.gateway_url)
+    parser.add_argument("--speed", type=float, default=1.0, help="1 to 10.")
+    parser.add_argument("--limit", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=defaults.timeout_s)
+    parser.add_argument("--mock-ollama", metavar="PROFILE", help="Serve the mock Ollama.")
+    parser.add_argument("--mock-port", type=int, default=11434)
+    parser.add_argument("--json", help="Write the JSON report to this file.")
+    parser.add_argument("--markdown", help="Write the Markdown report to this file.")
+    args = parser.parse_args(argv)
+
+    if not 1 <= args.speed <= 10:
+        parser.error("--speed must be between 1 and 10.")
+    settings = ReplaySettings(
+        gateway_url=args.gateway_url,
+        speed=args.speed,
+        limit=args.limit,
+        timeout_s=args.timeout,
+    )
+    records = load_trace(args.trace)
+    with contextlib.ExitStack() as stack:
+        if args.mock_ollama:
+            from nss.bench.mock_ollama import MockProfile, serve_in_thread
+
+            stack.enter_context(
+                serve_in_thread(MockProfile.preset(args.mock_ollama), port=args.mock_port),
+            )
+        report = asyncio.run(Replayer(settings).run(records))
+    markdown = render_markdown(report)
+    if args.json:
+        with open(args.json, "w") as fh:
+            fh.write(json.dumps(report, indent=2) + "\n")
+    if args.markdown:
+        with open(args.markdown, "w") as fh:
+            fh.write(markdown)
+    print(markdown)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark for the SENTINEL rule engine.
+
+Generates a synthetic signature pack with thousands of rules and large
+inputs, then compares the literal-prefiltered :class:`RuleEngine` against
+running every regex over the whole input.  Timings at several input
+sizes show whether the scan stays linear.
+
+Usage::
+
+    python -m nss.bench.rules --rules 2000 --input-kb 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import string
+import time
+from typing import Any
+
+from nss.guardian.rules import RuleEngine, SignatureRule
+
+_WORDS = (
+    "the request user model data please explain how what is weather report "
+    "summary table value order service account system policy privacy query"
+).split()
+
+
+def synthetic_rules(count: int, seed: int = 0) -> list[SignatureRule]:
+    """Return *count* rules, each keyed on a unique random literal."""
+    rng = random.Random(seed)
+    rules = []
+    for i in range(count):
+        literal = "".join(rng.choices(string.ascii_lowercase, k=6)) + f"{i:x}"
+        rules.append(
+            SignatureRule(
+                id=f"bench.{i}",
+                category="benchmark",
+                literals=[literal],
+                pattern=rf"(?i){literal}\s*[=:(]\s*\w+",
+                after=64,
+            ),
+        )
+    return rules
+
+
+def synthetic_input(
+    size: int,
+    rules: list[SignatureRule],
+    hits: int = 5,
+    seed: int = 0,
+) -> str:
+    """Return roughly *size* characters of prose containing *hits* rule matches."""
+    rng = random.Random(seed)
+    words: list[str] = []
+    length = 0
+    while length < size:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    for rule in rng.sample(rules, min(hits, len(rules))):
+        words.insert(rng.randrange(len(words)), f"{rule.literals[0]}=payload")
+    return " ".join(words)[: size + 64 * hits]
+
+
+def _best_of(repeats: int, fn: Any) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run_benchmark(
+    rule_count: int = 2000,
+    input_kb: int = 100,
+    repeats: int = 3,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Time the rule engine against sequential regex scanning.
+
+    Returns:
+        A JSON-serialisable report with per-size timings in milliseconds.
+    """
+    rules = synthetic_rules(rule_count, seed)
+    engines = {
+        "engine_native": RuleEngine(rules, native=True),
+        "engine_python": RuleEngine(rules, native=False),
+    }
+    patterns = [re.compile(r.pattern) for r in rules]
+
+    sizes = sorted({max(1, input_kb // 4), max(1, input_kb // 2), input_kb})
+    results: list[dict[str, Any]] = []
+    for kb in sizes:
+        text = synthetic_input(kb * 1024, rules, seed=seed)
+        row: dict[str, Any] = {"input_kb": kb}
+        for name, engine in engines.items():
+            row[f"{name}_ms"] = round(
+                _best_of(repeats, lambda e=engine, t=text: e.scan(t)), 3,
+            )
+        row["sequential_regex_ms"] = round(
+            _best_of(repeats, lambda t=text: [p.search(t) for p in patterns]), 3,
+        )
+        row["matches"] = len(engines["engine_python"].scan(text))
+        results.append(row)
+
+    return {"rules": rule_count, "repeats": repeats, "results": results}
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Entry point for ``python -m nss.bench.rules``."""
+    parser = argparse.ArgumentParser(description="Benchmark the SENTINEL rule engine.")
+    parser.add_argument("--rules", type=int, default=2000, help="Number of synthetic rules.")
+    parser.add_argument("--input-kb", type=int, default=100, help="Largest input size in KB.")
+    parser.add_argument("--repeats", type=int, default=3, help="Timing repetitions (best of).")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    report = run_benchmark(args.rules, args.input_kb, args.repeats, args.seed)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
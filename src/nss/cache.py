@@ -1,7 +1,8 @@
 """Redis-based caching layer with graceful degradation.
 
 If Redis is unavailable, the cache silently degrades to a no-op,
-ensuring the system operates without interruption.
+ensuring the system operates without interruption.  Reads and writes are
+bounded by the request deadline; one that runs out counts as a miss.
 """
 
 from __future__ import annotations
@@ -12,6 +13,9 @@ from typing import Any
 
 import structlog
 
+from nss.deadline import bounded
+from nss.timing import stage
+
 logger = structlog.get_logger(__name__)
 
 
@@ -56,7 +60,8 @@ class CacheLayer:
             return None
         try:
             key = self._make_key(layer, identifier)
-            value = await self._client.get(key)
+            with stage("cache"):
+                value = await bounded(self._client.get(key), "redis")
             if value:
                 return json.loads(value)
             return None
@@ -76,7 +81,8 @@ class CacheLayer:
             return
         try:
             key = self._make_key(layer, identifier)
-            await self._client.setex(key, ttl_seconds, json.dumps(value))
+            with stage("cache"):
+                await bounded(self._client.setex(key, ttl_seconds, json.dumps(value)), "redis")
         except Exception:
             logger.warning("cache_set_failed", layer=layer)
 
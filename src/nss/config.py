@@ -29,6 +29,46 @@ class NSSConfig(BaseSettings):
     ollama_base_url: str = "http://localhost:11434"
     ollama_small_model: str = "mistral:7b-instruct-v0.3"
     ollama_large_model: str = "mistral-nemo:12b"
+    ollama_base_urls: str = ""  # comma-separated backend pool; overrides ollama_base_url
+    ollama_health_interval_s: float = 10.0  # /api/tags + /api/ps probe interval per backend
+    ollama_eject_after: int = 3  # consecutive failures before a backend is ejected
+    ollama_sticky_slack: int = 2  # extra in-flight calls tolerated for prefix stickiness
+
+    # -- LLM scheduler (per-model slots, priority lanes, fair queuing) ---
+    llm_scheduler_enabled: bool = True
+    llm_max_concurrency: int = 4  # in-flight calls per model and backend; OLLAMA_NUM_PARALLEL
+    llm_model_concurrency: str = ""  # per-backend overrides, e.g. "mistral-nemo:12b=2"
+    llm_queue_timeout_s: float = 10.0  # longer waits are answered with 503
+    llm_role_lanes: str = ""  # generation lane per role, e.g. "admin=interactive"
+    llm_tier_lanes: str = ""  # generation lane per privacy tier, e.g. "0=batch"
+    llm_role_weights: str = ""  # fair-queuing weight per role, e.g. "admin=2"
+
+    # -- LLM timeouts and circuit breaker --------------------------------
+    llm_generation_timeout_s: float = 120.0
+    llm_classifier_timeout_s: float = 10.0  # MARS / SENTINEL calls
+    llm_breaker_enabled: bool = True  # open -> degraded mode (rules-only guardian)
+    llm_breaker_failure_threshold: int = 5  # consecutive failed calls
+    llm_breaker_reset_s: float = 30.0  # open time before a trial call
+
+    # -- Request deadlines (X-Request-Timeout / X-Request-Deadline) -------
+    deadline_default_s: float = 30.0  # endpoints without their own default
+    deadline_endpoints: str = "/v1/process=150"  # "path=seconds,..." (0 = no deadline)
+    deadline_max_s: float = 300.0  # cap on client-supplied timeouts
+
+    # -- Adaptive concurrency limit / load shedding (/v1/process) ---------
+    admission_enabled: bool = True
+    admission_initial_limit: int = 20
+    admission_min_limit: int = 4
+    admission_max_limit: int = 200
+    admission_latency_tolerance: float = 2.0  # latency growth over baseline before shrinking
+    admission_lane_shares: str = "batch=0.5,generation=0.9"  # share of the limit per lane
+
+    # -- Async jobs (/v1/process/async, GET /v1/jobs/{id}) ----------------
+    async_job_workers: int = 4  # background generation workers
+    async_job_max_pending: int = 1000  # queued jobs beyond this are answered with 503
+    async_job_ttl_s: int = 300  # job status/result retention (as the response cache)
+    async_job_timeout_s: float = 600.0  # deadline of one job's generation
+    async_webhook_allowed_hosts: str = ""  # comma-separated; empty disables webhooks
 
     # -- Qdrant ----------------------------------------------------------
     qdrant_host: str = "localhost"
@@ -48,8 +88,56 @@ class NSSConfig(BaseSettings):
     # -- Guardian thresholds ---------------------------------------------
     apex_confidence_threshold: float = 0.85
     sentinel_consensus_threshold: int = 2
+    sentinel_short_circuit: bool = True  # skip votes that cannot change the verdict
+    sentinel_rule_packs: str = ""  # extra signature packs (comma-separated files/dirs)
+    sentinel_window_words: int = 128  # longer inputs are analysed in overlapping windows
+    sentinel_window_overlap: int = 32
+    sentinel_llm_parallelism: int = 4  # concurrent LLM window classifications
+    guardian_fused_analysis: bool = False  # one LLM call for SENTINEL + MARS
     vigil_rate_limit: int = 100
 
+    # -- Guardian decision cache (seconds; 0 disables) -------------------
+    guardian_cache_sentinel_ttl: int = 300
+    guardian_cache_mars_ttl: int = 300
+
+    # -- Blocked-prompt Bloom filter (shared via Redis) ------------------
+    blocklist_enabled: bool = True
+    blocklist_size_bits: int = 1 << 23  # 1 MiB, fixed regardless of corpus size
+    blocklist_hash_count: int = 7
+    blocklist_sync_interval_s: float = 5.0
+    blocklist_rotation_s: float = 3600.0  # entries live 1-2 rotations
+    blocklist_max_fill: float = 0.25  # stop adding past this fraction of set bits
+
+    # -- MARS micro-batching ---------------------------------------------
+    mars_batch_enabled: bool = False
+    mars_batch_window_ms: float = 10.0
+    mars_batch_max_size: int = 8
+
+    # -- MARS local fast path --------------------------------------------
+    mars_local_model_path: str = ""  # trained LocalRiskModel JSON; empty = disabled
+    mars_local_capture: bool = False  # store embeddings of LLM verdicts for training
+    mars_local_capture_ttl_s: int = 30 * 86400  # captured samples expire after this
+
+    # -- Metrics ---------------------------------------------------------
+    metrics_latency_buckets_ms: str = ""  # comma-separated bucket bounds; empty = defaults
+    metrics_publish_interval_s: float = 5.0  # publish to Redis for the metrics server; 0 = off
+    metrics_stale_after_s: float = 30.0  # drop published entries not refreshed for this long
+    server_timing_enabled: bool = True  # per-request stage timeline + Server-Timing header
+    # keep slow request timelines for /v1/admin/flight-recorder
+    flight_recorder_enabled: bool = True
+    flight_recorder_slowest_n: int = 20
+    flight_recorder_threshold_ms: float = 1000.0  # every request above this is kept
+    flight_recorder_window_s: float = 300.0
+    flight_recorder_capacity: int = 200  # max above-threshold records (ring buffer)
+    loop_monitor_interval_s: float = 0.1  # event-loop lag sampling; 0 = off
+    loop_monitor_stall_ms: float = 100.0
+    loop_monitor_debug: bool = False  # log the stack of callbacks blocking the loop
+
+    # -- Traffic capture (replay with nss-replay) ------------------------
+    traffic_capture_path: str = ""  # append redacted request shapes (JSON Lines); empty = off
+    traffic_capture_sample_rate: float = 1.0
+    traffic_capture_max_mb: float = 100.0  # capture stops at this file size
+
     # -- Logging ---------------------------------------------------------
     log_level: str = "INFO"
 
@@ -0,0 +1,175 @@
+"""Per-request deadline propagated through contextvars.
+
+:class:`~nss.middleware.DeadlineMiddleware` derives a deadline for every
+request from the ``X-Request-Timeout`` (seconds) or ``X-Request-Deadline``
+(unix epoch seconds) header, falling back to a per-endpoint default, and
+installs it with :func:`start_deadline`.  Every awaited stage -- Ollama,
+the LLM scheduler queue, Redis, Qdrant, the tool sandbox -- asks
+:func:`timeout_for` for its timeout, so a stage never waits longer than
+the request has left.  A stage that runs out of budget raises
+:class:`DeadlineExceededError` and counts towards
+``nss_deadline_exceeded{stage=...}``.
+
+Outside a request (tests, CLI, background workers) there is no deadline
+and stages keep their own timeouts.
+
+The deadline also records whether the client chose it and how long the
+request waited for LLM scheduler slots, so :func:`overload_miss` can tell a
+deadline missed because the gateway is overloaded from one a client set
+too tight.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from collections.abc import Awaitable
+from contextvars import ContextVar, Token
+from typing import TypeVar
+
+from nss.metrics import nss_deadline_exceeded
+
+T = TypeVar("T")
+
+
+class DeadlineExceededError(Exception):
+    """The request deadline ran out during *stage*."""
+
+    def __init__(self, stage: str) -> None:
+        super().__init__(f"Request deadline exceeded during {stage}")
+        self.stage = stage
+
+
+class _Deadline:
+    """Deadline of one request (mutable: stages add their queue waits)."""
+
+    __slots__ = ("at", "budget_s", "client", "queued_s")
+
+    def __init__(self, budget_s: float, client: bool) -> None:
+        self.at = time.monotonic() + budget_s  # on the ``time.monotonic`` clock
+        self.budget_s = budget_s
+        self.client = client
+        self.queued_s = 0.0
+
+
+_deadline: ContextVar[_Deadline | None] = ContextVar("nss_deadline", default=None)
+
+
+def start_deadline(timeout_s: float, client: bool = False) -> Token[_Deadline | None]:
+    """Give the current context *timeout_s* seconds from now.
+
+    Args:
+        timeout_s: Budget in seconds.
+        client: The budget was chosen by the client (``X-Request-Timeout``
+            or ``X-Request-Deadline``) rather than the server default.
+
+    Returns:
+        The token to pass to :func:`end_deadline`.
+    """
+    return _deadline.set(_Deadline(max(0.0, timeout_s), client))
+
+
+def end_deadline(token: Token[_Deadline | None]) -> None:
+    """Restore the context from before :func:`start_deadline`."""
+    _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left before the current deadline (``None`` without one)."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline.at - time.monotonic())
+
+
+def record_queue_wait(seconds: float) -> None:
+    """Add *seconds* spent waiting for an LLM scheduler slot to the request."""
+    deadline = _deadline.get()
+    if deadline is not None:
+        deadline.queued_s += seconds
+
+
+def overload_miss() -> bool:
+    """Whether a deadline miss of the current request signals overload.
+
+    That is the case when the server chose the deadline, or when the
+    request spent most of its budget queued for LLM slots; a miss of a
+    client-shortened deadline says nothing about load.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return False
+    return not deadline.client or deadline.queued_s > deadline.budget_s / 2
+
+
+def parse_endpoint_timeouts(spec: str) -> dict[str, float]:
+    """Parse ``"/path=seconds,/other=seconds"`` into a mapping.
+
+    Raises:
+        ValueError: If an entry has no ``=`` or a non-numeric value.
+    """
+    timeouts: dict[str, float] = {}
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        path, sep, seconds = entry.partition("=")
+        if not sep:
+            raise ValueError(f"Expected 'path=seconds', got {entry!r}")
+        timeouts[path.strip()] = float(seconds)
+    return timeouts
+
+
+def expired(stage: str) -> DeadlineExceededError:
+    """Count a deadline miss in *stage* and return the error to raise."""
+    nss_deadline_exceeded.labels(stage=stage).inc()
+    return DeadlineExceededError(stage)
+
+
+def timeout_for(stage: str, default: float | None = None) -> float | None:
+    """Timeout for an awaited call in *stage*.
+
+    Args:
+        stage: Stage name used in the ``nss_deadline_exceeded`` metric.
+        default: The stage's own timeout (``None`` = unbounded).
+
+    Returns:
+        The smaller of *default* and the remaining budget; *default* when
+        no deadline is set.
+
+    Raises:
+        DeadlineExceededError: If the budget is already spent.
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise expired(stage)
+    return left if default is None else min(default, left)
+
+
+async def bounded(aw: Awaitable[T], stage: str, default: float | None = None) -> T:
+    """Await *aw* within the remaining budget.
+
+    Args:
+        aw: Awaitable to run (a coroutine is closed if never started).
+        stage: Stage name used in the ``nss_deadline_exceeded`` metric.
+        default: The stage's own timeout, which *aw* enforces itself; the
+            budget is only imposed when it is the tighter of the two.
+
+    Raises:
+        DeadlineExceededError: If the budget runs out first.
+    """
+    try:
+        timeout = timeout_for(stage, default)
+    except DeadlineExceededError:
+        if inspect.iscoroutine(aw):
+            aw.close()
+        raise
+    if timeout is None or timeout == default:
+        return await aw
+    try:
+        return await asyncio.wait_for(aw, timeout=timeout)
+    except TimeoutError:
+        raise expired(stage) from None
@@ -0,0 +1,133 @@
+"""Slow-request flight recorder.
+
+Keeps, in fixed memory, the stage timelines of the slowest requests and of
+every request above a latency threshold within a sliding window, so p99
+spikes can be diagnosed after the fact without verbose logging.
+
+Records carry only timing and routing metadata (stage offsets, the
+annotations set via :func:`nss.timing.annotate` such as the model chosen,
+cache hits and queue depths) -- never request or response text.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from nss.timing import Timeline
+
+
+class FlightRecord(BaseModel):
+    """Timing breakdown of one finished request.
+
+    Attributes:
+        trace_id: The request's ``X-Trace-ID``.
+        method: HTTP method.
+        path: Request path.
+        status: Response status code.
+        timestamp: Completion time (epoch seconds).
+        duration_ms: End-to-end latency.
+        stages: Stage start/end offsets from :meth:`Timeline.as_list`.
+        annotations: Diagnostic fields from :func:`nss.timing.annotate`.
+    """
+
+    trace_id: str = ""
+    method: str
+    path: str
+    status: int
+    timestamp: float
+    duration_ms: float
+    stages: list[dict[str, Any]] = Field(default_factory=list)
+    annotations: dict[str, Any] = Field(default_factory=dict)
+
+
+class FlightRecorder:
+    """Bounded in-memory buffer of slow request timelines.
+
+    Parameters:
+        slowest_n: Number of slowest requests kept per window.
+        threshold_ms: Every request at or above this latency is kept.
+        window_s: Records older than this are discarded.
+        capacity: Maximum number of above-threshold records (ring buffer;
+            the oldest are overwritten).
+    """
+
+    def __init__(
+        self,
+        slowest_n: int = 20,
+        threshold_ms: float = 1000.0,
+        window_s: float = 300.0,
+        capacity: int = 200,
+    ) -> None:
+        self._slowest_n = slowest_n
+        self._threshold_ms = threshold_ms
+        self._window_s = window_s
+        self._over_threshold: deque[FlightRecord] = deque(maxlen=capacity)
+        # Min-heap of (duration_ms, seq, record): the root is the fastest kept.
+        self._slowest: list[tuple[float, int, FlightRecord]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def observe(
+        self,
+        timeline: Timeline,
+        method: str,
+        path: str,
+        status: int,
+        trace_id: str = "",
+    ) -> None:
+        """Consider a finished request for recording."""
+        duration_ms = (time.perf_counter() - timeline.origin) * 1000
+        with self._lock:
+            self._expire(time.time())
+            keep_slow = len(self._slowest) < self._slowest_n or (
+                self._slowest and duration_ms > self._slowest[0][0]
+            )
+            over = duration_ms >= self._threshold_ms
+            if not (keep_slow or over):
+                return
+        record = FlightRecord(
+            trace_id=trace_id,
+            method=method,
+            path=path,
+            status=status,
+            timestamp=time.time(),
+            duration_ms=round(duration_ms, 3),
+            stages=timeline.as_list(),
+            annotations=dict(timeline.annotations),
+        )
+        with self._lock:
+            if over:
+                self._over_threshold.append(record)
+            entry = (duration_ms, next(self._seq), record)
+            if len(self._slowest) < self._slowest_n:
+                heapq.heappush(self._slowest, entry)
+            elif self._slowest_n and duration_ms > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self._window_s
+        while self._over_threshold and self._over_threshold[0].timestamp < cutoff:
+            self._over_threshold.popleft()
+        if self._slowest and min(r.timestamp for _, _, r in self._slowest) < cutoff:
+            self._slowest = [e for e in self._slowest if e[2].timestamp >= cutoff]
+            heapq.heapify(self._slowest)
+
+    def dump(self) -> dict[str, Any]:
+        """Return the buffer contents as a JSON-serialisable dict."""
+        with self._lock:
+            self._expire(time.time())
+            slowest = sorted(self._slowest, key=lambda e: e[0], reverse=True)
+            over = list(self._over_threshold)
+        return {
+            "window_s": self._window_s,
+            "threshold_ms": self._threshold_ms,
+            "slowest": [r.model_dump() for _, _, r in slowest],
+            "over_threshold": [r.model_dump() for r in over],
+        }
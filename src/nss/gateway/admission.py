@@ -0,0 +1,183 @@
+"""Adaptive concurrency limit and load shedding for ``/v1/process``.
+
+Past a certain number of requests in flight the gateway's latency rises
+steeply and every request ends up timing out.  :class:`AdaptiveLimiter`
+finds that point from observed latency, using a gradient on the ratio of
+long-term to short-term latency:
+
+* each successful request reports its latency; a short and a long
+  exponential moving average are kept;
+* ``gradient = clamp(tolerance * long / short, 0.5, 1)``, so the limit
+  holds or grows (by ``sqrt(limit)`` headroom) while latency stays within
+  *tolerance* times its baseline and shrinks once it rises further;
+* a request that ends overloaded (LLM queue timeout) or past a deadline
+  the server chose (or after queueing for most of a client-chosen one)
+  cuts the limit multiplicatively -- a client cannot shrink the limit by
+  sending ``X-Request-Timeout: 0.1``;
+* the limit only grows while at least half of it is in use, so an idle
+  gateway does not drift to the maximum.
+
+Admission is by lane (see :func:`nss.llm.scheduler.lane_for`): each lane
+may fill a share of the limit (``batch=0.5,generation=0.9`` by default,
+``interactive`` the whole limit), so low-priority requests are shed first
+with an immediate ``503`` and ``Retry-After``.  Requests that are never
+limited -- health, metrics, admin and audit endpoints -- do not pass
+through the limiter at all.
+
+State is per process; no lock is needed on the event loop.
+"""
+
+from __future__ import annotations
+
+import math
+
+import structlog
+
+from nss.config import NSSConfig
+from nss.llm.scheduler import parse_mapping
+from nss.metrics import nss_admission_inflight, nss_admission_limit, nss_admission_rejected
+
+logger = structlog.get_logger(__name__)
+
+# Cut applied to the limit when a request ends overloaded.
+_DROP_FACTOR = 0.9
+# Once the baseline is this many times the recent latency, let it decay
+# so the limit recovers quickly after a latency drop.
+_BASELINE_DECAY_RATIO = 2.0
+_BASELINE_DECAY = 0.95
+
+
+class AdaptiveLimiter:
+    """Gradient concurrency limit with per-lane load shedding.
+
+    Parameters:
+        initial_limit: Starting concurrency limit.
+        min_limit: Floor of the limit.
+        max_limit: Ceiling of the limit.
+        tolerance: Latency growth over the long-term baseline tolerated
+            before the limit shrinks (``2.0`` = twice the baseline).
+        smoothing: Weight of each new limit estimate (0-1).
+        short_window: Samples in the short-term latency average.
+        long_window: Samples in the long-term latency baseline.
+        lane_shares: Fraction of the limit each lane may fill; lanes not
+            listed may fill all of it.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 4,
+        max_limit: int = 200,
+        tolerance: float = 2.0,
+        smoothing: float = 0.2,
+        short_window: int = 10,
+        long_window: int = 600,
+        lane_shares: dict[str, float] | None = None,
+    ) -> None:
+        self._min = max(1, min_limit)
+        self._max = max(self._min, max_limit)
+        self._limit = float(min(max(initial_limit, self._min), self._max))
+        self._tolerance = tolerance
+        self._smoothing = smoothing
+        self._short_alpha = 2.0 / (short_window + 1)
+        self._long_alpha = 2.0 / (long_window + 1)
+        self._shares = lane_shares or {}
+        self._short_ms: float | None = None
+        self._long_ms: float | None = None
+        self.inflight = 0
+        self.rejected = 0
+        nss_admission_limit.set(self.limit)
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit."""
+        return int(self._limit)
+
+    def threshold(self, lane: str) -> float:
+        """In-flight count at which requests in *lane* are shed."""
+        return self._limit * self._shares.get(lane, 1.0)
+
+    def try_acquire(self, lane: str = "generation") -> bool:
+        """Admit a request in *lane* or shed it.
+
+        Returns:
+            ``True`` if admitted; the caller must then call :meth:`release`.
+        """
+        if self.inflight >= self.threshold(lane):
+            self.rejected += 1
+            nss_admission_rejected.labels(lane=lane).inc()
+            return False
+        self.inflight += 1
+        nss_admission_inflight.set(self.inflight)
+        return True
+
+    def release(self, latency_ms: float | None = None, dropped: bool = False) -> None:
+        """Finish an admitted request.
+
+        Args:
+            latency_ms: Latency of a successful request (``None`` for
+                requests whose latency says nothing about load, such as
+                policy denials).
+            dropped: The request failed because the gateway was overloaded
+                (LLM queue timeout, deadline exceeded per
+                :func:`~nss.deadline.overload_miss`).
+        """
+        inflight = self.inflight
+        self.inflight = max(0, inflight - 1)
+        nss_admission_inflight.set(self.inflight)
+        if dropped:
+            self._set_limit(self._limit * _DROP_FACTOR)
+        elif latency_ms is not None:
+            self._on_sample(max(latency_ms, 1e-3), inflight)
+
+    def _on_sample(self, latency_ms: float, inflight: int) -> None:
+        if self._short_ms is None or self._long_ms is None:
+            self._short_ms = self._long_ms = latency_ms
+            return
+        self._short_ms += self._short_alpha * (latency_ms - self._short_ms)
+        self._long_ms += self._long_alpha * (latency_ms - self._long_ms)
+        if self._long_ms > _BASELINE_DECAY_RATIO * self._short_ms:
+            self._long_ms *= _BASELINE_DECAY
+        if inflight < self._limit / 2:
+            return  # not limited by us; the sample says nothing about the limit
+        gradient = max(0.5, min(1.0, self._tolerance * self._long_ms / self._short_ms))
+        estimate = self._limit * gradient + math.sqrt(self._limit)
+        self._set_limit(self._limit * (1 - self._smoothing) + estimate * self._smoothing)
+
+    def _set_limit(self, limit: float) -> None:
+        previous = self.limit
+        self._limit = min(max(limit, float(self._min)), float(self._max))
+        if self.limit != previous:
+            nss_admission_limit.set(self.limit)
+            logger.debug("admission_limit_changed", limit=self.limit, previous=previous)
+
+    def retry_after(self) -> int:
+        """Suggested ``Retry-After`` seconds for a shed request."""
+        baseline_s = (self._long_ms or 0.0) / 1000
+        return max(1, math.ceil(baseline_s))
+
+    def stats(self) -> dict[str, object]:
+        """Limit, in-flight count, rejections and latency averages."""
+        return {
+            "limit": self.limit,
+            "inflight": self.inflight,
+            "rejected": self.rejected,
+            "short_latency_ms": round(self._short_ms or 0.0, 3),
+            "long_latency_ms": round(self._long_ms or 0.0, 3),
+        }
+
+
+def limiter_from_config(cfg: NSSConfig) -> AdaptiveLimiter | None:
+    """Build the limiter from the ``NSS_ADMISSION_*`` settings (``None`` if disabled)."""
+    if not cfg.admission_enabled:
+        return None
+    return AdaptiveLimiter(
+        initial_limit=cfg.admission_initial_limit,
+        min_limit=cfg.admission_min_limit,
+        max_limit=cfg.admission_max_limit,
+        tolerance=cfg.admission_latency_tolerance,
+        lane_shares={
+            lane: float(share)
+            for lane, share in parse_mapping(cfg.admission_lane_shares).items()
+        },
+    )
@@ -0,0 +1,166 @@
+"""Opt-in traffic capture of redacted request shapes.
+
+With ``NSS_TRAFFIC_CAPTURE_PATH`` set, the gateway appends one compact
+JSON line per request to that file: arrival time, endpoint, status,
+latency, role, privacy tier, message and redacted lengths, PII entity
+count, a prefix of the response-cache key, the routed model, tool name and
+argument size, and the per-stage durations.  Message text, tool arguments
+and raw user ids are never written; users are pseudonymised with a keyed
+hash so per-user distributions survive without identifying anyone.
+
+:mod:`nss.bench.replay` re-drives such a trace against a gateway.
+
+Lines are buffered and appended in batches by a writer thread, so request
+handlers on the event loop never wait for the disk; capture stops (with
+one warning) once the file reaches ``max_bytes``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import os
+import random
+import threading
+from typing import IO, Literal
+
+import structlog
+from pydantic import BaseModel, Field
+
+logger = structlog.get_logger(__name__)
+
+# The writer thread appends buffered lines when this many accumulate or
+# after _FLUSH_INTERVAL_S, whichever comes first.
+_FLUSH_LINES = 64
+_FLUSH_INTERVAL_S = 1.0
+
+
+class CaptureRecord(BaseModel):
+    """Shape of one captured request (no payload text).
+
+    Attributes:
+        t: Arrival time (epoch seconds).
+        endpoint: ``process`` (``/v1/process``) or ``tool``
+            (``/v1/tools/execute``).
+        status: HTTP status returned.
+        duration_ms: Gateway processing time.
+        user: Keyed pseudonym of the user id.
+        role: JWT role.
+        privacy_tier: Requested privacy tier.
+        message_chars: Length of the submitted message.
+        redacted_chars: Length after PII redaction.
+        pii_entities: Number of redacted PII entities.
+        cache_key: Prefix of the response-cache key; equal prefixes mean
+            equal prompts.
+        model: Model chosen by APEX.
+        tool: Tool name for tool calls.
+        args_chars: Serialised size of the tool arguments.
+        stages: Milliseconds per pipeline stage.
+    """
+
+    t: float
+    endpoint: Literal["process", "tool"]
+    status: int
+    duration_ms: float
+    user: str = ""
+    role: str = ""
+    privacy_tier: int = 0
+    message_chars: int = 0
+    redacted_chars: int = 0
+    pii_entities: int = 0
+    cache_key: str = ""
+    model: str = ""
+    tool: str = ""
+    args_chars: int = 0
+    stages: dict[str, float] = Field(default_factory=dict)
+
+
+class TrafficCapture:
+    """Append-only writer of :class:`CaptureRecord` lines.
+
+    Parameters:
+        path: Capture file (JSON Lines, appended to).
+        secret: Key for the user pseudonyms.
+        sample_rate: Fraction of requests recorded.
+        max_bytes: Capture stops once the file reaches this size.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        secret: str,
+        sample_rate: float = 1.0,
+        max_bytes: int = 100 * 1024 * 1024,
+    ) -> None:
+        self._path = path
+        self._secret = secret.encode()
+        self._sample_rate = sample_rate
+        self._max_bytes = max_bytes
+        self._buffer: list[str] = []
+        self._lock = threading.Lock()  # guards _buffer and _file
+        self._write_lock = threading.Lock()  # serialises file writes
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._file: IO[str] | None = open(path, "a", encoding="utf-8")
+        self._size = os.path.getsize(path)
+        self._writer = threading.Thread(
+            target=self._run_writer, name="nss-traffic-capture", daemon=True,
+        )
+        self._writer.start()
+        logger.info("traffic_capture_enabled", path=path, sample_rate=sample_rate)
+
+    def pseudonym(self, user_id: str) -> str:
+        """Keyed, non-reversible pseudonym for *user_id*."""
+        return hmac.new(self._secret, user_id.encode(), hashlib.sha256).hexdigest()[:16]
+
+    def sampled(self) -> bool:
+        """Whether the current request should be recorded."""
+        return self._file is not None and random.random() < self._sample_rate
+
+    def record(self, record: CaptureRecord) -> None:
+        """Queue *record* for the writer thread (never touches the file)."""
+        line = record.model_dump_json(exclude_defaults=True) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            self._buffer.append(line)
+            if len(self._buffer) >= _FLUSH_LINES:
+                self._wake.set()
+
+    def _run_writer(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(_FLUSH_INTERVAL_S)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered records to the file (blocking; not for the event loop)."""
+        with self._write_lock:
+            with self._lock:
+                file, data = self._file, "".join(self._buffer)
+                self._buffer.clear()
+            if file is None or not data:
+                return
+            size = len(data.encode())
+            if self._size + size > self._max_bytes:
+                logger.warning(
+                    "traffic_capture_full", path=self._path, max_bytes=self._max_bytes,
+                )
+                with self._lock:
+                    self._file = None
+                file.close()
+                return
+            file.write(data)
+            file.flush()
+            self._size += size
+
+    def close(self) -> None:
+        """Stop the writer thread, flush and close the capture file."""
+        self._stopped.set()
+        self._wake.set()
+        self._writer.join(timeout=5.0)
+        self.flush()
+        with self._write_lock, self._lock:
+            file, self._file = self._file, None
+        if file is not None:
+            file.close()
@@ -0,0 +1,306 @@
+"""Asynchronous processing jobs behind ``/v1/process/async``.
+
+The gateway runs the guardian checks of a request synchronously, then
+hands generation to a :class:`JobRunner` and answers ``202`` with a job
+id.  The job's :class:`~nss.models.JobStatus` is kept in Redis by
+:class:`JobStore` for ``NSS_ASYNC_JOB_TTL_S`` -- the same retention as
+the gateway's response cache -- and served at ``GET /v1/jobs/{job_id}``.
+Only the status and the response are stored; the guarded prompt stays in
+the worker's memory, so jobs pending at shutdown are lost.  Without Redis
+the store degrades to process memory (single-process deployments only).
+
+A finished job can be pushed to a webhook on an allow-listed host; the
+body is signed like inbound requests (``X-HMAC-Signature``,
+``X-HMAC-Timestamp``, ``X-HMAC-Nonce``).  Deliveries run in their own
+tasks (:class:`WebhookDispatcher`), so a slow receiver does not hold a
+job worker through its retries.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import hmac
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, Generic, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+import structlog
+
+from nss.deadline import bounded
+from nss.gateway.hmac_signing import generate_nonce, sign_request
+from nss.metrics import nss_async_job_webhook_failures, nss_async_jobs_pending
+from nss.models import JobStatus
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class JobRecord(JobStatus):
+    """Stored job state: the public status plus its owner.
+
+    Attributes:
+        owner: Keyed hash of the submitting user (see :func:`owner_key`).
+    """
+
+    owner: str = ""
+
+    def public(self) -> JobStatus:
+        """The status as returned to clients (without the owner)."""
+        return JobStatus.model_validate(self.model_dump(exclude={"owner"}))
+
+
+def owner_key(user_id: str, secret: str) -> str:
+    """Pseudonymous owner of a job, compared on every read."""
+    return hmac.new(secret.encode(), user_id.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+class JobStore:
+    """Job records in Redis with a TTL, degrading to process memory.
+
+    Parameters:
+        redis_url: Redis connection URL.
+        ttl_seconds: Lifetime of a record after its last update.
+        key_prefix: Prefix of the Redis keys.
+    """
+
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379/0",
+        ttl_seconds: int = 300,
+        key_prefix: str = "nss:jobs",
+    ) -> None:
+        self._redis_url = redis_url
+        self._ttl = ttl_seconds
+        self._prefix = key_prefix
+        self._client: Any | None = None
+        self._memory: dict[str, tuple[float, str]] = {}
+
+    async def connect(self) -> None:
+        """Connect to Redis (degrades to process memory on failure)."""
+        try:
+            import redis.asyncio as aioredis
+
+            self._client = aioredis.from_url(self._redis_url, decode_responses=True)
+            await self._client.ping()
+            logger.info("job_store_connected", url=self._redis_url)
+        except Exception:
+            self._client = None
+            logger.warning("job_store_memory_only", url=self._redis_url)
+
+    def _key(self, job_id: str) -> str:
+        return f"{self._prefix}:{job_id}"
+
+    async def put(self, record: JobRecord) -> None:
+        """Store *record*, restarting its TTL."""
+        data = record.model_dump_json()
+        if self._client is not None:
+            try:
+                key = self._key(record.job_id)
+                await bounded(self._client.setex(key, self._ttl, data), "redis")
+                return
+            except Exception:
+                logger.warning("job_store_put_failed", job_id=record.job_id)
+        self._prune()
+        self._memory[record.job_id] = (time.monotonic() + self._ttl, data)
+
+    async def get(self, job_id: str) -> JobRecord | None:
+        """The record of *job_id*, or ``None`` if unknown or expired."""
+        data: str | None = None
+        if self._client is not None:
+            try:
+                data = await bounded(self._client.get(self._key(job_id)), "redis")
+            except Exception:
+                logger.warning("job_store_get_failed", job_id=job_id)
+        if data is None:
+            entry = self._memory.get(job_id)
+            if entry is not None and entry[0] > time.monotonic():
+                data = entry[1]
+        return JobRecord.model_validate_json(data) if data else None
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for job_id in [k for k, (expires, _) in self._memory.items() if expires <= now]:
+            del self._memory[job_id]
+
+    async def close(self) -> None:
+        """Close the Redis connection."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class JobRunner(Generic[T]):
+    """Bounded queue of jobs processed by background worker tasks.
+
+    Parameters:
+        handler: Coroutine function run for every job; exceptions are
+            logged and do not stop the worker.
+        workers: Number of worker tasks.
+        max_pending: Jobs that may wait in the queue.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[T], Awaitable[None]],
+        workers: int = 4,
+        max_pending: int = 1000,
+    ) -> None:
+        self._handler = handler
+        self._workers = max(1, workers)
+        self._queue: asyncio.Queue[T] = asyncio.Queue(maxsize=max(1, max_pending))
+        self._tasks: list[asyncio.Task[None]] = []
+
+    @property
+    def pending(self) -> int:
+        """Jobs waiting for a worker."""
+        return self._queue.qsize()
+
+    def full(self) -> bool:
+        """Whether :meth:`submit` would refuse a job."""
+        return self._queue.full()
+
+    async def start(self) -> None:
+        """Start the worker tasks."""
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self._workers)]
+
+    def submit(self, job: T) -> bool:
+        """Queue *job*; ``False`` if the queue is full."""
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            return False
+        nss_async_jobs_pending.set(self._queue.qsize())
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            job = await self._queue.get()
+            nss_async_jobs_pending.set(self._queue.qsize())
+            try:
+                await self._handler(job)
+            except Exception:
+                logger.exception("async_job_handler_failed")
+            finally:
+                self._queue.task_done()
+
+    async def join(self) -> None:
+        """Wait until every queued job has been processed."""
+        await self._queue.join()
+
+    async def stop(self) -> None:
+        """Cancel the workers; jobs still queued are dropped."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+
+
+class WebhookDispatcher:
+    """Sends webhooks in background tasks, holding a reference to each.
+
+    Parameters:
+        secret: HMAC secret used to sign the bodies.
+        max_in_flight: Deliveries that may run at once; further ones are
+            dropped and counted as failures.
+        transport: Optional httpx transport (tests).
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        max_in_flight: int = 100,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self._secret = secret
+        self._max_in_flight = max(1, max_in_flight)
+        self._transport = transport
+        self._tasks: set[asyncio.Task[bool]] = set()
+
+    @property
+    def in_flight(self) -> int:
+        """Deliveries still running."""
+        return len(self._tasks)
+
+    def dispatch(self, url: str, status: JobStatus) -> bool:
+        """Start delivering *status* to *url*; ``False`` if too many are running."""
+        if len(self._tasks) >= self._max_in_flight:
+            nss_async_job_webhook_failures.inc()
+            logger.warning("async_job_webhook_dropped", job_id=status.job_id)
+            return False
+        task = asyncio.create_task(
+            send_webhook(url, status, self._secret, transport=self._transport),
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def close(self, grace_s: float = 5.0) -> None:
+        """Wait up to *grace_s* for running deliveries, then cancel the rest."""
+        if not self._tasks:
+            return
+        _done, pending = await asyncio.wait(set(self._tasks), timeout=grace_s)
+        for task in pending:
+            task.cancel()
+        for task in pending:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+
+def webhook_allowed(url: str, allowed_hosts: frozenset[str]) -> bool:
+    """Whether *url* is an http(s) URL on one of *allowed_hosts*."""
+    parts = urlsplit(url)
+    return parts.scheme in ("http", "https") and (parts.hostname or "") in allowed_hosts
+
+
+async def send_webhook(
+    url: str,
+    status: JobStatus,
+    secret: str,
+    attempts: int = 3,
+    backoff_s: float = 1.0,
+    timeout: float = 10.0,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> bool:
+    """POST the signed *status* to *url*, retrying with backoff.
+
+    Args:
+        url: Webhook URL (checked with :func:`webhook_allowed` on submit).
+        status: Finished job status.
+        secret: HMAC secret used to sign the body.
+        attempts: Delivery attempts.
+        backoff_s: Delay before the first retry, doubled for each further one.
+        timeout: Timeout per attempt in seconds.
+        transport: Optional httpx transport (tests).
+
+    Returns:
+        ``True`` once a 2xx response was received.
+    """
+    body = status.model_dump_json()
+    async with httpx.AsyncClient(timeout=timeout, transport=transport) as client:
+        for attempt in range(max(1, attempts)):
+            if attempt:
+                await asyncio.sleep(backoff_s * 2 ** (attempt - 1))
+            timestamp = str(int(time.time()))
+            nonce = generate_nonce()
+            headers = {
+                "Content-Type": "application/json",
+                "X-HMAC-Signature": sign_request(body, secret, timestamp, nonce),
+                "X-HMAC-Timestamp": timestamp,
+                "X-HMAC-Nonce": nonce,
+            }
+            try:
+                response = await client.post(url, content=body, headers=headers)
+                if response.is_success:
+                    return True
+            except httpx.HTTPError:
+                pass
+    nss_async_job_webhook_failures.inc()
+    logger.warning("async_job_webhook_failed", job_id=status.job_id)
+    return False
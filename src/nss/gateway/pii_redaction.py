@@ -7,6 +7,7 @@ Supports common European PII patterns: email addresses, phone numbers
 from __future__ import annotations
 
 import re
+from typing import Any
 
 from nss.models import RedactedEntity
 
@@ -16,7 +17,10 @@ _PII_PATTERNS: list[tuple[str, re.Pattern[str]]] = [
     (
         "EMAIL",
         re.compile(
-            r"[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}",
+            # The lookbehind only lets a match start at the beginning of a
+            # local-part run; without it every offset of a long run is
+            # re-scanned (quadratic on e.g. "aaaa...").
+            r"(?<![a-zA-Z0-9._%+\-])[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}",
         ),
     ),
     (
@@ -46,6 +50,38 @@ _PII_PATTERNS: list[tuple[str, re.Pattern[str]]] = [
 ]
 
 
+# Label used when matches of several types cover the same span (most
+# specific first; PHONE is the catch-all digit pattern).
+_LABEL_PRIORITY = {"IBAN": 0, "CREDIT_CARD": 1, "EMAIL": 2, "IPV4": 3, "PHONE": 4}
+
+
+def _replace_spans(text: str, matches: list[tuple[str, re.Match[str]]]) -> str:
+    """Replace matched spans in one pass; overlapping matches are merged."""
+    spans = sorted(
+        (m.start(), -m.end(), _LABEL_PRIORITY.get(label, len(_LABEL_PRIORITY)), label)
+        for label, m in matches
+    )
+    pieces: list[str] = []
+    cursor = 0
+    current: list[Any] | None = None  # [start, end, label] of the open span
+    for start, neg_end, _priority, label in spans:
+        end = -neg_end
+        if current is not None and start < current[1]:
+            current[1] = max(current[1], end)
+            continue
+        if current is not None:
+            pieces.append(text[cursor:current[0]])
+            pieces.append(f"[REDACTED_{current[2]}]")
+            cursor = current[1]
+        current = [start, end, label]
+    if current is not None:
+        pieces.append(text[cursor:current[0]])
+        pieces.append(f"[REDACTED_{current[2]}]")
+        cursor = current[1]
+    pieces.append(text[cursor:])
+    return "".join(pieces)
+
+
 def redact_pii(text: str) -> tuple[str, list[RedactedEntity]]:
     """Scan *text* for PII and replace matches with ``[REDACTED_<TYPE>]``.
 
@@ -66,8 +102,6 @@ def redact_pii(text: str) -> tuple[str, list[RedactedEntity]]:
 
     # Sort by start position descending so replacements don't shift offsets.
     all_matches.sort(key=lambda pair: pair[1].start(), reverse=True)
-
-    redacted = text
     for label, m in all_matches:
         entities.append(
             RedactedEntity(
@@ -77,7 +111,8 @@ def redact_pii(text: str) -> tuple[str, list[RedactedEntity]]:
                 end=m.end(),
             )
         )
-        redacted = redacted[: m.start()] + f"[REDACTED_{label}]" + redacted[m.end() :]
+
+    redacted = _replace_spans(text, all_matches)
 
     # Return entities in document order (ascending start).
     entities.reverse()
@@ -11,23 +11,43 @@ from __future__ import annotations
 
 import asyncio
 import hashlib
+import json
 import time
 import uuid
 from contextlib import asynccontextmanager
-from typing import Any, AsyncIterator
+from dataclasses import dataclass
+from typing import Annotated, Any, AsyncIterator
 
 import structlog
 import uvicorn
-from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
 from nss import __version__
 from nss.audit import AuditLogger
-from nss.auth import JWTMiddleware
+from nss.auth import JWTMiddleware, require_role
 from nss.cache import CacheLayer
 from nss.config import config
+from nss.deadline import (
+    DeadlineExceededError,
+    end_deadline,
+    overload_miss,
+    parse_endpoint_timeouts,
+    start_deadline,
+)
+from nss.flight_recorder import FlightRecorder
+from nss.gateway.admission import AdaptiveLimiter, limiter_from_config
+from nss.gateway.capture import CaptureRecord, TrafficCapture
 from nss.gateway.hmac_signing import sign_request, verify_request
+from nss.gateway.jobs import (
+    JobRecord,
+    JobRunner,
+    JobStore,
+    WebhookDispatcher,
+    owner_key,
+    webhook_allowed,
+)
 from nss.gateway.pii_redaction import redact_pii
 from nss.gateway.pnc_compression import compress
 from nss.gateway.steer import steer_transform
@@ -35,59 +55,153 @@ from nss.governance.dpia import DPIAGenerator
 from nss.governance.policy_engine import PolicyEngine
 from nss.governance.privacy_budget import PrivacyBudgetTracker
 from nss.guardian.apex import APEXRouter
-from nss.guardian.mars import MARSScorer
+from nss.guardian.blocklist import BlockedPromptFilter
+from nss.guardian.decision_cache import GuardianDecisionCache
+from nss.guardian.fused import FusedGuardianAnalyzer
+from nss.guardian.mars import MARSScorer, heuristic_risk
+from nss.guardian.mars_batch import MARSBatchScorer
+from nss.guardian.mars_local import LocalRiskModel, TieredMARSScorer, TrainingSampleStore
+from nss.guardian.rules import load_rule_engine
 from nss.guardian.sentinel import SentinelDefense
 from nss.guardian.shield import enhance_prompt
 from nss.agent.tool_isolation import ToolSandbox
+from nss.llm.backend_pool import pool_from_config
+from nss.llm.circuit_breaker import CircuitBreaker, CircuitOpenError
 from nss.llm.ollama_client import OllamaClient
+from nss.llm.scheduler import (
+    LLMContext,
+    LLMQueueTimeoutError,
+    context_for,
+    reset_llm_context,
+    scheduler_from_config,
+    set_llm_context,
+)
 from nss.metrics import (
+    configure_latency_buckets,
     metrics_snapshot,
+    nss_async_jobs,
+    nss_blocklist_hits,
+    nss_degraded_requests,
     nss_guardian_latency,
     nss_pii_entities_redacted,
     nss_privacy_budget_consumed,
+    nss_request_duration,
     nss_request_latency,
     nss_requests_blocked,
     nss_requests_total,
+    parse_buckets,
 )
+from nss.loop_monitor import LoopLagMonitor
+from nss.metrics_store import MetricsPublisher
 from nss.middleware import (
+    DeadlineMiddleware,
     RateLimitMiddleware,
     SecurityHeadersMiddleware,
+    ServerTimingMiddleware,
     TracingMiddleware,
 )
-from nss.models import NSSRequest, NSSResponse, ToolResult
+from nss.models import AsyncNSSRequest, JobStatus, NSSRequest, NSSResponse, ToolResult
+from nss.timing import annotate, current_timeline, stage
 
 logger = structlog.get_logger(__name__)
 
 # -- Shared state (populated during lifespan) --------------------------------
 _ollama_client: OllamaClient | None = None
-_mars_scorer: MARSScorer | None = None
+_llm_breaker: CircuitBreaker | None = None
+_admission: AdaptiveLimiter | None = None
+_job_store: JobStore | None = None
+_job_runner: JobRunner[_AsyncJob] | None = None
+_webhooks: WebhookDispatcher | None = None
+_mars_scorer: MARSScorer | TieredMARSScorer | None = None
+_training_samples: TrainingSampleStore | None = None
 _apex_router: APEXRouter | None = None
 _sentinel: SentinelDefense | None = None
+_fused_analyzer: FusedGuardianAnalyzer | None = None
 _audit_logger: AuditLogger | None = None
 _cache: CacheLayer | None = None
+_decision_cache: GuardianDecisionCache | None = None
+_blocklist: BlockedPromptFilter | None = None
 _policy_engine: PolicyEngine | None = None
 _privacy_budget: PrivacyBudgetTracker | None = None
 _tool_sandbox: ToolSandbox | None = None
+_traffic_capture: TrafficCapture | None = None
+_flight_recorder = (
+    FlightRecorder(
+        slowest_n=config.flight_recorder_slowest_n,
+        threshold_ms=config.flight_recorder_threshold_ms,
+        window_s=config.flight_recorder_window_s,
+        capacity=config.flight_recorder_capacity,
+    )
+    if config.flight_recorder_enabled
+    else None
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """Startup / shutdown hook for the gateway."""
-    global _ollama_client, _mars_scorer, _apex_router, _sentinel
-    global _audit_logger, _cache, _policy_engine, _privacy_budget, _tool_sandbox
+    global _ollama_client, _mars_scorer, _apex_router, _sentinel, _fused_analyzer
+    global _audit_logger, _cache, _decision_cache, _policy_engine, _privacy_budget, _tool_sandbox
+    global _blocklist, _traffic_capture, _llm_breaker, _admission, _job_store, _job_runner
+    global _training_samples, _webhooks
 
     logger.info("gateway_starting", version=__version__, port=config.gateway_port)
-
+    if config.metrics_latency_buckets_ms:
+        configure_latency_buckets(parse_buckets(config.metrics_latency_buckets_ms))
+
+    _admission = limiter_from_config(config)
+    _llm_breaker = (
+        CircuitBreaker(config.llm_breaker_failure_threshold, config.llm_breaker_reset_s)
+        if config.llm_breaker_enabled
+        else None
+    )
+    pool = pool_from_config(config)
     _ollama_client = OllamaClient(
         base_url=config.ollama_base_url,
         default_model=config.ollama_small_model,
+        timeout=config.llm_generation_timeout_s,
+        classifier_timeout=config.llm_classifier_timeout_s,
+        breaker=_llm_breaker,
+        scheduler=scheduler_from_config(config, pool.replicas if pool else None),
+        pool=pool,
     )
-    _mars_scorer = MARSScorer(ollama_client=_ollama_client)
+    if _ollama_client.pool is not None:
+        await _ollama_client.pool.start()
+    if config.mars_batch_enabled:
+        _mars_scorer = MARSBatchScorer(
+            ollama_client=_ollama_client,
+            window_ms=config.mars_batch_window_ms,
+            max_batch_size=config.mars_batch_max_size,
+        )
+    else:
+        _mars_scorer = MARSScorer(ollama_client=_ollama_client)
+    if config.mars_local_model_path or config.mars_local_capture:
+        _mars_scorer = TieredMARSScorer(
+            llm_scorer=_mars_scorer,
+            model=(
+                LocalRiskModel.load(config.mars_local_model_path)
+                if config.mars_local_model_path
+                else None
+            ),
+            capture_features=config.mars_local_capture,
+        )
+    if config.mars_local_capture:
+        _training_samples = TrainingSampleStore(
+            redis_url=config.redis_url, ttl_seconds=config.mars_local_capture_ttl_s,
+        )
+        await _training_samples.connect()
     _apex_router = APEXRouter(config=config)
     _sentinel = SentinelDefense(
         ollama_client=_ollama_client,
         consensus_threshold=config.sentinel_consensus_threshold,
+        short_circuit=config.sentinel_short_circuit,
+        rule_engine=load_rule_engine(config.sentinel_rule_packs),
+        window_words=config.sentinel_window_words,
+        window_overlap=config.sentinel_window_overlap,
+        llm_parallelism=config.sentinel_llm_parallelism,
     )
+    if config.guardian_fused_analysis:
+        _fused_analyzer = FusedGuardianAnalyzer(ollama_client=_ollama_client)
     _audit_logger = AuditLogger(redis_url=config.redis_url)
     _policy_engine = PolicyEngine()
     _privacy_budget = PrivacyBudgetTracker(
@@ -103,11 +217,83 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         logger.info("cache_connected", redis_url=config.redis_url)
     except Exception:
         logger.warning("cache_unavailable", redis_url=config.redis_url)
+    _decision_cache = GuardianDecisionCache(
+        _cache,
+        fingerprint=":".join((
+            config.ollama_small_model,
+            str(config.sentinel_consensus_threshold),
+            str(config.sentinel_short_circuit),
+            str(config.guardian_fused_analysis),
+            config.sentinel_rule_packs,
+            str(config.sentinel_window_words),
+            str(config.sentinel_window_overlap),
+            config.mars_local_model_path,
+        )),
+        sentinel_ttl=config.guardian_cache_sentinel_ttl,
+        mars_ttl=config.guardian_cache_mars_ttl,
+    )
+
+    # Blocked-prompt filter (local-only when Redis is unavailable)
+    blocklist_sync: asyncio.Task[None] | None = None
+    if config.blocklist_enabled:
+        _blocklist = BlockedPromptFilter(
+            size_bits=config.blocklist_size_bits,
+            hash_count=config.blocklist_hash_count,
+            redis_url=config.redis_url,
+            rotation_s=config.blocklist_rotation_s,
+            max_fill=config.blocklist_max_fill,
+        )
+        await _blocklist.connect()
+        blocklist_sync = asyncio.create_task(
+            _blocklist.run_sync(config.blocklist_sync_interval_s),
+        )
+
+    metrics_publisher = MetricsPublisher(
+        config.redis_url, "gateway", config.metrics_publish_interval_s,
+    )
+    await metrics_publisher.start()
+    loop_monitor = LoopLagMonitor(
+        interval_s=config.loop_monitor_interval_s,
+        stall_threshold_ms=config.loop_monitor_stall_ms,
+        debug=config.loop_monitor_debug,
+    )
+    loop_monitor.start()
+    if config.traffic_capture_path:
+        _traffic_capture = TrafficCapture(
+            config.traffic_capture_path,
+            secret=config.hmac_secret,
+            sample_rate=config.traffic_capture_sample_rate,
+            max_bytes=int(config.traffic_capture_max_mb * 1024 * 1024),
+        )
+
+    _job_store = JobStore(redis_url=config.redis_url, ttl_seconds=config.async_job_ttl_s)
+    await _job_store.connect()
+    _webhooks = WebhookDispatcher(config.hmac_secret)
+    _job_runner = JobRunner(
+        _run_job, workers=config.async_job_workers, max_pending=config.async_job_max_pending,
+    )
+    await _job_runner.start()
 
     logger.info("gateway_ready")
     yield
 
     # Shutdown
+    if _job_runner is not None:
+        await _job_runner.stop()
+    if _webhooks is not None:
+        await _webhooks.close()
+    if _job_store is not None:
+        await _job_store.close()
+    if _training_samples is not None:
+        await _training_samples.close()
+    if _traffic_capture is not None:
+        await asyncio.to_thread(_traffic_capture.close)
+    loop_monitor.stop()
+    await metrics_publisher.stop()
+    if blocklist_sync is not None:
+        blocklist_sync.cancel()
+    if _blocklist is not None:
+        await _blocklist.close()
     if _cache is not None:
         await _cache.close()
     if _ollama_client is not None:
@@ -129,6 +315,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 app.add_middleware(RateLimitMiddleware, max_requests=config.rate_limit_rpm, window_seconds=60)
+app.add_middleware(
+    DeadlineMiddleware,
+    default_s=config.deadline_default_s,
+    endpoints=parse_endpoint_timeouts(config.deadline_endpoints),
+    max_s=config.deadline_max_s,
+)
+app.add_middleware(
+    ServerTimingMiddleware, enabled=config.server_timing_enabled, recorder=_flight_recorder,
+)
 app.add_middleware(TracingMiddleware)
 app.add_middleware(SecurityHeadersMiddleware)
 app.add_middleware(JWTMiddleware, secret=config.jwt_secret)
@@ -154,8 +349,8 @@ async def log_requests(request: Request, call_next):  # type: ignore[no-untyped-
 # -- HMAC Verification Dependency --------------------------------------------
 
 
-async def verify_hmac(request: Request) -> NSSRequest:
-    """FastAPI dependency: verify HMAC signature on request body."""
+async def _verified_body(request: Request) -> bytes:
+    """Request body after HMAC signature verification."""
     body = await request.body()
     sig = request.headers.get("X-HMAC-Signature", "")
     ts = request.headers.get("X-HMAC-Timestamp", "")
@@ -163,17 +358,47 @@ async def verify_hmac(request: Request) -> NSSRequest:
 
     if not verify_request(body.decode(), sig, config.hmac_secret, ts, nonce):
         raise HTTPException(status_code=401, detail="Invalid HMAC signature.")
+    return body
+
 
-    return NSSRequest.model_validate_json(body)
+async def verify_hmac(request: Request) -> NSSRequest:
+    """FastAPI dependency: verify HMAC signature on request body."""
+    return NSSRequest.model_validate_json(await _verified_body(request))
+
+
+async def verify_hmac_async(request: Request) -> AsyncNSSRequest:
+    """FastAPI dependency: :func:`verify_hmac` for ``/v1/process/async``."""
+    return AsyncNSSRequest.model_validate_json(await _verified_body(request))
 
 
 # -- Endpoints ---------------------------------------------------------------
 
 
+def _llm_degraded() -> bool:
+    """Whether the Ollama circuit is open (gateway runs in degraded mode)."""
+    return _llm_breaker is not None and _llm_breaker.is_open
+
+
+def _llm_unavailable(retry_after_s: float) -> HTTPException:
+    """503 for a generation that cannot reach the LLM."""
+    return HTTPException(
+        status_code=503,
+        detail="LLM unavailable (degraded mode), retry later.",
+        headers={"Retry-After": str(max(1, round(retry_after_s)))},
+    )
+
+
 @app.get("/health")
 async def health() -> dict[str, str]:
-    """Liveness / readiness probe."""
-    return {"status": "healthy", "version": __version__}
+    """Liveness / readiness probe.
+
+    ``status`` is ``degraded`` while the Ollama circuit breaker is open.
+    """
+    return {
+        "status": "degraded" if _llm_degraded() else "healthy",
+        "version": __version__,
+        "llm_circuit": _llm_breaker.state if _llm_breaker is not None else "disabled",
+    }
 
 
 @app.get("/metrics")
@@ -182,13 +407,144 @@ async def metrics() -> dict[str, Any]:
     return metrics_snapshot()
 
 
+@app.get("/v1/admin/flight-recorder", dependencies=[Depends(require_role("admin"))])
+async def flight_recorder() -> dict[str, Any]:
+    """Dump the slow-request flight recorder (admin only)."""
+    if _flight_recorder is None:
+        raise HTTPException(status_code=404, detail="Flight recorder is disabled.")
+    return _flight_recorder.dump()
+
+
+def _admit(lane: str) -> bool:
+    """Take an adaptive-limit slot for a request in *lane*.
+
+    Returns:
+        ``True`` if a slot was taken (release it), ``False`` without limiter.
+
+    Raises:
+        HTTPException: 503 with ``Retry-After`` if the request is shed.
+    """
+    if _admission is None:
+        return False
+    if not _admission.try_acquire(lane):
+        raise HTTPException(
+            status_code=503,
+            detail="Gateway overloaded, retry later.",
+            headers={"Retry-After": str(_admission.retry_after())},
+        )
+    return True
+
+
+# Request outcome label per HTTPException status raised by the pipeline.
+_OUTCOMES = {
+    403: "denied", 422: "blocked", 429: "budget_exhausted", 503: "overloaded",
+    504: "deadline_exceeded",
+}
+
+
 @app.post("/v1/process", response_model=NSSResponse)
 async def process(
     request: Request,
-    nss_request: NSSRequest = Depends(verify_hmac),
+    nss_request: Annotated[NSSRequest, Depends(verify_hmac)],
 ) -> NSSResponse:
     """Run the full NSS processing pipeline on an inbound request.
 
+    Records ``nss_request_duration_ms`` labelled with the routed model,
+    privacy tier and outcome, and the request shape when traffic capture
+    is on.  LLM calls made for the request are scheduled under its user,
+    role lane and weight (:func:`~nss.llm.scheduler.context_for`); a
+    stage that runs out of request deadline answers ``504``.  Requests
+    beyond the lane's share of the adaptive concurrency limit are shed
+    with ``503`` and ``Retry-After`` before any work is done
+    (:class:`~nss.gateway.admission.AdaptiveLimiter`).  See
+    :func:`_run_pipeline` for the steps.
+    """
+    start = time.perf_counter()
+    arrival = time.time()
+    labels = {"model": "none", "privacy_tier": str(nss_request.privacy_tier), "outcome": "error"}
+    shape: dict[str, Any] = {"endpoint": "process", "privacy_tier": nss_request.privacy_tier}
+    status = 500
+    context = context_for(
+        config,
+        nss_request.user_id,
+        getattr(request.state, "role", "viewer"),
+        nss_request.privacy_tier,
+    )
+    llm_context = set_llm_context(context)
+    admitted = False
+    try:
+        admitted = _admit(context.lane)
+        try:
+            response = await _run_pipeline(request, nss_request, labels, shape)
+        except DeadlineExceededError as exc:
+            raise HTTPException(status_code=504, detail=str(exc)) from exc
+        labels["outcome"] = "ok"
+        status = 200
+        return response
+    except HTTPException as exc:
+        labels["outcome"] = _OUTCOMES.get(exc.status_code, "error")
+        status = exc.status_code
+        raise
+    finally:
+        reset_llm_context(llm_context)
+        duration_ms = (time.perf_counter() - start) * 1000
+        if admitted and _admission is not None:
+            _admission.release(
+                duration_ms if status == 200 else None,
+                dropped=(status == 504 and overload_miss())
+                or (status == 503 and not _llm_degraded()),
+            )
+        nss_request_duration.labels(**labels).observe(duration_ms)
+        if labels["model"] != "none":
+            shape["model"] = labels["model"]
+        _capture(request, nss_request.user_id, arrival, status, duration_ms, shape)
+
+
+def _capture(
+    request: Request,
+    user_id: str,
+    arrival: float,
+    status: int,
+    duration_ms: float,
+    shape: dict[str, Any],
+) -> None:
+    """Append the request shape to the traffic capture, if enabled."""
+    if _traffic_capture is None or not _traffic_capture.sampled():
+        return
+    timeline = current_timeline()
+    try:
+        _traffic_capture.record(
+            CaptureRecord(
+                t=round(arrival, 3),
+                status=status,
+                duration_ms=round(duration_ms, 3),
+                user=_traffic_capture.pseudonym(user_id),
+                role=getattr(request.state, "role", "viewer"),
+                stages=(
+                    {k: round(v, 3) for k, v in timeline.durations().items()}
+                    if timeline is not None
+                    else {}
+                ),
+                **shape,
+            ),
+        )
+    except Exception:
+        logger.warning("traffic_capture_failed")  # graceful degradation
+
+
+async def _run_pipeline(
+    request: Request,
+    nss_request: NSSRequest,
+    labels: dict[str, str],
+    shape: dict[str, Any],
+) -> NSSResponse:
+    """Pipeline behind :func:`process`.
+
+    Each step runs in a :func:`~nss.timing.stage` (``nss_stage_latency_ms``
+    and the request's ``Server-Timing`` header); the routed model is written
+    to *labels* and the redacted request shape (lengths, PII count, cache
+    key prefix) to *shape*.
+
     Steps:
         0a. HMAC verification (via dependency)
         0b. JWT authentication (via middleware)
@@ -198,14 +554,44 @@ async def process(
         2. STEER transformation (language detection, privacy-tier context)
         3. PNC compression (deduplication, filler removal, token budget)
         4. SENTINEL injection check
-        5. MARS risk scoring
+        5. MARS risk scoring (4+5 share one LLM call when fused analysis is on)
         5b. Policy post-check (role + risk_tier + pii)
         6. APEX model routing
         7. SHIELD prompt enhancement
         8. LLM generation (with cache)
         9. Privacy budget consumption
+
+    While the Ollama circuit breaker is open (degraded mode), step 4 runs
+    rules and embedding only, step 5 uses :func:`~nss.guardian.mars.heuristic_risk`
+    and step 8 answers from the response cache or with 503.
+
+    Steps 0c-7 are :func:`_guard`, steps 8-9 :func:`_generate`;
+    ``/v1/process/async`` runs the latter on a background worker.
     """
-    assert _ollama_client is not None
+    guarded = await _guard(request, nss_request, labels, shape)
+    return await _generate(guarded, shape)
+
+
+@dataclass(frozen=True)
+class _Guarded:
+    """A request that passed the guardian checks, ready for generation."""
+
+    audit_id: str
+    user_id: str
+    privacy_tier: int
+    started: float  # perf_counter() at pipeline start
+    risk_score: float
+    model: str
+    safe_prompt: str
+
+
+async def _guard(
+    request: Request,
+    nss_request: NSSRequest,
+    labels: dict[str, str],
+    shape: dict[str, Any],
+) -> _Guarded:
+    """Steps 0c-7 of :func:`_run_pipeline`: checks, routing and SHIELD."""
     assert _mars_scorer is not None
     assert _apex_router is not None
     assert _sentinel is not None
@@ -222,16 +608,18 @@ async def process(
     user_id = nss_request.user_id
 
     # 0c. Policy pre-check (role + privacy_tier)
-    pre_decision = _policy_engine.evaluate({
-        "role": role,
-        "privacy_tier": nss_request.privacy_tier,
-    })
+    with stage("policy"):
+        pre_decision = _policy_engine.evaluate({
+            "role": role,
+            "privacy_tier": nss_request.privacy_tier,
+        })
     if not pre_decision.allowed:
         nss_requests_blocked.inc()
         raise HTTPException(status_code=403, detail=pre_decision.violations)
 
     # 0d. Privacy budget check
-    remaining = _privacy_budget.remaining(user_id)
+    with stage("budget"):
+        remaining = _privacy_budget.remaining(user_id)
     if remaining <= 0:
         raise HTTPException(
             status_code=429,
@@ -239,7 +627,14 @@ async def process(
         )
 
     # 1. PII Redaction
-    redacted_message, entities = redact_pii(nss_request.message)
+    with stage("pii"):
+        redacted_message, entities = redact_pii(nss_request.message)
+    shape.update(
+        message_chars=len(nss_request.message),
+        redacted_chars=len(redacted_message),
+        pii_entities=len(entities),
+    )
+    annotate(message_chars=shape["message_chars"], redacted_chars=shape["redacted_chars"])
     if entities:
         nss_pii_entities_redacted.inc(len(entities))
         logger.info("pii_redacted", audit_id=audit_id, count=len(entities))
@@ -252,16 +647,62 @@ async def process(
     )
 
     # 2. STEER Transformation
-    transformed_message, steer_meta = steer_transform(
-        redacted_message, privacy_tier=nss_request.privacy_tier,
-    )
+    with stage("steer"):
+        transformed_message, steer_meta = steer_transform(
+            redacted_message, privacy_tier=nss_request.privacy_tier,
+        )
 
     # 3. PNC Compression
-    compressed_message, compression_ratio, pnc_meta = compress(transformed_message)
+    with stage("pnc"):
+        compressed_message, compression_ratio, pnc_meta = compress(transformed_message)
 
-    # 4. SENTINEL injection check
+    # 4. SENTINEL injection check (replays of blocked inputs rejected up front)
     guardian_start = time.perf_counter()
-    sentinel_result = await _sentinel.check_injection(compressed_message)
+    degraded = _llm_degraded()
+    if degraded:
+        # Ollama circuit open: rules + embedding SENTINEL, heuristic MARS,
+        # cached answer or 503.  Degraded verdicts are not cached.
+        nss_degraded_requests.inc()
+        annotate(degraded=True)
+    # The guardian shares the filter: key it on the redacted message, not
+    # on the STEER/PNC rewrite the guardian never sees.
+    if _blocklist is not None and redacted_message in _blocklist:
+        nss_blocklist_hits.inc()
+        nss_requests_blocked.inc()
+        _audit_logger.log_event(
+            "sentinel_check",
+            user_id=user_id,
+            layer="guardian",
+            component="sentinel",
+            details={"is_safe": False, "blocklist_hit": True, "audit_id": audit_id},
+        )
+        raise HTTPException(
+            status_code=422,
+            detail="Request blocked by SENTINEL: matches a previously blocked input.",
+        )
+    fused = None
+    sentinel_result = None
+    if _decision_cache is not None:
+        sentinel_result = await _decision_cache.get_sentinel(compressed_message)
+    sentinel_cached = sentinel_result is not None
+    annotate(sentinel_cached=sentinel_cached)
+    if sentinel_result is None:
+        with stage("sentinel"):
+            if degraded:
+                sentinel_result = await _sentinel.check_injection(
+                    compressed_message, use_llm=False,
+                )
+            elif _fused_analyzer is not None:
+                fused = await _fused_analyzer.analyze(compressed_message)
+                sentinel_result = await _sentinel.check_injection(
+                    compressed_message,
+                    llm_suspicious=fused.llm_suspicious,
+                    llm_error=fused.llm_error,
+                )
+            else:
+                sentinel_result = await _sentinel.check_injection(compressed_message)
+        if _decision_cache is not None and not degraded:
+            await _decision_cache.set_sentinel(compressed_message, sentinel_result)
     _audit_logger.log_event(
         "sentinel_check",
         user_id=user_id,
@@ -270,33 +711,75 @@ async def process(
         details={
             "is_safe": sentinel_result.is_safe,
             "confidence": sentinel_result.confidence,
+            "fused": fused is not None,
+            "cached": sentinel_cached,
+            "matched_rules": sentinel_result.matched_rules,
             "audit_id": audit_id,
         },
     )
     if not sentinel_result.is_safe:
         nss_requests_blocked.inc()
+        if _blocklist is not None:
+            _blocklist.add(redacted_message)
         raise HTTPException(
             status_code=422,
             detail=f"Request blocked by SENTINEL: {sentinel_result.consensus}",
         )
 
     # 5. MARS risk scoring
-    risk = await _mars_scorer.score_risk(compressed_message)
+    features: list[float] | None = None
+    cached_risk = None
+    if fused is None and _decision_cache is not None:
+        cached_risk = await _decision_cache.get_risk(compressed_message)
+    if cached_risk is not None:
+        risk, mars_source = cached_risk, "cache"
+    elif fused is not None:
+        risk, mars_source = fused.risk, "fused"
+    elif degraded:
+        risk, mars_source = heuristic_risk(sentinel_result), "heuristic"
+    else:
+        with stage("mars"):
+            if isinstance(_mars_scorer, TieredMARSScorer):
+                risk, mars_source, features = await _mars_scorer.score_risk_with_source(
+                    compressed_message,
+                )
+            else:
+                risk, mars_source = await _mars_scorer.score_risk(compressed_message), "llm"
+    if cached_risk is None and _decision_cache is not None and not degraded:
+        await _decision_cache.set_risk(compressed_message, risk)
+    annotate(mars_source=mars_source, risk_tier=risk.tier)
+    mars_details: dict[str, Any] = {
+        "score": risk.score,
+        "tier": risk.tier,
+        "category": risk.category,
+        "source": mars_source,
+        "cached": cached_risk is not None,
+        "audit_id": audit_id,
+    }
+    if (
+        features is not None
+        and _training_samples is not None
+        and await _training_samples.put(audit_id, user_id, features, risk)
+    ):
+        # Training data for the local fast-path classifier (NSS_MARS_LOCAL_CAPTURE),
+        # kept out of the append-only audit log so unlearning can purge it
+        mars_details["training_sample"] = audit_id
     _audit_logger.log_event(
         "mars_scoring",
         user_id=user_id,
         layer="guardian",
         component="mars",
-        details={"score": risk.score, "tier": risk.tier, "audit_id": audit_id},
+        details=mars_details,
     )
 
     # 5b. Policy post-check (with risk_tier and pii_detected)
-    full_decision = _policy_engine.evaluate({
-        "role": role,
-        "risk_tier": risk.tier,
-        "pii_detected": bool(entities),
-        "privacy_tier": nss_request.privacy_tier,
-    })
+    with stage("policy"):
+        full_decision = _policy_engine.evaluate({
+            "role": role,
+            "risk_tier": risk.tier,
+            "pii_detected": bool(entities),
+            "privacy_tier": nss_request.privacy_tier,
+        })
     if not full_decision.allowed:
         nss_requests_blocked.inc()
         raise HTTPException(status_code=403, detail=full_decision.violations)
@@ -306,22 +789,47 @@ async def process(
         asyncio.create_task(_fire_dpia(user_id, risk, entities, audit_id))
 
     # 6. APEX model routing
-    decision = _apex_router.select_model(
-        query=compressed_message,
-        confidence=sentinel_result.confidence,
-        budget_remaining=1.0,
-    )
+    with stage("apex"):
+        decision = _apex_router.select_model(
+            query=compressed_message,
+            confidence=sentinel_result.confidence,
+            budget_remaining=1.0,
+        )
+    labels["model"] = decision.model_selected
+    annotate(model=decision.model_selected, privacy_tier=nss_request.privacy_tier)
 
     guardian_elapsed_ms = (time.perf_counter() - guardian_start) * 1000
     nss_guardian_latency.observe(guardian_elapsed_ms)
 
     # 7. SHIELD prompt enhancement
-    safe_prompt = enhance_prompt(compressed_message)
+    with stage("shield"):
+        safe_prompt = enhance_prompt(compressed_message)
+
+    return _Guarded(
+        audit_id=audit_id,
+        user_id=user_id,
+        privacy_tier=nss_request.privacy_tier,
+        started=start,
+        risk_score=risk.score,
+        model=decision.model_selected,
+        safe_prompt=safe_prompt,
+    )
+
+
+async def _generate(guarded: _Guarded, shape: dict[str, Any]) -> NSSResponse:
+    """Steps 8-9 of :func:`_run_pipeline`: cached or fresh generation, budget."""
+    assert _ollama_client is not None
+    assert _audit_logger is not None
+    assert _privacy_budget is not None
+
+    safe_prompt = guarded.safe_prompt
+    user_id = guarded.user_id
 
     # 8. LLM generation (with cache)
     cache_key = hashlib.sha256(
-        f"{safe_prompt}:{decision.model_selected}".encode(),
+        f"{safe_prompt}:{guarded.model}".encode(),
     ).hexdigest()
+    shape["cache_key"] = cache_key[:16]
 
     response_text = None
     if _cache is not None:
@@ -330,11 +838,24 @@ async def process(
         except Exception:
             pass  # graceful degradation
 
+    annotate(response_cache_hit=response_text is not None)
     if response_text is None:
-        response_text = await _ollama_client.generate(
-            prompt=safe_prompt,
-            model=decision.model_selected,
-        )
+        if _llm_breaker is not None and _llm_breaker.is_open:
+            raise _llm_unavailable(_llm_breaker.retry_after())
+        with stage("llm"):
+            try:
+                response_text = await _ollama_client.generate(
+                    prompt=safe_prompt,
+                    model=guarded.model,
+                )
+            except CircuitOpenError as exc:
+                raise _llm_unavailable(exc.retry_after_s) from exc
+            except LLMQueueTimeoutError as exc:
+                raise HTTPException(
+                    status_code=503,
+                    detail="LLM capacity exhausted, retry later.",
+                    headers={"Retry-After": str(max(1, round(config.llm_queue_timeout_s)))},
+                ) from exc
         if _cache is not None:
             try:
                 await _cache.set("gateway", cache_key, response_text)
@@ -347,29 +868,180 @@ async def process(
         layer="gateway",
         component="ollama",
         details={
-            "model": decision.model_selected,
-            "audit_id": audit_id,
+            "model": guarded.model,
+            "audit_id": guarded.audit_id,
             "cache_hit": response_text is not None,
         },
     )
 
     # 9. Privacy budget consumption
-    _privacy_budget.consume(config.privacy_epsilon_per_query, user_id)
+    with stage("budget"):
+        _privacy_budget.consume(config.privacy_epsilon_per_query, user_id)
     nss_privacy_budget_consumed.inc(config.privacy_epsilon_per_query)
 
-    elapsed_ms = (time.perf_counter() - start) * 1000
+    elapsed_ms = (time.perf_counter() - guarded.started) * 1000
     nss_request_latency.observe(elapsed_ms)
 
     return NSSResponse(
         response=response_text,
-        risk_score=risk.score,
-        model_used=decision.model_selected,
+        risk_score=guarded.risk_score,
+        model_used=guarded.model,
         latency_ms=round(elapsed_ms, 2),
-        privacy_tier=nss_request.privacy_tier,
-        audit_id=audit_id,
+        privacy_tier=guarded.privacy_tier,
+        audit_id=guarded.audit_id,
+    )
+
+
+# -- Async Processing ---------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class _AsyncJob:
+    """A guarded request queued for background generation."""
+
+    record: JobRecord
+    guarded: _Guarded
+    context: LLMContext
+    webhook_url: str | None
+
+
+def _job_failed(record: JobRecord, status_code: int, detail: Any) -> JobRecord:
+    return record.model_copy(update={
+        "status": "failed",
+        "status_code": status_code,
+        "error": str(detail),
+        "updated_at": time.time(),
+    })
+
+
+@app.post("/v1/process/async", response_model=JobStatus, status_code=202)
+async def process_async(
+    request: Request,
+    response: Response,
+    nss_request: Annotated[AsyncNSSRequest, Depends(verify_hmac_async)],
+) -> JobStatus:
+    """Run the guardian checks now and generate on a background worker.
+
+    Policy, budget, SENTINEL, MARS and routing run synchronously with the
+    same audit events and error answers as ``/v1/process``; a request that
+    passes them is answered ``202`` with a job to poll at
+    ``/v1/jobs/{job_id}`` (``Location`` header).  Generation, the response
+    cache and privacy budget consumption then follow on a worker under the
+    request's scheduling context and ``NSS_ASYNC_JOB_TIMEOUT_S``.  When the
+    job queue is full the request is refused with ``503`` before any check
+    runs.
+    """
+    assert _job_store is not None
+    assert _job_runner is not None
+
+    if nss_request.webhook_url and not webhook_allowed(
+        nss_request.webhook_url, _webhook_hosts(),
+    ):
+        raise HTTPException(status_code=422, detail="Webhook host is not allowed.")
+    if _job_runner.full():
+        raise HTTPException(
+            status_code=503,
+            detail="Job queue full, retry later.",
+            headers={"Retry-After": "5"},
+        )
+
+    context = context_for(
+        config,
+        nss_request.user_id,
+        getattr(request.state, "role", "viewer"),
+        nss_request.privacy_tier,
+    )
+    llm_context = set_llm_context(context)
+    admitted = False
+    try:
+        admitted = _admit(context.lane)
+        guarded = await _guard(request, nss_request, {}, {})
+    except DeadlineExceededError as exc:
+        raise HTTPException(status_code=504, detail=str(exc)) from exc
+    finally:
+        reset_llm_context(llm_context)
+        if admitted and _admission is not None:
+            _admission.release()
+
+    now = time.time()
+    record = JobRecord(
+        job_id=uuid.uuid4().hex,
+        status="queued",
+        audit_id=guarded.audit_id,
+        created_at=now,
+        updated_at=now,
+        owner=owner_key(
+            getattr(request.state, "user_id", nss_request.user_id), config.hmac_secret,
+        ),
+    )
+    await _job_store.put(record)
+    job = _AsyncJob(record, guarded, context, nss_request.webhook_url)
+    if not _job_runner.submit(job):
+        await _job_store.put(_job_failed(record, 503, "Job queue full."))
+        raise HTTPException(
+            status_code=503,
+            detail="Job queue full, retry later.",
+            headers={"Retry-After": "5"},
+        )
+    nss_async_jobs.labels(status="submitted").inc()
+    response.headers["Location"] = f"/v1/jobs/{record.job_id}"
+    return record.public()
+
+
+def _webhook_hosts() -> frozenset[str]:
+    return frozenset(
+        h.strip() for h in config.async_webhook_allowed_hosts.split(",") if h.strip()
     )
 
 
+async def _run_job(job: _AsyncJob) -> None:
+    """Worker body: generate, store the outcome, notify the webhook."""
+    assert _job_store is not None
+
+    await _job_store.put(job.record.model_copy(
+        update={"status": "running", "updated_at": time.time()},
+    ))
+    llm_context = set_llm_context(job.context)
+    deadline = start_deadline(config.async_job_timeout_s)
+    try:
+        result = await _generate(job.guarded, {})
+        record = job.record.model_copy(update={
+            "status": "succeeded", "result": result, "updated_at": time.time(),
+        })
+    except HTTPException as exc:
+        record = _job_failed(job.record, exc.status_code, exc.detail)
+    except DeadlineExceededError as exc:
+        record = _job_failed(job.record, 504, exc)
+    except Exception:
+        logger.exception("async_job_failed", job_id=job.record.job_id)
+        record = _job_failed(job.record, 500, "Internal error.")
+    finally:
+        end_deadline(deadline)
+        reset_llm_context(llm_context)
+    await _job_store.put(record)
+    nss_async_jobs.labels(status=record.status).inc()
+    if job.webhook_url and _webhooks is not None:
+        _webhooks.dispatch(job.webhook_url, record.public())
+
+
+@app.get("/v1/jobs/{job_id}", response_model=JobStatus)
+async def get_job(request: Request, job_id: str) -> JobStatus:
+    """Status and, once finished, result of an async job.
+
+    Only the submitting user (or an admin) can read a job; unknown, expired
+    and foreign jobs all answer ``404``.
+    """
+    assert _job_store is not None
+    record = await _job_store.get(job_id)
+    user_id = getattr(request.state, "user_id", "")
+    if record is None or (
+        record.owner != owner_key(user_id, config.hmac_secret)
+        and getattr(request.state, "role", "viewer") != "admin"
+    ):
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    return record.public()
+
+
 # -- Tool Execution Endpoint -------------------------------------------------
 
 
@@ -391,6 +1063,8 @@ async def tool_execute(request: Request, body: ToolExecRequest) -> dict[str, Any
     assert _tool_sandbox is not None
     assert _audit_logger is not None
 
+    start = time.perf_counter()
+    arrival = time.time()
     result = _tool_sandbox.execute_tool(
         tool_name=body.tool_name,
         args=body.args,
@@ -409,6 +1083,18 @@ async def tool_execute(request: Request, body: ToolExecRequest) -> dict[str, Any
             "execution_time_ms": result.execution_time_ms,
         },
     )
+    _capture(
+        request,
+        body.user_id,
+        arrival,
+        200,
+        (time.perf_counter() - start) * 1000,
+        {
+            "endpoint": "tool",
+            "tool": body.tool_name,
+            "args_chars": len(json.dumps(body.args, default=str)),
+        },
+    )
 
     return {
         "output": result.output,
@@ -469,8 +1155,23 @@ async def unlearn_user(user_id: str) -> dict[str, Any]:
         _privacy_budget.reset(user_id)
         results["budget_reset"] = True
 
-    # Cache entries expire naturally (300s TTL)
-    results["cache_note"] = "Cache entries expire within 5 minutes (TTL=300s)"
+    # Cache entries and async job results expire naturally (gateway 300s;
+    # guardian layers and jobs per config)
+    max_ttl = max(
+        300,
+        config.guardian_cache_sentinel_ttl,
+        config.guardian_cache_mars_ttl,
+        config.async_job_ttl_s,
+    )
+    results["cache_note"] = f"Cache entries expire within {max_ttl // 60} minutes (TTL={max_ttl}s)"
+
+    # Captured MARS training samples (best-effort -- Redis may be down)
+    if _training_samples is not None:
+        try:
+            results["training_samples_deleted"] = await _training_samples.purge_user(user_id)
+        except Exception:
+            results["training_samples_deleted"] = False
+            logger.warning("unlearn_training_samples_failed", user_id=user_id)
 
     # Vector store deletion (best-effort -- Qdrant may not be running)
     try:
@@ -6,6 +6,8 @@ audit trail retrieval as HTTP endpoints.
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Any
 
 import structlog
@@ -16,10 +18,12 @@ from pydantic import BaseModel
 from nss.audit import AuditLogger
 from nss.auth import JWTMiddleware
 from nss.config import config
-from nss.middleware import SecurityHeadersMiddleware, TracingMiddleware
 from nss.governance.dpia import DPIAGenerator
 from nss.governance.policy_engine import PolicyEngine
 from nss.governance.privacy_budget import PrivacyBudgetTracker
+from nss.loop_monitor import LoopLagMonitor
+from nss.metrics_store import MetricsPublisher
+from nss.middleware import SecurityHeadersMiddleware, TracingMiddleware
 from nss.models import DPIAReport, PolicyDecision
 
 logger = structlog.get_logger(__name__)
@@ -58,9 +62,27 @@ _dpia_generator = DPIAGenerator()
 _audit_logger = AuditLogger(redis_url=config.redis_url)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    metrics_publisher = MetricsPublisher(
+        config.redis_url, "governance", config.metrics_publish_interval_s,
+    )
+    await metrics_publisher.start()
+    loop_monitor = LoopLagMonitor(
+        interval_s=config.loop_monitor_interval_s,
+        stall_threshold_ms=config.loop_monitor_stall_ms,
+        debug=config.loop_monitor_debug,
+    )
+    loop_monitor.start()
+    yield
+    loop_monitor.stop()
+    await metrics_publisher.stop()
+
+
 app = FastAPI(
     title="NSS Governance Plane",
     version="3.1.1",
+    lifespan=lifespan,
 )
 
 app.add_middleware(TracingMiddleware)
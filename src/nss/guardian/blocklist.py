@@ -0,0 +1,281 @@
+"""Bloom-filter negative cache of previously blocked prompts.
+
+Attack payloads are typically replayed in bursts.  :class:`BlockedPromptFilter`
+remembers the content hash of every input SENTINEL has blocked so replays
+are rejected before the detection pipeline runs.
+
+The filter is a fixed-size bit array (memory does not grow with the attack
+corpus) using double hashing over the SHA-256 of the text.  Entries live in
+generations of ``rotation_s`` seconds numbered from the wall clock, so all
+replicas agree on the current one without coordination: new entries go to
+the current generation, lookups check the current and the previous one, and
+older generations are dropped.  A blocked prompt is therefore remembered for
+between one and two rotation periods -- a SENTINEL false positive does not
+become a permanent block.
+
+A generation stops accepting entries once ``max_fill`` of its bits are set,
+which bounds the false-positive rate (``max_fill ** hash_count`` per
+generation) even when an attacker floods the filter with distinct blocked
+texts; rejected additions count towards ``nss_blocklist_saturated``.
+
+Replicas share each generation through the Redis bitmap
+``nss:guardian:blocked_bloom:<generation>`` and its change counter
+``...:<generation>:version`` (both expiring after two rotation periods):
+:meth:`BlockedPromptFilter.sync` pushes locally set bits with ``SETBIT``,
+increments the counter, and *replaces* a local generation with the shared
+bitmap only when its counter moved past this replica's own pushes, so an
+idle sync costs one round trip instead of a 1 MiB download per generation.
+Deleting the keys (e.g. after a rule change) resets the counter and clears
+every replica on its next sync.
+
+Gateway and guardian share the filter, so both add and look up the same
+form of the input: the PII-redacted message as submitted, before STEER or
+PNC rewrite it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import math
+import time
+from typing import Any
+
+import structlog
+
+from nss.metrics import nss_blocklist_fill_ratio, nss_blocklist_saturated
+
+logger = structlog.get_logger(__name__)
+
+_REDIS_KEY = "nss:guardian:blocked_bloom"
+
+
+def _set_bit(bits: bytearray, pos: int) -> bool:
+    """Set bit *pos*; ``True`` if it was clear before."""
+    # Redis bitmap order: offset 0 is the most significant bit of byte 0.
+    mask = 0x80 >> (pos & 7)
+    if bits[pos >> 3] & mask:
+        return False
+    bits[pos >> 3] |= mask
+    return True
+
+
+class BlockedPromptFilter:
+    """Fixed-size, generational Bloom filter of blocked prompt hashes.
+
+    Works locally (per replica) when Redis is unavailable.
+
+    Parameters:
+        size_bits: Number of bits per generation (memory is
+            ``2 * size_bits / 8`` bytes).
+        hash_count: Number of bit positions per entry.
+        redis_url: Redis URL used for cross-replica sync; ``None`` keeps the
+            filter local.
+        rotation_s: Lifetime of a generation in seconds.
+        max_fill: Fraction of set bits at which a generation stops
+            accepting entries.
+    """
+
+    def __init__(
+        self,
+        size_bits: int = 1 << 23,
+        hash_count: int = 7,
+        redis_url: str | None = None,
+        rotation_s: float = 3600.0,
+        max_fill: float = 0.25,
+    ) -> None:
+        if size_bits < 8 or hash_count < 1:
+            raise ValueError("size_bits must be >= 8 and hash_count >= 1.")
+        if rotation_s <= 0 or not 0 < max_fill <= 1:
+            raise ValueError("rotation_s must be > 0 and max_fill in (0, 1].")
+        self._size_bits = size_bits
+        self._hash_count = hash_count
+        self._rotation_s = rotation_s
+        self._max_set = int(max_fill * size_bits)
+        self._clock = time.time
+        self._generation = self._current_generation()
+        self._bits = bytearray((size_bits + 7) // 8)
+        self._previous = bytearray(len(self._bits))
+        self._set_count = 0
+        # Locally set positions not yet pushed to Redis, per generation.
+        self._pending: dict[int, set[int]] = {}
+        # Shared version each local generation reflects (None: no Redis key).
+        self._versions: dict[int, int | None] = {}
+        self._redis_url = redis_url
+        self._client: Any | None = None
+        self._added = 0
+
+    # -- Generations -----------------------------------------------------
+
+    def _current_generation(self) -> int:
+        return int(self._clock() // self._rotation_s)
+
+    def _rotate(self) -> int:
+        """Advance to the wall-clock generation; returns its number."""
+        generation = self._current_generation()
+        if generation != self._generation:
+            if generation == self._generation + 1:
+                self._previous = self._bits
+            else:
+                self._previous = bytearray(len(self._bits))
+            self._bits = bytearray(len(self._bits))
+            self._set_count = 0
+            self._added = 0
+            self._generation = generation
+            nss_blocklist_fill_ratio.set(0.0)
+        return generation
+
+    @property
+    def fill_ratio(self) -> float:
+        """Fraction of bits set in the current generation."""
+        return self._set_count / self._size_bits
+
+    # -- Bloom filter ----------------------------------------------------
+
+    def _positions(self, text: str) -> list[int]:
+        digest = hashlib.sha256(text.encode()).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return [(h1 + i * h2) % self._size_bits for i in range(self._hash_count)]
+
+    def add(self, text: str) -> bool:
+        """Remember *text* as blocked.
+
+        Returns:
+            ``False`` if the current generation is saturated and *text* was
+            not added.
+        """
+        generation = self._rotate()
+        if self._set_count >= self._max_set:
+            nss_blocklist_saturated.inc()
+            logger.warning("blocklist_saturated", fill_ratio=round(self.fill_ratio, 4))
+            return False
+        pending = self._pending.setdefault(generation, set())
+        for pos in self._positions(text):
+            if _set_bit(self._bits, pos):
+                self._set_count += 1
+                pending.add(pos)
+        self._added += 1
+        nss_blocklist_fill_ratio.set(self.fill_ratio)
+        return True
+
+    def __contains__(self, text: str) -> bool:
+        self._rotate()
+        positions = self._positions(text)
+        return any(
+            all(bits[pos >> 3] & (0x80 >> (pos & 7)) for pos in positions)
+            for bits in (self._bits, self._previous)
+        )
+
+    def false_positive_rate(self, entries: int | None = None) -> float:
+        """Estimated false-positive probability of the current generation.
+
+        Args:
+            entries: Number of insertions; defaults to the entries added to
+                the current generation on this replica.
+        """
+        n = self._added if entries is None else entries
+        k, m = self._hash_count, self._size_bits
+        return (1.0 - math.exp(-k * n / m)) ** k
+
+    # -- Redis sync ------------------------------------------------------
+
+    async def connect(self) -> None:
+        """Connect to Redis for sync (no-op without a URL; degrades on failure)."""
+        if not self._redis_url:
+            return
+        try:
+            import redis.asyncio as aioredis
+
+            self._client = aioredis.from_url(self._redis_url)
+            await self._client.ping()
+            logger.info("blocklist_redis_connected")
+        except Exception:
+            self._client = None
+            logger.warning("blocklist_redis_unavailable", url=self._redis_url)
+
+    def _adopt(self, remote: bytes | None, generation: int) -> bytearray:
+        """The shared bitmap of *generation* plus bits not yet pushed."""
+        size = len(self._bits)
+        bits = bytearray((remote or b"")[:size].ljust(size, b"\0"))
+        for pos in self._pending.get(generation, ()):
+            _set_bit(bits, pos)
+        return bits
+
+    def _stale(self, gen: int, version: int | None, pushed: bool) -> bool:
+        """Whether the shared *version* of *gen* has changes not held locally."""
+        if gen not in self._versions:
+            return True
+        known = self._versions[gen]
+        if pushed:
+            # Our INCR alone moves the version by one; more means other writers.
+            return version != (known or 0) + 1
+        return version != known
+
+    async def sync(self) -> None:
+        """Push local additions to Redis and adopt changed shared generations."""
+        if self._client is None:
+            return
+        generation = self._rotate()
+        pending = {
+            gen: positions
+            for gen, positions in self._pending.items()
+            if gen >= generation - 1
+        }
+        self._pending = {}
+        ttl = math.ceil(2 * self._rotation_s)
+        gens = (generation, generation - 1)
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for gen, positions in pending.items():
+                key = f"{_REDIS_KEY}:{gen}"
+                for pos in positions:
+                    pipe.setbit(key, pos, 1)
+                pipe.expire(key, ttl)
+                pipe.incr(f"{key}:version")
+                pipe.expire(f"{key}:version", ttl)
+            for gen in gens:
+                pipe.get(f"{_REDIS_KEY}:{gen}:version")
+            results = await pipe.execute()
+            versions = {
+                gen: None if raw is None else int(raw)
+                for gen, raw in zip(gens, results[-2:], strict=True)
+            }
+            stale = [gen for gen in gens if self._stale(gen, versions[gen], gen in pending)]
+            bitmaps: list[bytes | None] = []
+            if stale:
+                pipe = self._client.pipeline(transaction=False)
+                for gen in stale:
+                    pipe.get(f"{_REDIS_KEY}:{gen}")
+                bitmaps = await pipe.execute()
+        except Exception:
+            for gen, positions in pending.items():
+                self._pending.setdefault(gen, set()).update(positions)
+            logger.warning("blocklist_sync_failed")
+            return
+        if self._rotate() != generation:
+            return  # rotated while waiting; adopt on the next sync
+        self._versions = {gen: versions[gen] for gen in gens}
+        # Replace rather than merge, so deleted keys clear this replica.
+        for gen, remote in zip(stale, bitmaps, strict=True):
+            if gen == generation:
+                self._bits = self._adopt(remote, gen)
+                # int.bit_count avoids a per-byte loop over a 1 MiB bitmap,
+                # which would block the event loop for tens of milliseconds.
+                self._set_count = int.from_bytes(self._bits, "big").bit_count()
+                nss_blocklist_fill_ratio.set(self.fill_ratio)
+            else:
+                self._previous = self._adopt(remote, gen)
+
+    async def run_sync(self, interval_s: float) -> None:
+        """Call :meth:`sync` every *interval_s* seconds until cancelled."""
+        while True:
+            await self.sync()
+            await asyncio.sleep(interval_s)
+
+    async def close(self) -> None:
+        """Flush pending bits and close the Redis connection."""
+        if self._client is not None:
+            await self.sync()
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,120 @@
+"""Cache for SENTINEL and MARS decisions on repeated inputs.
+
+Both guardian verdicts are pure functions of the redacted, normalised text
+and the detector configuration.  :class:`GuardianDecisionCache` stores them
+in :class:`~nss.cache.CacheLayer` under their own layers (``"sentinel"`` and
+``"mars"``) so that repeated questions skip the LLM calls entirely.
+
+Cache identifiers combine :data:`DETECTOR_VERSION`, a caller-supplied
+fingerprint of the detector configuration (model, thresholds) and the
+SHA-256 of the text.  Bump :data:`DETECTOR_VERSION` whenever prompts,
+rules or parsing change so stale verdicts are never served.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any, TypeVar
+
+import structlog
+
+from nss.cache import CacheLayer
+from nss.metrics import nss_guardian_cache_hits, nss_guardian_cache_misses
+from nss.models import RiskScore, SentinelResult
+
+logger = structlog.get_logger(__name__)
+
+_M = TypeVar("_M", SentinelResult, RiskScore)
+
+DETECTOR_VERSION = "2"
+
+SENTINEL_LAYER = "sentinel"
+MARS_LAYER = "mars"
+
+
+class GuardianDecisionCache:
+    """Read-through cache for guardian verdicts.
+
+    A TTL of ``0`` disables caching for that detector.  All operations
+    degrade to cache misses when Redis is unavailable.
+
+    Parameters:
+        cache: Connected (or degraded) :class:`CacheLayer`.
+        fingerprint: Detector configuration fingerprint, e.g. model name
+            and consensus threshold; part of every cache key.
+        sentinel_ttl: Lifetime of cached SENTINEL results in seconds.
+        mars_ttl: Lifetime of cached MARS scores in seconds.
+    """
+
+    def __init__(
+        self,
+        cache: CacheLayer,
+        fingerprint: str = "",
+        sentinel_ttl: int = 300,
+        mars_ttl: int = 300,
+    ) -> None:
+        self._cache = cache
+        self._fingerprint = fingerprint
+        self._sentinel_ttl = sentinel_ttl
+        self._mars_ttl = mars_ttl
+
+    def key(self, text: str) -> str:
+        """Return the cache identifier for *text*."""
+        digest = hashlib.sha256(text.encode()).hexdigest()
+        return f"v{DETECTOR_VERSION}:{self._fingerprint}:{digest}"
+
+    @staticmethod
+    def _load(layer: str, model: type[_M], data: Any) -> _M | None:
+        """Validate a cached entry and record the hit or miss."""
+        if data is not None:
+            try:
+                result = model.model_validate(data)
+            except Exception:
+                logger.warning("guardian_cache_invalid_entry", layer=layer)
+            else:
+                nss_guardian_cache_hits.inc()
+                return result
+        nss_guardian_cache_misses.inc()
+        return None
+
+    # -- SENTINEL --------------------------------------------------------
+
+    async def get_sentinel(self, text: str) -> SentinelResult | None:
+        """Return a cached SENTINEL result for *text*, or ``None``."""
+        if self._sentinel_ttl <= 0:
+            return None
+        data = await self._cache.get(SENTINEL_LAYER, self.key(text))
+        return self._load(SENTINEL_LAYER, SentinelResult, data)
+
+    async def set_sentinel(self, text: str, result: SentinelResult) -> None:
+        """Cache the SENTINEL *result* for *text*.
+
+        Results whose LLM vote failed open (``llm_error``) are not cached so
+        a transient LLM outage does not pass the input for the whole TTL.
+        """
+        if self._sentinel_ttl <= 0 or result.llm_error:
+            return
+        await self._cache.set(
+            SENTINEL_LAYER, self.key(text), result.model_dump(), ttl_seconds=self._sentinel_ttl,
+        )
+
+    # -- MARS ------------------------------------------------------------
+
+    async def get_risk(self, text: str) -> RiskScore | None:
+        """Return a cached MARS score for *text*, or ``None``."""
+        if self._mars_ttl <= 0:
+            return None
+        data = await self._cache.get(MARS_LAYER, self.key(text))
+        return self._load(MARS_LAYER, RiskScore, data)
+
+    async def set_risk(self, text: str, risk: RiskScore) -> None:
+        """Cache the MARS *risk* for *text*.
+
+        Fallback scores (category ``ERROR``) are not cached so a transient
+        LLM outage is not remembered.
+        """
+        if self._mars_ttl <= 0 or risk.category == "ERROR":
+            return
+        await self._cache.set(
+            MARS_LAYER, self.key(text), risk.model_dump(), ttl_seconds=self._mars_ttl,
+        )
@@ -6,12 +6,13 @@ which is then classified into one of four tiers.
 
 from __future__ import annotations
 
-import re
+from typing import Any
 
 import structlog
 
-from nss.llm.ollama_client import OllamaClient
-from nss.models import RiskScore
+from nss.llm.model_config import CLASSIFIER_PROFILE, fit_classifier_input
+from nss.llm.ollama_client import OllamaClient, parse_json_response
+from nss.models import RiskScore, SentinelResult
 
 logger = structlog.get_logger(__name__)
 
@@ -19,7 +20,7 @@ _RISK_PROMPT_TEMPLATE = (
     "Analyse the following text for potential security risks, "
     "harmful intent, or policy violations.  Respond with ONLY a JSON object:\n"
     '{{"score": <float 0-1>, "category": "<risk category>", '
-    '"details": "<brief explanation>"}}\n\n'
+    '"details": "<explanation, at most 12 words>"}}\n\n'
     "Text ({language}):\n"
     '\"\"\"\n{text}\n\"\"\"'
 )
@@ -56,6 +57,76 @@ def classify_tier(score: float) -> int:
     return 3  # Below 0.80 -> safest tier
 
 
+def parse_risk_response(raw: str) -> tuple[float, str, str]:
+    """Strictly parse a MARS JSON verdict.
+
+    Args:
+        raw: Model output produced in JSON mode.
+
+    Returns:
+        A ``(score, category, details)`` tuple with *score* clamped to [0, 1].
+
+    Raises:
+        ValueError: If the response is not a JSON object or lacks a
+            numeric ``score``.
+    """
+    return risk_fields(parse_json_response(raw))
+
+
+def risk_fields(data: dict[str, Any]) -> tuple[float, str, str]:
+    """Extract ``(score, category, details)`` from a parsed MARS verdict.
+
+    Raises:
+        ValueError: If *data* lacks a numeric ``score``.
+    """
+    score = data.get("score")
+    if isinstance(score, bool) or not isinstance(score, (int, float)):
+        raise ValueError("MARS response has no numeric 'score'.")
+    category = data.get("category")
+    details = data.get("details")
+    return (
+        min(max(float(score), 0.0), 1.0),
+        category if isinstance(category, str) and category else "UNKNOWN",
+        details if isinstance(details, str) else "",
+    )
+
+
+def heuristic_risk(sentinel: SentinelResult) -> RiskScore:
+    """Local risk estimate from the SENTINEL votes, for degraded mode.
+
+    Used while the LLM is unavailable: a signature hit scores HIGH, an
+    embedding match alone MEDIUM, and clean input stays below the tiers.
+
+    Args:
+        sentinel: Rules/embedding SENTINEL result for the same text.
+
+    Returns:
+        A :class:`RiskScore` with category ``HEURISTIC``.
+    """
+    if sentinel.method_results.get("rules") is False:
+        score, details = 0.92, f"Signature match ({', '.join(sentinel.matched_rules)})."
+    elif sentinel.method_results.get("embedding") is False:
+        score, details = 0.87, "Similar to a known attack pattern."
+    else:
+        score, details = 0.3, "No local risk indicators."
+    return RiskScore(
+        score=score,
+        tier=classify_tier(score),
+        category="HEURISTIC",
+        details=f"{details} LLM unavailable; local heuristic.",
+    )
+
+
+def failed_risk() -> RiskScore:
+    """Medium-risk :class:`RiskScore` returned when MARS scoring fails."""
+    return RiskScore(
+        score=0.5,
+        tier=classify_tier(0.5),
+        category="ERROR",
+        details="MARS scoring failed; defaulting to medium risk.",
+    )
+
+
 class MARSScorer:
     """MARS risk-scoring engine backed by an Ollama model.
 
@@ -76,36 +147,20 @@ class MARSScorer:
         Returns:
             A fully populated :class:`RiskScore`.
         """
-        prompt = _RISK_PROMPT_TEMPLATE.format(text=text, language=language)
+        prompt = _RISK_PROMPT_TEMPLATE.format(
+            text=fit_classifier_input(text, "mars"), language=language,
+        )
 
         try:
             raw = await self._llm.generate(
                 prompt=prompt,
                 system_prompt="You are a security analyst.  Respond ONLY with valid JSON.",
+                profile=CLASSIFIER_PROFILE,
             )
-
-            # Try to extract JSON from the response
-            score = 0.0
-            category = "UNKNOWN"
-            details = raw
-
-            score_match = re.search(r'"score"\s*:\s*([\d.]+)', raw)
-            if score_match:
-                score = min(max(float(score_match.group(1)), 0.0), 1.0)
-
-            cat_match = re.search(r'"category"\s*:\s*"([^"]+)"', raw)
-            if cat_match:
-                category = cat_match.group(1)
-
-            det_match = re.search(r'"details"\s*:\s*"([^"]+)"', raw)
-            if det_match:
-                details = det_match.group(1)
-
+            score, category, details = parse_risk_response(raw)
         except Exception:
             logger.exception("mars_scoring_failed")
-            score = 0.5
-            category = "ERROR"
-            details = "MARS scoring failed; defaulting to medium risk."
+            return failed_risk()
 
         tier = classify_tier(score)
         return RiskScore(score=score, tier=tier, category=category, details=details)
@@ -0,0 +1,431 @@
+"""Local fast-path risk classifier in front of the MARS LLM.
+
+A logistic-regression model over :class:`EmbeddingService` vectors is
+trained from past MARS verdicts (exported from the audit log).  The
+:class:`TieredMARSScorer` answers locally whenever the model's calibrated
+uncertainty band around its prediction falls inside a single MARS tier,
+and defers to the LLM scorer only when the band straddles one of the
+:data:`~nss.guardian.mars._TIER_BOUNDARIES`.
+
+Training data is captured by the gateway when ``NSS_MARS_LOCAL_CAPTURE``
+is enabled: the embedding of every LLM-scored (already redacted) text is
+written with its score to a :class:`TrainingSampleStore`, keyed by the
+request's audit id and expiring after ``NSS_MARS_LOCAL_CAPTURE_TTL_S``.
+The append-only audit log only carries that reference
+(``details.training_sample``), so ``/v1/unlearn/{user_id}`` can purge a
+user's samples.
+
+CLI::
+
+    nss-mars-local export --redis-url redis://localhost:6379/0 --out verdicts.jsonl
+    nss-mars-local train --data verdicts.jsonl --out mars_local.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from nss.deadline import bounded
+from nss.guardian.mars import MARSScorer, classify_tier
+from nss.knowledge.embeddings import EmbeddingService
+from nss.metrics import nss_mars_local_deferred, nss_mars_local_resolved
+from nss.models import RiskScore
+
+logger = structlog.get_logger(__name__)
+
+_SAMPLE_KEY_PREFIX = "nss:mars:samples"
+_TIER_LABELS = {0: "CRITICAL", 1: "HIGH", 2: "MEDIUM", 3: "LOW"}
+
+# Lower bound for the uncertainty band so a tiny validation set cannot
+# produce an over-confident model.
+_MIN_MARGIN = 0.02
+
+
+class LocalRiskModel:
+    """Logistic-regression risk model over sentence embeddings.
+
+    Parameters:
+        weights: One weight per embedding dimension.
+        bias: Intercept term.
+        margin: Half-width of the calibrated uncertainty band (95th
+            percentile of absolute validation error).
+        samples: Number of training samples (informational).
+    """
+
+    def __init__(
+        self,
+        weights: list[float],
+        bias: float,
+        margin: float,
+        samples: int = 0,
+    ) -> None:
+        self.weights = weights
+        self.bias = bias
+        self.margin = max(margin, _MIN_MARGIN)
+        self.samples = samples
+
+    def predict(self, features: list[float]) -> float:
+        """Return the predicted risk score in [0, 1] for *features*."""
+        if len(features) != len(self.weights):
+            raise ValueError(
+                f"Expected {len(self.weights)} features, got {len(features)}."
+            )
+        z = self.bias + sum(w * x for w, x in zip(self.weights, features, strict=True))
+        if z < -60:
+            return 0.0
+        return 1.0 / (1.0 + math.exp(-z))
+
+    def tier_band(self, score: float) -> tuple[int, int]:
+        """Return the tiers at the low and high edge of the uncertainty band."""
+        low = max(0.0, score - self.margin)
+        high = min(1.0, score + self.margin)
+        return classify_tier(high), classify_tier(low)
+
+    # -- persistence -----------------------------------------------------
+
+    def save(self, path: str | Path) -> None:
+        """Write the model as JSON to *path*."""
+        Path(path).write_text(
+            json.dumps({
+                "weights": self.weights,
+                "bias": self.bias,
+                "margin": self.margin,
+                "samples": self.samples,
+            }),
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> LocalRiskModel:
+        """Load a model previously written by :meth:`save`."""
+        data = json.loads(Path(path).read_text())
+        return cls(
+            weights=[float(w) for w in data["weights"]],
+            bias=float(data["bias"]),
+            margin=float(data["margin"]),
+            samples=int(data.get("samples", 0)),
+        )
+
+
+def train_local_model(
+    samples: list[tuple[list[float], float]],
+    epochs: int = 500,
+    learning_rate: float = 0.5,
+    l2: float = 1e-4,
+    validation_fraction: float = 0.2,
+    seed: int = 0,
+) -> LocalRiskModel:
+    """Fit a :class:`LocalRiskModel` to ``(features, mars_score)`` pairs.
+
+    Uses full-batch gradient descent on the cross-entropy loss with the
+    MARS score as a soft target.  The uncertainty margin is calibrated on
+    a held-out split.
+
+    Args:
+        samples: Training pairs of embedding vector and MARS score.
+        epochs: Gradient-descent iterations.
+        learning_rate: Step size.
+        l2: L2 regularisation strength.
+        validation_fraction: Share of samples held out for calibration.
+        seed: Shuffle seed (for reproducible splits).
+
+    Returns:
+        The trained model.
+
+    Raises:
+        ValueError: If fewer than 10 samples are supplied.
+        ImportError: If numpy (the ``mars-local`` extra) is not installed.
+    """
+    try:
+        import numpy as np
+    except ImportError as exc:
+        raise ImportError(
+            "Training the local MARS model requires numpy: pip install 'nss[mars-local]'",
+        ) from exc
+
+    if len(samples) < 10:
+        raise ValueError("At least 10 samples are required to train the local model.")
+
+    shuffled = list(samples)
+    random.Random(seed).shuffle(shuffled)
+    n_val = max(1, int(len(shuffled) * validation_fraction))
+    val, fit = shuffled[:n_val], shuffled[n_val:]
+
+    x = np.asarray([f for f, _ in fit], dtype=np.float64)
+    y = np.clip(np.asarray([t for _, t in fit], dtype=np.float64), 0.0, 1.0)
+    w = np.zeros(x.shape[1])
+    b = 0.0
+    for _ in range(epochs):
+        p = 1.0 / (1.0 + np.exp(-(x @ w + b)))
+        err = p - y
+        w -= learning_rate * (x.T @ err / len(y) + l2 * w)
+        b -= learning_rate * float(err.mean())
+
+    xv = np.asarray([f for f, _ in val], dtype=np.float64)
+    yv = np.asarray([t for _, t in val], dtype=np.float64)
+    residuals = np.abs(1.0 / (1.0 + np.exp(-(xv @ w + b))) - yv)
+    margin = float(np.quantile(residuals, 0.95))
+
+    logger.info("mars_local_trained", samples=len(samples), margin=round(margin, 4))
+    return LocalRiskModel(
+        weights=w.tolist(), bias=b, margin=margin, samples=len(samples),
+    )
+
+
+class TieredMARSScorer:
+    """Two-tier MARS scorer: local classifier first, LLM when uncertain.
+
+    Parameters:
+        llm_scorer: The LLM-backed scorer used in the uncertain band
+            (:class:`MARSScorer` or a subclass).
+        model: Trained :class:`LocalRiskModel`; ``None`` always defers
+            (useful while capturing training data).
+        embedding_service: Embedding backend (defaults to
+            :class:`EmbeddingService`).
+        capture_features: Return embeddings of LLM-scored texts from
+            :meth:`score_risk_with_source` so they can be stored as
+            training data (see :class:`TrainingSampleStore`).
+    """
+
+    def __init__(
+        self,
+        llm_scorer: MARSScorer,
+        model: LocalRiskModel | None = None,
+        embedding_service: EmbeddingService | None = None,
+        capture_features: bool = False,
+    ) -> None:
+        self._llm_scorer = llm_scorer
+        self._model = model
+        self._embedder = embedding_service or EmbeddingService()
+        self._capture = capture_features
+
+    async def score_risk(self, text: str, language: str = "de") -> RiskScore:
+        """Evaluate the risk level of *text* (same contract as :class:`MARSScorer`)."""
+        risk, _source, _features = await self.score_risk_with_source(text, language)
+        return risk
+
+    async def score_risk_with_source(
+        self,
+        text: str,
+        language: str = "de",
+    ) -> tuple[RiskScore, str, list[float] | None]:
+        """Score *text* and report which tier answered.
+
+        Returns:
+            ``(risk, source, features)`` where *source* is ``"local"`` or
+            ``"llm"`` and *features* is the embedding of an LLM-scored text
+            when feature capture is enabled (``None`` otherwise).
+        """
+        features: list[float] | None = None
+        if self._model is not None or self._capture:
+            try:
+                features = await asyncio.to_thread(self._embedder.embed, text)
+            except Exception:
+                logger.exception("mars_local_embedding_failed")
+
+        if self._model is not None and features is not None:
+            score = self._model.predict(features)
+            high_tier, low_tier = self._model.tier_band(score)
+            if high_tier == low_tier:
+                self._record(resolved=True)
+                return (
+                    RiskScore(
+                        score=score,
+                        tier=low_tier,
+                        category=f"LOCAL_{_TIER_LABELS[low_tier]}",
+                        details=(
+                            f"Local classifier score {score:.2f} "
+                            f"(+/-{self._model.margin:.2f})."
+                        ),
+                    ),
+                    "local",
+                    None,
+                )
+
+        self._record(resolved=False)
+        risk = await self._llm_scorer.score_risk(text, language)
+        return risk, "llm", features if self._capture else None
+
+    @staticmethod
+    def _record(resolved: bool) -> None:
+        # Counts only: they sum across processes, a per-process ratio does
+        # not.  The resolved share is resolved / (resolved + deferred).
+        if resolved:
+            nss_mars_local_resolved.inc()
+        else:
+            nss_mars_local_deferred.inc()
+
+
+# -- Training data store -----------------------------------------------------
+
+
+class TrainingSampleStore:
+    """Captured MARS training samples in Redis, apart from the audit log.
+
+    Each sample is stored under ``<prefix>:<audit_id>`` with a TTL, and
+    indexed per user so :meth:`purge_user` can erase a user's samples
+    (GDPR Art. 17).  Without Redis nothing is captured.
+
+    Parameters:
+        redis_url: Redis connection URL.
+        ttl_seconds: Lifetime of a sample.
+        key_prefix: Prefix of the Redis keys.
+    """
+
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379/0",
+        ttl_seconds: int = 30 * 86400,
+        key_prefix: str = _SAMPLE_KEY_PREFIX,
+    ) -> None:
+        self._redis_url = redis_url
+        self._ttl = ttl_seconds
+        self._prefix = key_prefix
+        self._client: Any | None = None
+
+    async def connect(self) -> None:
+        """Connect to Redis (capture is disabled on failure)."""
+        try:
+            import redis.asyncio as aioredis
+
+            self._client = aioredis.from_url(self._redis_url, decode_responses=True)
+            await self._client.ping()
+            logger.info("mars_sample_store_connected", url=self._redis_url)
+        except Exception:
+            self._client = None
+            logger.warning("mars_sample_store_unavailable", url=self._redis_url)
+
+    def _user_key(self, user_id: str) -> str:
+        return f"{self._prefix}_by_user:{user_id}"
+
+    async def put(
+        self, audit_id: str, user_id: str, features: list[float], risk: RiskScore,
+    ) -> bool:
+        """Store the sample of request *audit_id*.
+
+        Returns:
+            ``True`` if stored; the audit log should then reference *audit_id*.
+        """
+        if self._client is None:
+            return False
+        sample = json.dumps({
+            "features": [round(f, 5) for f in features],
+            "score": risk.score,
+            "category": risk.category,
+        })
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            pipe.setex(f"{self._prefix}:{audit_id}", self._ttl, sample)
+            pipe.sadd(self._user_key(user_id), audit_id)
+            pipe.expire(self._user_key(user_id), self._ttl)
+            await bounded(pipe.execute(), "redis")
+            return True
+        except Exception:
+            logger.warning("mars_sample_store_put_failed", audit_id=audit_id)
+            return False
+
+    async def purge_user(self, user_id: str) -> int:
+        """Delete every sample captured for *user_id*.
+
+        Returns:
+            Number of samples deleted.
+
+        Raises:
+            RuntimeError: If Redis is not connected.
+        """
+        if self._client is None:
+            raise RuntimeError("Training sample store is not connected.")
+        audit_ids = await self._client.smembers(self._user_key(user_id))
+        keys = [f"{self._prefix}:{audit_id}" for audit_id in audit_ids]
+        deleted = await self._client.delete(*keys) if keys else 0
+        await self._client.delete(self._user_key(user_id))
+        return int(deleted)
+
+    async def close(self) -> None:
+        """Close the Redis connection."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# -- Training data export / CLI ---------------------------------------------
+
+
+def export_training_samples(samples: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Select usable training samples from a :class:`TrainingSampleStore`.
+
+    Args:
+        samples: Stored samples (``features``, ``score``, ``category``).
+
+    Returns:
+        ``{"features": [...], "score": float}`` records.
+    """
+    records: list[dict[str, Any]] = []
+    for sample in samples:
+        features = sample.get("features")
+        if not features or sample.get("category") == "ERROR":
+            continue  # fallback score, not a real verdict
+        records.append({"features": features, "score": float(sample["score"])})
+    return records
+
+
+def _cmd_export(args: argparse.Namespace) -> None:
+    import redis as _redis
+
+    client = _redis.Redis.from_url(args.redis_url, decode_responses=True)
+    stored = [
+        client.get(key) for key in client.scan_iter(match=f"{_SAMPLE_KEY_PREFIX}:*")
+    ]
+    samples = export_training_samples([json.loads(raw) for raw in stored if raw])
+    with open(args.out, "w") as fh:
+        for sample in samples:
+            fh.write(json.dumps(sample) + "\n")
+    print(f"Exported {len(samples)} MARS verdicts to {args.out}")
+
+
+def _cmd_train(args: argparse.Namespace) -> None:
+    with open(args.data) as fh:
+        records = [json.loads(line) for line in fh if line.strip()]
+    model = train_local_model(
+        [(r["features"], float(r["score"])) for r in records],
+        epochs=args.epochs,
+        learning_rate=args.learning_rate,
+    )
+    model.save(args.out)
+    print(f"Trained on {model.samples} samples; uncertainty margin {model.margin:.3f}")
+    print(f"Model written to {args.out}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Entry point for ``nss-mars-local``."""
+    parser = argparse.ArgumentParser(
+        prog="nss-mars-local",
+        description="Export MARS verdicts and train the local fast-path classifier.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="Export captured verdicts from Redis.")
+    export.add_argument("--redis-url", default="redis://localhost:6379/0")
+    export.add_argument("--out", required=True, help="Output JSONL file.")
+    export.set_defaults(func=_cmd_export)
+
+    train = sub.add_parser("train", help="Train a model from exported verdicts.")
+    train.add_argument("--data", required=True, help="JSONL file written by 'export'.")
+    train.add_argument("--out", required=True, help="Model JSON output path.")
+    train.add_argument("--epochs", type=int, default=500)
+    train.add_argument("--learning-rate", type=float, default=0.5)
+    train.set_defaults(func=_cmd_train)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
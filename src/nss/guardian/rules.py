@@ -0,0 +1,341 @@
+"""SENTINEL signature rule engine.
+
+Rules are loaded from JSON *signature packs* (see
+``signatures/default.json``).  Every rule names one or more *required
+literals*; a single Aho-Corasick automaton over all literals scans the
+lowercased input once, and a rule's regular expression is only evaluated
+inside a bounded window around each literal hit.
+
+Cost is therefore linear in the input length for a given pack: the scan is
+one pass, and each regex confirmation is confined to at most
+``before + len(literal) + after`` characters (capped at
+:data:`MAX_WINDOW`), independent of how long the input is.
+
+Runs of whitespace are collapsed to a single character before scanning (a
+newline if the run contains one, else a space; match offsets still refer to
+the original text), so padding between tokens -- ``DROP`` followed by
+hundreds of spaces and ``TABLE`` -- cannot push a match out of its window.
+Callers such as guardian ``/v1/sentinel/check`` pass unnormalised input.
+
+Pack format::
+
+    {
+      "name": "default",
+      "version": "1",
+      "rules": [
+        {
+          "id": "sqli.drop_table",
+          "category": "sql_injection",
+          "literals": ["drop"],
+          "pattern": "(?i)drop\\\\s+table",
+          "before": 0,
+          "after": 64
+        }
+      ]
+    }
+
+The automaton uses ``pyahocorasick`` when it is installed and a pure-Python
+implementation otherwise.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections import deque
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+from pathlib import Path
+
+import structlog
+from pydantic import BaseModel, Field, model_validator
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_PACK = Path(__file__).with_name("signatures") / "default.json"
+
+# Upper bound on the text a single regex confirmation may inspect.
+MAX_WINDOW = 4096
+
+_ASCII_LOWER = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz",
+)
+
+_WHITESPACE_RUN = re.compile(r"\s{2,}")
+
+
+def _collapse_whitespace(text: str) -> tuple[str, list[int] | None]:
+    """Collapse whitespace runs of *text* to one character.
+
+    Returns:
+        The collapsed text and, if anything was collapsed, the offset in
+        *text* of every collapsed character (plus ``len(text)`` at the end).
+    """
+    pieces: list[str] = []
+    offsets: list[int] = []
+    last = 0
+    for m in _WHITESPACE_RUN.finditer(text):
+        pieces.append(text[last : m.start()])
+        offsets.extend(range(last, m.start()))
+        pieces.append("\n" if "\n" in m.group() else " ")
+        offsets.append(m.start())
+        last = m.end()
+    if not pieces:
+        return text, None
+    pieces.append(text[last:])
+    offsets.extend(range(last, len(text) + 1))
+    return "".join(pieces), offsets
+
+
+class SignatureRule(BaseModel):
+    """A single signature from a pack.
+
+    Attributes:
+        id: Unique rule identifier (reported when the rule fires).
+        category: Attack class, e.g. ``sql_injection``.
+        literals: Strings of which at least one must occur in any match
+            (compared case-insensitively).
+        pattern: Regular expression confirming the match.
+        before: Characters before a literal hit included in the regex window.
+        after: Characters after a literal hit included in the regex window.
+        anchored: The pattern starts with the literal, so it is matched at
+            each literal hit instead of searched across the window.  Keeps
+            frequent literals (e.g. ``on``) from re-scanning the same text.
+        description: Free-text description.
+    """
+
+    id: str
+    category: str
+    literals: list[str] = Field(min_length=1)
+    pattern: str
+    before: int = Field(default=0, ge=0)
+    after: int = Field(default=64, ge=0)
+    anchored: bool = False
+    description: str = ""
+
+    @model_validator(mode="after")
+    def _check(self) -> SignatureRule:
+        if any(not lit for lit in self.literals):
+            raise ValueError(f"Rule {self.id}: literals must be non-empty.")
+        longest = max(len(lit) for lit in self.literals)
+        if self.before + longest + self.after > MAX_WINDOW:
+            raise ValueError(f"Rule {self.id}: window exceeds {MAX_WINDOW} characters.")
+        re.compile(self.pattern)
+        return self
+
+
+class SignaturePack(BaseModel):
+    """A named, versioned collection of :class:`SignatureRule` objects."""
+
+    name: str
+    version: str = "1"
+    description: str = ""
+    rules: list[SignatureRule]
+
+
+class RuleMatch(BaseModel):
+    """A confirmed rule hit.
+
+    Attributes:
+        rule_id: Identifier of the rule that fired.
+        category: The rule's attack class.
+        start: Start offset of the regex match in the input.
+        end: End offset of the regex match in the input.
+    """
+
+    rule_id: str
+    category: str
+    start: int
+    end: int
+
+
+# -- Literal automaton -------------------------------------------------------
+
+
+class LiteralAutomaton:
+    """Pure-Python Aho-Corasick automaton over a fixed set of literals."""
+
+    def __init__(self, literals: list[str]) -> None:
+        goto: list[dict[str, int]] = [{}]
+        out: list[tuple[int, ...]] = [()]
+        for index, literal in enumerate(literals):
+            state = 0
+            for ch in literal:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    out.append(())
+                    goto[state][ch] = nxt
+                state = nxt
+            out[state] += (index,)
+
+        fail = [0] * len(goto)
+        queue: deque[int] = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                out[nxt] += out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def iter(self, text: str) -> Iterator[tuple[int, int]]:
+        """Yield ``(end_offset, literal_index)`` for every literal occurrence."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for index in out[state]:
+                    yield i + 1, index
+
+
+class _NativeAutomaton:
+    """``pyahocorasick`` backend with the :class:`LiteralAutomaton` interface."""
+
+    def __init__(self, literals: list[str]) -> None:
+        import ahocorasick
+
+        self._automaton = ahocorasick.Automaton()
+        for index, literal in enumerate(literals):
+            self._automaton.add_word(literal, index)
+        self._automaton.make_automaton()
+
+    def iter(self, text: str) -> Iterator[tuple[int, int]]:
+        for last, index in self._automaton.iter(text):
+            yield last + 1, index
+
+
+def _build_automaton(literals: list[str], native: bool) -> LiteralAutomaton | _NativeAutomaton:
+    if native and literals:
+        try:
+            return _NativeAutomaton(literals)
+        except ImportError:
+            pass
+    return LiteralAutomaton(literals)
+
+
+# -- Engine ------------------------------------------------------------------
+
+
+class RuleEngine:
+    """Literal-prefiltered signature matcher.
+
+    Parameters:
+        rules: Signatures to match; ids must be unique.
+        native: Use ``pyahocorasick`` for the literal scan when available.
+    """
+
+    def __init__(self, rules: Iterable[SignatureRule], native: bool = True) -> None:
+        self._rules = list(rules)
+        ids = [r.id for r in self._rules]
+        if len(ids) != len(set(ids)):
+            dupes = sorted({i for i in ids if ids.count(i) > 1})
+            raise ValueError(f"Duplicate rule ids: {', '.join(dupes)}")
+
+        self._patterns = [re.compile(r.pattern) for r in self._rules]
+        literal_index: dict[str, int] = {}
+        self._literal_rules: list[list[int]] = []
+        for rule_index, rule in enumerate(self._rules):
+            for literal in dict.fromkeys(lit.lower() for lit in rule.literals):
+                if literal not in literal_index:
+                    literal_index[literal] = len(literal_index)
+                    self._literal_rules.append([])
+                self._literal_rules[literal_index[literal]].append(rule_index)
+        self._literal_lengths = [len(lit) for lit in literal_index]
+        self._automaton = _build_automaton(list(literal_index), native)
+
+    @classmethod
+    def from_packs(cls, paths: Iterable[str | Path], native: bool = True) -> RuleEngine:
+        """Build an engine from signature pack files or directories of ``*.json`` packs."""
+        rules: list[SignatureRule] = []
+        for entry in paths:
+            path = Path(entry)
+            files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+            for file in files:
+                pack = SignaturePack.model_validate(json.loads(file.read_text()))
+                logger.info(
+                    "sentinel_rule_pack_loaded",
+                    pack=pack.name, version=pack.version, rules=len(pack.rules),
+                )
+                rules.extend(pack.rules)
+        return cls(rules, native=native)
+
+    @property
+    def rules(self) -> list[SignatureRule]:
+        """The loaded signatures, in pack order."""
+        return list(self._rules)
+
+    @property
+    def patterns(self) -> list[re.Pattern[str]]:
+        """Compiled confirmation regexes, in rule order."""
+        return list(self._patterns)
+
+    def scan(self, text: str, first_only: bool = False) -> list[RuleMatch]:
+        """Return every rule that fires on *text* (at most one match per rule).
+
+        Args:
+            text: Input to scan.
+            first_only: Stop at the first confirmed match.
+
+        Returns:
+            Confirmed matches ordered by the literal hit that triggered them.
+        """
+        text, offsets = _collapse_whitespace(text)
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Some non-ASCII characters expand when lowercased; keep offsets aligned.
+            lowered = text.translate(_ASCII_LOWER)
+
+        n = len(text)
+        matched: set[int] = set()
+        matches: list[RuleMatch] = []
+        for end, literal in self._automaton.iter(lowered):
+            start = end - self._literal_lengths[literal]
+            for rule_index in self._literal_rules[literal]:
+                if rule_index in matched:
+                    continue
+                rule = self._rules[rule_index]
+                pattern = self._patterns[rule_index]
+                if rule.anchored:
+                    m = pattern.match(text, start, min(n, end + rule.after))
+                else:
+                    m = pattern.search(text, max(0, start - rule.before), min(n, end + rule.after))
+                if m is None:
+                    continue
+                matched.add(rule_index)
+                m_start, m_end = m.span()
+                if offsets is not None:
+                    m_start, m_end = offsets[m_start], offsets[m_end]
+                matches.append(
+                    RuleMatch(rule_id=rule.id, category=rule.category, start=m_start, end=m_end),
+                )
+                if first_only:
+                    return matches
+        return matches
+
+    def matches(self, text: str) -> bool:
+        """Return ``True`` if any rule fires on *text*."""
+        return bool(self.scan(text, first_only=True))
+
+
+def load_rule_engine(extra_packs: str = "") -> RuleEngine:
+    """Load the default pack plus comma-separated *extra_packs* paths."""
+    extra = [p.strip() for p in extra_packs.split(",") if p.strip()]
+    return RuleEngine.from_packs([DEFAULT_PACK, *extra])
+
+
+@lru_cache(maxsize=1)
+def default_rule_engine() -> RuleEngine:
+    """Shared engine for the built-in pack only."""
+    return RuleEngine.from_packs([DEFAULT_PACK])
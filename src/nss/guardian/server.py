@@ -6,23 +6,42 @@ for the microservice architecture.
 
 from __future__ import annotations
 
+import asyncio
 from contextlib import asynccontextmanager
 from typing import Any
 
 import structlog
 import uvicorn
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, HTTPException
 from pydantic import BaseModel
 
-from nss.auth import JWTMiddleware
+from nss.auth import JWTMiddleware, require_role
 from nss.config import config
-from nss.middleware import SecurityHeadersMiddleware, TracingMiddleware
+from nss.deadline import parse_endpoint_timeouts
+from nss.flight_recorder import FlightRecorder
+from nss.middleware import (
+    DeadlineMiddleware,
+    SecurityHeadersMiddleware,
+    ServerTimingMiddleware,
+    TracingMiddleware,
+)
 from nss.guardian.apex import APEXRouter
-from nss.guardian.mars import MARSScorer, classify_tier
+from nss.guardian.blocklist import BlockedPromptFilter
+from nss.guardian.fused import FusedGuardianAnalyzer
+from nss.guardian.mars import MARSScorer, classify_tier, heuristic_risk
+from nss.guardian.mars_batch import MARSBatchScorer
+from nss.guardian.mars_local import LocalRiskModel, TieredMARSScorer
+from nss.guardian.rules import load_rule_engine
 from nss.guardian.sentinel import SentinelDefense
 from nss.guardian.shield import enhance_prompt
 from nss.guardian.vigil import check_tool_call
+from nss.llm.backend_pool import pool_from_config
+from nss.llm.circuit_breaker import CircuitBreaker
 from nss.llm.ollama_client import OllamaClient
+from nss.llm.scheduler import scheduler_from_config
+from nss.metrics import configure_latency_buckets, nss_blocklist_hits, parse_buckets
+from nss.loop_monitor import LoopLagMonitor
+from nss.metrics_store import MetricsPublisher
 from nss.models import APEXDecision, RiskScore, SentinelResult
 
 logger = structlog.get_logger(__name__)
@@ -39,6 +58,16 @@ class SentinelRequest(BaseModel):
     text: str
 
 
+class AnalyzeRequest(BaseModel):
+    text: str
+    language: str = "de"
+
+
+class AnalyzeResponse(BaseModel):
+    sentinel: SentinelResult
+    risk: RiskScore
+
+
 class APEXRequest(BaseModel):
     query: str
     confidence: float
@@ -58,26 +87,100 @@ class VIGILRequest(BaseModel):
 # -- Application --
 
 _ollama_client: OllamaClient | None = None
-_mars_scorer: MARSScorer | None = None
+_llm_breaker: CircuitBreaker | None = None
+_mars_scorer: MARSScorer | TieredMARSScorer | None = None
 _sentinel: SentinelDefense | None = None
+_fused_analyzer: FusedGuardianAnalyzer | None = None
 _apex_router: APEXRouter | None = None
+_blocklist: BlockedPromptFilter | None = None
+_flight_recorder = (
+    FlightRecorder(
+        slowest_n=config.flight_recorder_slowest_n,
+        threshold_ms=config.flight_recorder_threshold_ms,
+        window_s=config.flight_recorder_window_s,
+        capacity=config.flight_recorder_capacity,
+    )
+    if config.flight_recorder_enabled
+    else None
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global _ollama_client, _mars_scorer, _sentinel, _apex_router
+    global _ollama_client, _mars_scorer, _sentinel, _fused_analyzer, _apex_router, _blocklist
+    global _llm_breaker
+    if config.metrics_latency_buckets_ms:
+        configure_latency_buckets(parse_buckets(config.metrics_latency_buckets_ms))
+    _llm_breaker = (
+        CircuitBreaker(config.llm_breaker_failure_threshold, config.llm_breaker_reset_s)
+        if config.llm_breaker_enabled
+        else None
+    )
+    pool = pool_from_config(config)
     _ollama_client = OllamaClient(
         base_url=config.ollama_base_url,
         default_model=config.ollama_small_model,
+        classifier_timeout=config.llm_classifier_timeout_s,
+        breaker=_llm_breaker,
+        scheduler=scheduler_from_config(config, pool.replicas if pool else None),
+        pool=pool,
     )
-    _mars_scorer = MARSScorer(_ollama_client)
+    if _ollama_client.pool is not None:
+        await _ollama_client.pool.start()
+    if config.mars_batch_enabled:
+        _mars_scorer = MARSBatchScorer(
+            _ollama_client,
+            window_ms=config.mars_batch_window_ms,
+            max_batch_size=config.mars_batch_max_size,
+        )
+    else:
+        _mars_scorer = MARSScorer(_ollama_client)
+    if config.mars_local_model_path:
+        _mars_scorer = TieredMARSScorer(
+            _mars_scorer, model=LocalRiskModel.load(config.mars_local_model_path),
+        )
     _sentinel = SentinelDefense(
         _ollama_client,
         consensus_threshold=config.sentinel_consensus_threshold,
+        short_circuit=config.sentinel_short_circuit,
+        rule_engine=load_rule_engine(config.sentinel_rule_packs),
+        window_words=config.sentinel_window_words,
+        window_overlap=config.sentinel_window_overlap,
+        llm_parallelism=config.sentinel_llm_parallelism,
     )
+    _fused_analyzer = FusedGuardianAnalyzer(_ollama_client)
     _apex_router = APEXRouter(config)
+    blocklist_sync: asyncio.Task[None] | None = None
+    if config.blocklist_enabled:
+        _blocklist = BlockedPromptFilter(
+            size_bits=config.blocklist_size_bits,
+            hash_count=config.blocklist_hash_count,
+            redis_url=config.redis_url,
+            rotation_s=config.blocklist_rotation_s,
+            max_fill=config.blocklist_max_fill,
+        )
+        await _blocklist.connect()
+        blocklist_sync = asyncio.create_task(
+            _blocklist.run_sync(config.blocklist_sync_interval_s),
+        )
+    metrics_publisher = MetricsPublisher(
+        config.redis_url, "guardian", config.metrics_publish_interval_s,
+    )
+    await metrics_publisher.start()
+    loop_monitor = LoopLagMonitor(
+        interval_s=config.loop_monitor_interval_s,
+        stall_threshold_ms=config.loop_monitor_stall_ms,
+        debug=config.loop_monitor_debug,
+    )
+    loop_monitor.start()
     logger.info("guardian_shield_started", port=config.guardian_port)
     yield
+    loop_monitor.stop()
+    await metrics_publisher.stop()
+    if blocklist_sync is not None:
+        blocklist_sync.cancel()
+    if _blocklist is not None:
+        await _blocklist.close()
     if _ollama_client:
         await _ollama_client.close()
     logger.info("guardian_shield_stopped")
@@ -89,26 +192,95 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.add_middleware(
+    DeadlineMiddleware,
+    default_s=config.deadline_default_s,
+    endpoints=parse_endpoint_timeouts(config.deadline_endpoints),
+    max_s=config.deadline_max_s,
+)
+app.add_middleware(
+    ServerTimingMiddleware, enabled=config.server_timing_enabled, recorder=_flight_recorder,
+)
 app.add_middleware(TracingMiddleware)
 app.add_middleware(SecurityHeadersMiddleware)
 app.add_middleware(JWTMiddleware, secret=config.jwt_secret)
 
 
+def _llm_degraded() -> bool:
+    """Whether the Ollama circuit is open (LLM votes unavailable)."""
+    return _llm_breaker is not None and _llm_breaker.is_open
+
+
 @app.get("/health")
 async def health() -> dict[str, str]:
-    return {"status": "healthy", "service": "guardian-shield"}
+    return {
+        "status": "degraded" if _llm_degraded() else "healthy",
+        "service": "guardian-shield",
+        "llm_circuit": _llm_breaker.state if _llm_breaker is not None else "disabled",
+    }
+
+
+@app.get("/v1/admin/flight-recorder", dependencies=[Depends(require_role("admin"))])
+async def flight_recorder() -> dict[str, Any]:
+    """Dump the slow-request flight recorder (admin only)."""
+    if _flight_recorder is None:
+        raise HTTPException(status_code=404, detail="Flight recorder is disabled.")
+    return _flight_recorder.dump()
 
 
 @app.post("/v1/mars/score")
 async def mars_score(request: MARSRequest) -> RiskScore:
+    """MARS risk score; the rules-only heuristic (category ``HEURISTIC``) in degraded mode."""
     assert _mars_scorer is not None
+    if _llm_degraded():
+        return heuristic_risk(await _check_injection(request.text))
     return await _mars_scorer.score_risk(request.text, request.language)
 
 
+async def _check_injection(
+    text: str, llm_suspicious: bool | None = None, llm_error: bool = False,
+) -> SentinelResult:
+    """SENTINEL check behind the blocked-prompt filter."""
+    assert _sentinel is not None
+    if _blocklist is not None and text in _blocklist:
+        nss_blocklist_hits.inc()
+        return SentinelResult(
+            is_safe=False,
+            confidence=1.0,
+            method_results={},
+            consensus="Matches a previously blocked input.",
+        )
+    result = await _sentinel.check_injection(
+        text, llm_suspicious=llm_suspicious, use_llm=not _llm_degraded(), llm_error=llm_error,
+    )
+    if not result.is_safe and _blocklist is not None:
+        _blocklist.add(text)
+    return result
+
+
 @app.post("/v1/sentinel/check")
 async def sentinel_check(request: SentinelRequest) -> SentinelResult:
+    return await _check_injection(request.text)
+
+
+@app.post("/v1/guardian/analyze")
+async def guardian_analyze(request: AnalyzeRequest) -> AnalyzeResponse:
+    """SENTINEL + MARS in one call; fused into a single LLM request when enabled."""
     assert _sentinel is not None
-    return await _sentinel.check_injection(request.text)
+    assert _mars_scorer is not None
+    if _llm_degraded():
+        sentinel_result = await _check_injection(request.text)
+        return AnalyzeResponse(sentinel=sentinel_result, risk=heuristic_risk(sentinel_result))
+    if config.guardian_fused_analysis:
+        assert _fused_analyzer is not None
+        fused = await _fused_analyzer.analyze(request.text, request.language)
+        sentinel_result = await _check_injection(
+            request.text, llm_suspicious=fused.llm_suspicious, llm_error=fused.llm_error,
+        )
+        return AnalyzeResponse(sentinel=sentinel_result, risk=fused.risk)
+    sentinel_result = await _check_injection(request.text)
+    risk = await _mars_scorer.score_risk(request.text, request.language)
+    return AnalyzeResponse(sentinel=sentinel_result, risk=risk)
 
 
 @app.post("/v1/apex/route")
@@ -13,6 +13,7 @@ from typing import Any
 
 import structlog
 
+from nss.deadline import bounded
 from nss.knowledge.sag_encryption import SAGEncryptor
 
 logger = structlog.get_logger(__name__)
@@ -44,10 +45,13 @@ class RAGPipeline:
         """Retrieve relevant documents for *query*.
 
         Returns a list of dicts with ``id``, ``score``, and
-        decrypted ``payload`` keys.
+        decrypted ``payload`` keys.  The vector search is bounded by the
+        request deadline (:class:`~nss.deadline.DeadlineExceededError`).
         """
         embedding = self._embed.embed(query)
-        results = await self._vs.search(query_embedding=embedding, top_k=self._top_k)
+        results = await bounded(
+            self._vs.search(query_embedding=embedding, top_k=self._top_k), "qdrant",
+        )
 
         # Decrypt payloads if encrypted
         for r in results:
@@ -74,7 +78,10 @@ class RAGPipeline:
         # Encrypt payload before storing
         encrypted_payload = self._encryptor.encrypt_payload(payload)
 
-        await self._vs.upsert(doc_id=doc_id, embedding=embedding, payload=encrypted_payload)
+        await bounded(
+            self._vs.upsert(doc_id=doc_id, embedding=embedding, payload=encrypted_payload),
+            "qdrant",
+        )
         logger.info("rag_document_ingested", doc_id=doc_id, encrypted=self._encryptor.enabled)
 
     def augment_prompt(self, query: str, documents: list[dict[str, Any]]) -> str:
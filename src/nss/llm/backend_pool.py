@@ -0,0 +1,249 @@
+"""Routing of Ollama calls across several Ollama hosts.
+
+:class:`BackendPool` holds one HTTP client per backend and periodically
+probes each with ``GET /api/tags`` (models available) and ``GET /api/ps``
+(models loaded in memory).  A call for a model is routed to:
+
+1. the healthy backends that have the model **loaded**, else those that
+   have it **pulled**, else any healthy backend (it loads on demand);
+2. among those, the backend ranked first for the prompt prefix by
+   rendezvous hashing, unless it has more than ``sticky_slack`` requests
+   outstanding beyond the least-loaded one, in which case the next
+   backend in the ranking is tried.
+
+Sticky routing keeps requests sharing a system prompt and opening on the
+same backend, so Ollama's prompt (KV) cache is reused; the slack bounds
+the imbalance this can cause.
+
+A backend that fails ``eject_after`` consecutive probes or requests is
+ejected; the next successful probe readmits it.  When every backend is
+ejected, calls are still attempted (fail open).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import httpx
+import structlog
+
+from nss.config import NSSConfig
+from nss.metrics import nss_ollama_backend_ejections, nss_ollama_backends_healthy
+
+logger = structlog.get_logger(__name__)
+
+
+class Backend:
+    """State of one Ollama host.
+
+    Parameters:
+        url: Root URL of the Ollama server.
+        timeout: HTTP request timeout in seconds.
+        transport: Optional httpx transport (tests).
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 120.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.url = url.rstrip("/")
+        self.client = httpx.AsyncClient(base_url=self.url, timeout=timeout, transport=transport)
+        self.healthy = True
+        self.models: set[str] = set()
+        self.loaded: set[str] = set()
+        self.outstanding = 0
+        self.failures = 0
+        self.served = 0
+
+    def state(self) -> dict[str, object]:
+        """Snapshot for logs and admin views."""
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "models": sorted(self.models),
+            "loaded": sorted(self.loaded),
+            "outstanding": self.outstanding,
+            "served": self.served,
+        }
+
+
+def prefix_key(model: str, system_prompt: str, prompt: str, prefix_chars: int = 512) -> str:
+    """Stickiness key of a call: model, system prompt and prompt opening."""
+    material = f"{model}\0{system_prompt}\0{prompt[:prefix_chars]}"
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def _rank(key: str, backend: Backend) -> int:
+    digest = hashlib.blake2b(f"{key}\0{backend.url}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class BackendPool:
+    """Least-outstanding, prefix-sticky routing over several Ollama hosts.
+
+    Parameters:
+        urls: Root URLs of the Ollama servers.
+        timeout: HTTP request timeout in seconds.
+        health_interval_s: Seconds between probes (``0`` = probe only on
+            :meth:`start`).
+        eject_after: Consecutive failures before a backend is ejected.
+        sticky_slack: Extra outstanding requests tolerated on the
+            prefix's preferred backend before spilling to the next one.
+        transports: Optional httpx transport per URL (tests).
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        timeout: float = 120.0,
+        health_interval_s: float = 10.0,
+        eject_after: int = 3,
+        sticky_slack: int = 2,
+        transports: dict[str, httpx.AsyncBaseTransport] | None = None,
+    ) -> None:
+        if not urls:
+            raise ValueError("BackendPool needs at least one URL")
+        transports = transports or {}
+        self.backends = [Backend(u, timeout, transports.get(u)) for u in urls]
+        self._interval_s = health_interval_s
+        self._eject_after = max(1, eject_after)
+        self._slack = max(0, sticky_slack)
+        self._task: asyncio.Task[None] | None = None
+        self._update_gauge()
+
+    # -- health ----------------------------------------------------------
+
+    async def start(self) -> None:
+        """Probe every backend once and start the background probe loop."""
+        await self.refresh()
+        if self._interval_s > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval_s)
+            await self.refresh()
+
+    async def refresh(self) -> None:
+        """Probe all backends concurrently."""
+        await asyncio.gather(*(self._probe(b) for b in self.backends))
+        self._update_gauge()
+
+    async def _probe(self, backend: Backend) -> None:
+        try:
+            tags = await backend.client.get("/api/tags")
+            tags.raise_for_status()
+            ps = await backend.client.get("/api/ps")
+            loaded = ps.json().get("models", []) if ps.status_code == 200 else []
+            backend.models = {m["name"] for m in tags.json().get("models", [])}
+            backend.loaded = {m["name"] for m in loaded}
+        except (httpx.HTTPError, ValueError, KeyError, TypeError):
+            self.record_failure(backend)
+            return
+        if not backend.healthy:
+            logger.info("ollama_backend_readmitted", url=backend.url)
+        backend.healthy = True
+        backend.failures = 0
+
+    def record_failure(self, backend: Backend) -> None:
+        """Count a failed probe or request; eject after too many in a row."""
+        backend.failures += 1
+        if backend.healthy and backend.failures >= self._eject_after:
+            backend.healthy = False
+            nss_ollama_backend_ejections.inc()
+            logger.warning("ollama_backend_ejected", url=backend.url, failures=backend.failures)
+            self._update_gauge()
+
+    def _update_gauge(self) -> None:
+        nss_ollama_backends_healthy.set(sum(b.healthy for b in self.backends))
+
+    def any_healthy(self) -> bool:
+        """Whether at least one backend is admitted."""
+        return any(b.healthy for b in self.backends)
+
+    def replicas(self, model: str) -> int:
+        """Healthy backends a call to *model* may be routed to (at least 1).
+
+        Those that have *model* pulled, else every healthy backend (it
+        loads on demand); used to scale the scheduler's slots per model.
+        """
+        healthy = [b for b in self.backends if b.healthy]
+        pulled = sum(model in b.models for b in healthy)
+        return max(1, pulled or len(healthy))
+
+    # -- routing ---------------------------------------------------------
+
+    def choose(self, model: str, key: str, exclude: frozenset[str] = frozenset()) -> Backend:
+        """Backend for a call to *model* with stickiness *key*."""
+        candidates = [b for b in self.backends if b.url not in exclude] or self.backends
+        healthy = [b for b in candidates if b.healthy] or candidates
+        pulled = [b for b in healthy if model in b.models]
+        warm = [b for b in pulled if model in b.loaded]
+        eligible = warm or pulled or healthy
+        least = min(b.outstanding for b in eligible)
+        for backend in sorted(eligible, key=lambda b: _rank(key, b), reverse=True):
+            if backend.outstanding <= least + self._slack:
+                return backend
+        return eligible[0]  # unreachable: the least-loaded backend always qualifies
+
+    @asynccontextmanager
+    async def route(
+        self, model: str, key: str, exclude: frozenset[str] = frozenset(),
+    ) -> AsyncIterator[Backend]:
+        """Hold an outstanding-request slot on the chosen backend.
+
+        Transport errors count towards ejection; report responses with
+        :meth:`record_response`.
+        """
+        backend = self.choose(model, key, exclude)
+        backend.outstanding += 1
+        try:
+            yield backend
+        except httpx.TransportError:
+            self.record_failure(backend)
+            raise
+        finally:
+            backend.outstanding -= 1
+
+    def record_response(self, backend: Backend, model: str, status_code: int) -> None:
+        """Account a response: 5xx counts as a failure, success marks *model* loaded."""
+        if status_code >= 500:
+            self.record_failure(backend)
+            return
+        backend.failures = 0
+        backend.served += 1
+        if status_code < 400:
+            backend.loaded.add(model)
+
+    def stats(self) -> list[dict[str, object]]:
+        """State of every backend."""
+        return [b.state() for b in self.backends]
+
+    async def close(self) -> None:
+        """Stop probing and close all HTTP clients."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        for backend in self.backends:
+            await backend.client.aclose()
+
+
+def pool_from_config(cfg: NSSConfig) -> BackendPool | None:
+    """Build the pool from ``NSS_OLLAMA_BASE_URLS`` (``None`` if unset)."""
+    urls = [u.strip() for u in cfg.ollama_base_urls.split(",") if u.strip()]
+    if not urls:
+        return None
+    return BackendPool(
+        urls,
+        health_interval_s=cfg.ollama_health_interval_s,
+        eject_after=cfg.ollama_eject_after,
+        sticky_slack=cfg.ollama_sticky_slack,
+    )
@@ -0,0 +1,108 @@
+"""Circuit breaker around Ollama calls.
+
+Counts consecutive failed calls (timeouts, connection errors, HTTP 5xx).
+After ``failure_threshold`` of them the circuit **opens**: calls fail
+immediately with :class:`CircuitOpenError` instead of waiting for the
+HTTP timeout, and the gateway switches to its degraded mode (rules and
+embedding SENTINEL, heuristic MARS, cached answers or 503).  After
+``reset_timeout_s`` the circuit is **half-open** and lets one trial call
+through; its success closes the circuit, its failure re-opens it.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Literal
+
+import structlog
+
+from nss.metrics import nss_llm_circuit_open, nss_llm_circuit_opened
+
+logger = structlog.get_logger(__name__)
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+class CircuitOpenError(Exception):
+    """An LLM call was rejected because the circuit is open."""
+
+    def __init__(self, retry_after_s: float) -> None:
+        super().__init__(f"LLM circuit open; retry in {retry_after_s:.1f}s")
+        self.retry_after_s = retry_after_s
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    Parameters:
+        failure_threshold: Consecutive failures that open the circuit.
+        reset_timeout_s: Seconds the circuit stays open before a trial call.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_s: float = 30.0) -> None:
+        self._threshold = max(1, failure_threshold)
+        self._reset_s = reset_timeout_s
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state (``open`` turns ``half_open`` once the reset timeout passed)."""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self._reset_s:
+            return "half_open"
+        return "open"
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently rejected without a trial."""
+        return self.state == "open"
+
+    def retry_after(self) -> float:
+        """Seconds until the next trial call is allowed."""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._reset_s - (time.monotonic() - self._opened_at))
+
+    def before_call(self) -> None:
+        """Admit a call or reject it.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with the
+                trial call already in flight.
+        """
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        raise CircuitOpenError(max(self.retry_after(), 1.0))
+
+    def record_success(self) -> None:
+        """A call succeeded: close the circuit."""
+        if self._opened_at is not None:
+            logger.info("llm_circuit_closed")
+            nss_llm_circuit_open.set(0)
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """A call failed: open the circuit at the threshold (or after a failed trial)."""
+        self._failures += 1
+        if self._trial_in_flight or (
+            self._opened_at is None and self._failures >= self._threshold
+        ):
+            if self._opened_at is None:
+                nss_llm_circuit_opened.inc()
+                logger.warning("llm_circuit_opened", failures=self._failures)
+            self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+            nss_llm_circuit_open.set(1)
+
+    def release_trial(self) -> None:
+        """Forget an in-flight trial whose outcome says nothing about Ollama."""
+        self._trial_in_flight = False
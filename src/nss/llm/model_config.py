@@ -3,9 +3,16 @@
 from __future__ import annotations
 
 from enum import Enum
+from typing import Any
 
+import structlog
 from pydantic import BaseModel
 
+from nss.metrics import nss_classifier_input_truncated
+from nss.timing import annotate
+
+logger = structlog.get_logger(__name__)
+
 
 class ModelTier(str, Enum):
     """Available model performance tiers."""
@@ -44,3 +51,102 @@ AVAILABLE_MODELS: dict[str, ModelConfig] = {
         temperature=0.7,
     ),
 }
+
+
+class GenerationProfile(BaseModel):
+    """Named set of Ollama request options for one kind of call.
+
+    Unset (``None``) fields are omitted from the request so that the
+    Ollama server / Modelfile defaults apply.
+
+    Attributes:
+        name: Profile identifier (used for logging).
+        temperature: Sampling temperature.
+        num_predict: Maximum number of tokens to generate.
+        num_ctx: Context window size in tokens.
+        format: Output format constraint (``"json"`` enables JSON mode).
+        keep_alive: How long Ollama keeps the model loaded (e.g. ``"30m"``).
+        lane: :class:`~nss.llm.scheduler.LLMScheduler` lane; ``None`` uses
+            the lane of the current request.
+    """
+
+    name: str
+    temperature: float | None = None
+    num_predict: int | None = None
+    num_ctx: int | None = None
+    format: str | None = None
+    keep_alive: str | None = None
+    lane: str | None = None
+
+    def options(self) -> dict[str, Any]:
+        """Return the ``options`` block for an ``/api/generate`` payload."""
+        opts = {
+            "temperature": self.temperature,
+            "num_predict": self.num_predict,
+            "num_ctx": self.num_ctx,
+        }
+        return {k: v for k, v in opts.items() if v is not None}
+
+
+# Default profile for user-facing generation: server defaults apply.
+GENERATION_PROFILE = GenerationProfile(name="generation")
+
+# Context of guardian classifier calls.  Gateway inputs are capped at the
+# PNC budget of 4096 estimated tokens (~3150 words); at a conservative
+# 3 characters per token that needs ~6300 tokens, plus the prompt template
+# and the answer.  Longer inputs (direct guardian API calls) are truncated
+# explicitly by :func:`fit_classifier_input` rather than silently by Ollama.
+CLASSIFIER_NUM_CTX = 8192
+# Tokens reserved around the classified text: instructions and the answer.
+CLASSIFIER_PROMPT_RESERVE = 512
+_CHARS_PER_TOKEN = 3
+
+# Guardian classifier calls (MARS, SENTINEL): deterministic, JSON-only and
+# capped at a few dozen tokens so a rambling model cannot stall the pipeline.
+CLASSIFIER_PROFILE = GenerationProfile(
+    name="classifier",
+    temperature=0.0,
+    num_predict=48,
+    num_ctx=CLASSIFIER_NUM_CTX,
+    format="json",
+    keep_alive="30m",
+    lane="classifier",
+)
+
+PROFILES: dict[str, GenerationProfile] = {
+    GENERATION_PROFILE.name: GENERATION_PROFILE,
+    CLASSIFIER_PROFILE.name: CLASSIFIER_PROFILE,
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Conservative token count of *text* (3 characters per token)."""
+    return -(-len(text) // _CHARS_PER_TOKEN)
+
+
+def fit_classifier_input(text: str, component: str) -> str:
+    """Truncate *text* so a classifier prompt around it fits the context.
+
+    A truncation is logged, annotated on the request timeline and counted
+    in ``nss_classifier_input_truncated{component=...}``.
+
+    Args:
+        text: Text to classify.
+        component: Calling classifier (``mars``, ``sentinel``, ``fused``).
+
+    Returns:
+        *text*, cut to ``CLASSIFIER_NUM_CTX - CLASSIFIER_PROMPT_RESERVE``
+        estimated tokens if longer.
+    """
+    max_chars = (CLASSIFIER_NUM_CTX - CLASSIFIER_PROMPT_RESERVE) * _CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    nss_classifier_input_truncated.labels(component=component).inc()
+    annotate(classifier_input_truncated=True)
+    logger.warning(
+        "classifier_input_truncated",
+        component=component,
+        estimated_tokens=estimate_tokens(text),
+        kept_chars=max_chars,
+    )
+    return text[:max_chars]
@@ -6,11 +6,21 @@ application stays fully async without blocking the event loop.
 
 from __future__ import annotations
 
+import contextlib
+import json
 import re
+from typing import Any
 
 import httpx
 import structlog
 
+from nss.deadline import bounded, timeout_for
+from nss.llm.backend_pool import BackendPool, prefix_key
+from nss.llm.circuit_breaker import CircuitBreaker
+from nss.llm.model_config import GenerationProfile
+from nss.llm.scheduler import LLMScheduler, current_llm_context
+from nss.metrics import nss_llm_latency
+
 logger = structlog.get_logger(__name__)
 
 _DEFAULT_SYSTEM_PROMPT = (
@@ -18,6 +28,53 @@ _DEFAULT_SYSTEM_PROMPT = (
     "Nexus Sovereign Standard.  Always respect GDPR constraints."
 )
 
+_CONFIDENCE_TAG_RE = re.compile(r"\[CONFIDENCE:\s*([\d.]+)\]")
+
+
+def parse_json_response(raw: str) -> dict[str, Any]:
+    """Strictly parse a JSON-mode model response into a dict.
+
+    No regex scraping or prose tolerance: the whole response must be a
+    single JSON object (surrounding whitespace is allowed).
+
+    Raises:
+        ValueError: If *raw* is not valid JSON or not a JSON object.
+    """
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Model response is not valid JSON: {exc.msg}") from exc
+    if not isinstance(data, dict):
+        raise ValueError("Model response is not a JSON object.")
+    return data
+
+
+def parse_confidence_tag(raw: str) -> tuple[str, float]:
+    """Extract and strip the ``[CONFIDENCE: <value>]`` tag from a response.
+
+    Returns:
+        ``(clean_text, confidence)``; confidence defaults to ``0.5`` when
+        the tag is missing or malformed and is clamped to [0, 1].
+    """
+    confidence = 0.5
+    match = _CONFIDENCE_TAG_RE.search(raw)
+    if match:
+        try:
+            confidence = min(max(float(match.group(1)), 0.0), 1.0)
+        except ValueError:
+            pass
+
+    # Strip the tag(s) and the whitespace before them from the user-visible
+    # response.  A leading ``\s*`` in the regex would be retried from every
+    # offset of a long whitespace run (quadratic), so trim with rstrip().
+    pieces: list[str] = []
+    pos = 0
+    for m in _CONFIDENCE_TAG_RE.finditer(raw):
+        pieces.append(raw[pos:m.start()].rstrip())
+        pos = m.end()
+    pieces.append(raw[pos:])
+    return "".join(pieces).strip(), confidence
+
 
 class OllamaClient:
     """Thin async wrapper around the Ollama ``/api/generate`` endpoint.
@@ -27,6 +84,14 @@ class OllamaClient:
         default_model: Model tag used when no explicit model is passed to
             :meth:`generate`.
         timeout: HTTP request timeout in seconds.
+        classifier_timeout: Timeout for classifier-lane calls (MARS,
+            SENTINEL); defaults to *timeout*.
+        breaker: Optional :class:`~nss.llm.circuit_breaker.CircuitBreaker`;
+            when open, :meth:`generate` fails immediately.
+        scheduler: Optional :class:`~nss.llm.scheduler.LLMScheduler`; when
+            set, every :meth:`generate` call holds one of the model's slots.
+        pool: Optional :class:`~nss.llm.backend_pool.BackendPool`; when set,
+            calls are routed across its backends instead of *base_url*.
     """
 
     def __init__(
@@ -34,9 +99,18 @@ class OllamaClient:
         base_url: str = "http://localhost:11434",
         default_model: str = "mistral:7b-instruct-v0.3",
         timeout: float = 120.0,
+        scheduler: LLMScheduler | None = None,
+        pool: BackendPool | None = None,
+        classifier_timeout: float | None = None,
+        breaker: CircuitBreaker | None = None,
     ) -> None:
         self.base_url = base_url.rstrip("/")
         self.default_model = default_model
+        self.scheduler = scheduler
+        self.breaker = breaker
+        self._timeout = timeout
+        self._classifier_timeout = classifier_timeout or timeout
+        self.pool = pool
         self._client = httpx.AsyncClient(base_url=self.base_url, timeout=timeout)
 
     # -- public API ------------------------------------------------------
@@ -46,6 +120,7 @@ class OllamaClient:
         prompt: str,
         model: str | None = None,
         system_prompt: str | None = None,
+        profile: GenerationProfile | None = None,
     ) -> str:
         """Generate a completion from the Ollama API.
 
@@ -53,9 +128,18 @@ class OllamaClient:
             prompt: The user prompt to send to the model.
             model: Override the default model tag.
             system_prompt: Optional system prompt prepended to the conversation.
+            profile: Optional :class:`GenerationProfile` supplying request
+                options (``format``, ``num_predict``, ``temperature``,
+                ``num_ctx``, ``keep_alive``) and the scheduler lane.
 
         Returns:
             The generated text response.
+
+        Raises:
+            LLMQueueTimeoutError: If a scheduler is set and no slot frees up in
+                time.
+            CircuitOpenError: If the circuit breaker is open.
+            DeadlineExceededError: If the request deadline runs out first.
         """
         payload: dict[str, object] = {
             "model": model or self.default_model,
@@ -63,11 +147,73 @@ class OllamaClient:
             "system": system_prompt or _DEFAULT_SYSTEM_PROMPT,
             "stream": False,
         }
-        response = await self._client.post("/api/generate", json=payload)
+        if profile is not None:
+            options = profile.options()
+            if options:
+                payload["options"] = options
+            if profile.format:
+                payload["format"] = profile.format
+            if profile.keep_alive:
+                payload["keep_alive"] = profile.keep_alive
+        classifier = profile is not None and profile.lane == "classifier"
+        timeout = self._classifier_timeout if classifier else self._timeout
+        timeout_for("ollama", timeout)  # fail fast once the request budget is spent
+        if self.breaker is not None:
+            self.breaker.before_call()
+        try:
+            async with self._slot(str(payload["model"]), profile):
+                with nss_llm_latency.labels(model=str(payload["model"])).time():
+                    response = await bounded(self._post(payload, timeout), "ollama", timeout)
+        except httpx.TransportError:
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            raise
+        except BaseException:
+            if self.breaker is not None:
+                self.breaker.release_trial()  # queue timeout, deadline or cancellation
+            raise
+        if self.breaker is not None:
+            if response.status_code >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
         response.raise_for_status()
         data: dict[str, object] = response.json()
         return str(data.get("response", ""))
 
+    async def _post(self, payload: dict[str, object], timeout: float) -> httpx.Response:
+        """POST *payload* to ``/api/generate`` on the routed backend."""
+        if self.pool is None:
+            return await self._client.post("/api/generate", json=payload, timeout=timeout)
+        model = str(payload["model"])
+        key = prefix_key(model, str(payload["system"]), str(payload["prompt"]))
+        tried: frozenset[str] = frozenset()
+        while True:
+            async with self.pool.route(model, key, exclude=tried) as backend:
+                try:
+                    response = await backend.client.post(
+                        "/api/generate", json=payload, timeout=timeout,
+                    )
+                except httpx.ConnectError:
+                    # The request never reached the backend: retry once elsewhere.
+                    if tried or len(self.pool.backends) < 2:
+                        raise
+                    self.pool.record_failure(backend)
+                    tried = frozenset({backend.url})
+                    continue
+            self.pool.record_response(backend, model, response.status_code)
+            return response
+
+    def _slot(
+        self, model: str, profile: GenerationProfile | None,
+    ) -> contextlib.AbstractAsyncContextManager[None]:
+        """Scheduler slot for one call (no-op without a scheduler)."""
+        if self.scheduler is None:
+            return contextlib.nullcontext()
+        context = current_llm_context()
+        lane = profile.lane if profile is not None and profile.lane else context.lane
+        return self.scheduler.slot(model, lane=lane, user=context.user, weight=context.weight)
+
     async def generate_with_confidence(
         self,
         prompt: str,
@@ -90,25 +236,17 @@ class OllamaClient:
             "format [CONFIDENCE: <value>] where <value> is a float between 0 and 1."
         )
         raw = await self.generate(augmented_prompt, model=model)
-
-        # Try to extract confidence tag
-        confidence = 0.5
-        match = re.search(r"\[CONFIDENCE:\s*([\d.]+)\]", raw)
-        if match:
-            try:
-                confidence = min(max(float(match.group(1)), 0.0), 1.0)
-            except ValueError:
-                pass
-
-        # Strip the confidence tag from the user-visible response
-        clean = re.sub(r"\s*\[CONFIDENCE:\s*[\d.]+\]", "", raw).strip()
-        return clean, confidence
+        return parse_confidence_tag(raw)
 
     async def health_check(self) -> bool:
         """Return ``True`` if the Ollama server is reachable.
 
-        Calls ``GET /api/tags`` which is a lightweight endpoint.
+        Calls ``GET /api/tags`` which is a lightweight endpoint; with a
+        backend pool, re-probes it and reports whether any backend is up.
         """
+        if self.pool is not None:
+            await self.pool.refresh()
+            return self.pool.any_healthy()
         try:
             resp = await self._client.get("/api/tags")
             return resp.status_code == 200
@@ -119,5 +257,7 @@ class OllamaClient:
     # -- lifecycle -------------------------------------------------------
 
     async def close(self) -> None:
-        """Close the underlying HTTP client."""
+        """Close the underlying HTTP client (and the backend pool, if any)."""
         await self._client.aclose()
+        if self.pool is not None:
+            await self.pool.close()
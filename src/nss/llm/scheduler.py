@@ -0,0 +1,333 @@
+"""Bounded, priority-aware admission of Ollama calls.
+
+:class:`LLMScheduler` caps the number of in-flight calls per model and
+Ollama backend (match it to ``OLLAMA_NUM_PARALLEL``) and queues the rest.
+With a :class:`~nss.llm.backend_pool.BackendPool`, a model's slots are
+multiplied by the healthy backends a call to it can be routed to
+(:meth:`~nss.llm.backend_pool.BackendPool.replicas`), so adding backends
+adds throughput.  Queued calls are admitted by lane, then fairly across
+users:
+
+* **Lanes** are strict priorities: ``classifier`` (MARS, SENTINEL, fused
+  guardian calls) before ``interactive`` before ``generation`` before
+  ``batch``.  A generation call's lane is chosen per role or privacy tier
+  (:func:`lane_for`); classifier profiles always use ``classifier``.
+* **Within a lane**, start-time fair queuing: each call is tagged with
+  ``max(lane virtual time, user's previous tag) + 1 / weight`` and the
+  smallest tag goes next, so one user's burst cannot starve the others
+  and a user with weight 2 gets twice the share of a user with weight 1.
+
+A call that waits longer than ``queue_timeout_s`` raises
+:class:`LLMQueueTimeoutError`; the gateway answers it with a fast 503 instead of
+letting the request pile up behind a saturated model.
+
+The calling user, lane and weight travel in a contextvar set by the
+gateway (:func:`set_llm_context`), so guardian classes need no extra
+arguments.  Time spent queued is recorded as the ``llm_queue`` stage of the
+request timeline (:mod:`nss.timing`), so flight-recorder dumps separate
+queueing from inference.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+
+import structlog
+
+from nss.config import NSSConfig
+from nss.deadline import expired, record_queue_wait, timeout_for
+from nss.metrics import nss_llm_queue_depth, nss_llm_queue_timeouts, nss_llm_queue_wait
+from nss.timing import current_timeline
+
+logger = structlog.get_logger(__name__)
+
+# Lanes in priority order (first = highest).
+LANES = ("classifier", "interactive", "generation", "batch")
+
+
+class LLMQueueTimeoutError(Exception):
+    """An LLM call waited longer than the scheduler's queue timeout."""
+
+    def __init__(self, model: str, lane: str, waited_s: float) -> None:
+        super().__init__(f"LLM queue timeout for {model} ({lane}) after {waited_s:.2f}s")
+        self.model = model
+        self.lane = lane
+        self.waited_s = waited_s
+
+
+@dataclass(frozen=True)
+class LLMContext:
+    """Scheduling identity of the current request.
+
+    Attributes:
+        user: User the call is accounted to (fair-queuing flow).
+        lane: Lane for generation calls; classifier calls ignore it.
+        weight: Fair-queuing weight of *user* (> 0).
+    """
+
+    user: str = ""
+    lane: str = "generation"
+    weight: float = 1.0
+
+
+_DEFAULT_CONTEXT = LLMContext()
+_llm_context: ContextVar[LLMContext | None] = ContextVar("nss_llm_context", default=None)
+
+
+def set_llm_context(context: LLMContext) -> Token[LLMContext | None]:
+    """Install *context* for the current request.
+
+    Returns:
+        The token to pass to :func:`reset_llm_context`.
+    """
+    return _llm_context.set(context)
+
+
+def reset_llm_context(token: Token[LLMContext | None]) -> None:
+    """Restore the context from before :func:`set_llm_context`."""
+    _llm_context.reset(token)
+
+
+def current_llm_context() -> LLMContext:
+    """Return the scheduling identity of the current request."""
+    return _llm_context.get() or _DEFAULT_CONTEXT
+
+
+def parse_mapping(spec: str) -> dict[str, str]:
+    """Parse ``"key=value,key=value"`` (blank entries are ignored).
+
+    Raises:
+        ValueError: If an entry has no ``=``.
+    """
+    mapping: dict[str, str] = {}
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        key, sep, value = entry.partition("=")
+        if not sep:
+            raise ValueError(f"Expected key=value, got {entry!r}")
+        mapping[key.strip()] = value.strip()
+    return mapping
+
+
+def lane_for(
+    role: str,
+    privacy_tier: int,
+    role_lanes: dict[str, str],
+    tier_lanes: dict[str, str],
+) -> str:
+    """Lane for a generation call: role mapping first, then privacy tier.
+
+    Unknown lane names fall back to ``generation``.
+    """
+    lane = role_lanes.get(role) or tier_lanes.get(str(privacy_tier)) or "generation"
+    return lane if lane in LANES else "generation"
+
+
+def context_for(cfg: NSSConfig, user: str, role: str, privacy_tier: int) -> LLMContext:
+    """Scheduling identity of a request from the ``NSS_LLM_*`` settings."""
+    weights = parse_mapping(cfg.llm_role_weights)
+    role_lanes = parse_mapping(cfg.llm_role_lanes)
+    tier_lanes = parse_mapping(cfg.llm_tier_lanes)
+    return LLMContext(
+        user=user,
+        lane=lane_for(role, privacy_tier, role_lanes, tier_lanes),
+        weight=max(float(weights.get(role, 1.0)), 1e-6),
+    )
+
+
+@dataclass(order=True)
+class _Waiter:
+    tag: float
+    seq: int
+    future: asyncio.Future[None] = field(compare=False)
+
+
+class _ModelQueue:
+    """Slots and per-lane fair queues of one model."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.active = 0
+        self.queues: dict[str, list[_Waiter]] = {lane: [] for lane in LANES}
+        self.vtime: dict[str, float] = dict.fromkeys(LANES, 0.0)
+        self.finish: dict[str, dict[str, float]] = {lane: {} for lane in LANES}
+
+    def queued(self) -> int:
+        return sum(not w.future.done() for q in self.queues.values() for w in q)
+
+    def enqueue(self, lane: str, user: str, weight: float, seq: int) -> asyncio.Future[None]:
+        tag = max(self.vtime[lane], self.finish[lane].get(user, 0.0)) + 1.0 / weight
+        self.finish[lane][user] = tag
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.queues[lane], _Waiter(tag, seq, future))
+        return future
+
+    def dispatch(self) -> None:
+        """Hand free slots to the next waiters (highest lane, smallest tag)."""
+        for lane in LANES:
+            queue = self.queues[lane]
+            while queue and self.active < self.limit:
+                waiter = heapq.heappop(queue)
+                if waiter.future.done():  # timed out or cancelled
+                    continue
+                self.vtime[lane] = waiter.tag
+                self.active += 1
+                waiter.future.set_result(None)
+            if not queue:
+                # Lane drained: restart virtual time so tags stay small.
+                self.vtime[lane] = 0.0
+                self.finish[lane].clear()
+
+
+class LLMScheduler:
+    """Per-model concurrency limits with priority lanes and fair queuing.
+
+    Parameters:
+        default_concurrency: In-flight calls per model and backend unless
+            overridden.
+        model_concurrency: Per-model overrides (model tag -> slots per
+            backend).
+        queue_timeout_s: Longest a call may wait for a slot.
+        replicas: Number of backends serving a model (e.g.
+            :meth:`~nss.llm.backend_pool.BackendPool.replicas`); ``None``
+            means a single backend.
+    """
+
+    def __init__(
+        self,
+        default_concurrency: int = 4,
+        model_concurrency: dict[str, int] | None = None,
+        queue_timeout_s: float = 10.0,
+        replicas: Callable[[str], int] | None = None,
+    ) -> None:
+        self._default = max(1, default_concurrency)
+        self._overrides = {k: max(1, v) for k, v in (model_concurrency or {}).items()}
+        self._timeout = queue_timeout_s
+        self._replicas = replicas
+        self._models: dict[str, _ModelQueue] = {}
+        self._seq = itertools.count()
+
+    def _limit(self, model: str) -> int:
+        per_backend = self._overrides.get(model, self._default)
+        if self._replicas is None:
+            return per_backend
+        return per_backend * max(1, self._replicas(model))
+
+    def _queue(self, model: str) -> _ModelQueue:
+        queue = self._models.get(model)
+        if queue is None:
+            queue = self._models[model] = _ModelQueue(self._limit(model))
+        elif self._replicas is not None:
+            limit = self._limit(model)
+            if limit != queue.limit:  # backends ejected or readmitted
+                queue.limit = limit
+                queue.dispatch()
+        return queue
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """In-flight and queued calls per model."""
+        return {
+            model: {"active": q.active, "queued": q.queued(), "limit": q.limit}
+            for model, q in self._models.items()
+        }
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        model: str,
+        lane: str = "generation",
+        user: str = "",
+        weight: float = 1.0,
+    ) -> AsyncIterator[None]:
+        """Hold one of *model*'s slots for the duration of the block.
+
+        Args:
+            model: Model tag the call targets.
+            lane: Priority lane (one of :data:`LANES`).
+            user: Fair-queuing flow the call is accounted to.
+            weight: Share of *user* relative to other users in the lane.
+
+        Raises:
+            LLMQueueTimeoutError: If no slot frees up within the queue timeout.
+            DeadlineExceededError: If the request deadline runs out first.
+        """
+        if lane not in LANES:
+            lane = "generation"
+        queue = self._queue(model)
+        if queue.active < queue.limit and not queue.queued():
+            queue.active += 1
+            nss_llm_queue_wait.labels(lane=lane).observe(0.0)
+        else:
+            await self._wait(queue, model, lane, user, max(weight, 1e-6))
+        try:
+            yield
+        finally:
+            queue.active -= 1
+            queue.dispatch()
+
+    async def _wait(
+        self, queue: _ModelQueue, model: str, lane: str, user: str, weight: float,
+    ) -> None:
+        timeout = timeout_for("llm_queue", self._timeout)
+        started = time.perf_counter()
+        future = queue.enqueue(lane, user, weight, next(self._seq))
+        queue.dispatch()
+        nss_llm_queue_depth.inc()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        except TimeoutError:
+            waited = time.perf_counter() - started
+            if future.done() and not future.cancelled():
+                return  # granted as the timeout fired; keep the slot
+            future.cancel()
+            if timeout is not None and timeout < self._timeout:
+                raise expired("llm_queue") from None
+            nss_llm_queue_timeouts.inc()
+            logger.warning("llm_queue_timeout", model=model, lane=lane, waited_s=round(waited, 3))
+            raise LLMQueueTimeoutError(model, lane, waited) from None
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                queue.active -= 1  # granted but the caller is gone
+                queue.dispatch()
+            else:
+                future.cancel()
+            raise
+        finally:
+            ended = time.perf_counter()
+            waited = ended - started
+            record_queue_wait(waited)
+            timeline = current_timeline()
+            if timeline is not None:
+                timeline.record("llm_queue", started, ended)
+            nss_llm_queue_depth.dec()
+            nss_llm_queue_wait.labels(lane=lane).observe(waited * 1000)
+
+
+def scheduler_from_config(
+    cfg: NSSConfig, replicas: Callable[[str], int] | None = None,
+) -> LLMScheduler | None:
+    """Build the scheduler from the ``NSS_LLM_*`` settings (``None`` if disabled).
+
+    Args:
+        cfg: Configuration.
+        replicas: Backends serving a model (see :class:`LLMScheduler`).
+    """
+    if not cfg.llm_scheduler_enabled:
+        return None
+    return LLMScheduler(
+        default_concurrency=cfg.llm_max_concurrency,
+        model_concurrency={
+            model: int(n) for model, n in parse_mapping(cfg.llm_model_concurrency).items()
+        },
+        queue_timeout_s=cfg.llm_queue_timeout_s,
+        replicas=replicas,
+    )
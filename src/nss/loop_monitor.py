@@ -0,0 +1,110 @@
+"""Event-loop lag monitor and blocking-call detector.
+
+A background task sleeps for ``interval_s`` and measures how late it wakes
+up; the delay is the time the loop spent running other callbacks without
+yielding.  Every sample is observed in ``nss_event_loop_lag_ms`` and
+samples above ``stall_threshold_ms`` count as ``nss_event_loop_stalls``.
+
+In debug mode a watchdog thread additionally checks the monitor's
+heartbeat.  When the loop has not ticked for ``interval_s +
+stall_threshold_ms`` it captures the loop thread's current stack -- the
+blocking callback itself, e.g. a sync Redis call inside an ``async def``
+handler -- and logs it as ``event_loop_blocked``.  Stack capture uses
+``sys._current_frames`` and costs nothing while the loop is healthy.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+
+import structlog
+
+from nss.metrics import nss_event_loop_lag, nss_event_loop_stalls
+
+logger = structlog.get_logger(__name__)
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag and (in debug mode) reports blocking stacks.
+
+    Parameters:
+        interval_s: Sampling interval; ``0`` disables the monitor.
+        stall_threshold_ms: Lag above which a sample counts as a stall.
+        debug: Run the watchdog thread that logs the stack of blocking
+            callbacks.
+    """
+
+    def __init__(
+        self,
+        interval_s: float = 0.1,
+        stall_threshold_ms: float = 100.0,
+        debug: bool = False,
+    ) -> None:
+        self._interval_s = interval_s
+        self._threshold_s = stall_threshold_ms / 1000
+        self._debug = debug
+        self._task: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._loop_thread_id = 0
+        self._heartbeat = 0.0
+        self._reported = False
+        self.last_blocked_stack: str | None = None
+
+    def start(self) -> None:
+        """Start sampling on the running loop (and the watchdog in debug mode)."""
+        if self._interval_s <= 0 or self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        if self._debug:
+            self._watchdog = threading.Thread(
+                target=self._watch, name="nss-loop-watchdog", daemon=True,
+            )
+            self._watchdog.start()
+        logger.info("loop_monitor_started", interval_s=self._interval_s, debug=self._debug)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            before = loop.time()
+            await asyncio.sleep(self._interval_s)
+            lag_s = max(0.0, loop.time() - before - self._interval_s)
+            self._heartbeat = time.monotonic()
+            self._reported = False
+            nss_event_loop_lag.observe(lag_s * 1000)
+            if lag_s >= self._threshold_s:
+                nss_event_loop_stalls.inc()
+
+    def _watch(self) -> None:
+        limit = self._interval_s + self._threshold_s
+        while not self._stopped.wait(self._threshold_s / 2):
+            behind = time.monotonic() - self._heartbeat
+            if behind < limit or self._reported:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._reported = True
+            self.last_blocked_stack = "".join(traceback.format_stack(frame))
+            logger.warning(
+                "event_loop_blocked",
+                blocked_ms=round(behind * 1000, 1),
+                stack=self.last_blocked_stack,
+            )
+
+    def stop(self) -> None:
+        """Stop sampling and the watchdog."""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
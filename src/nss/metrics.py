@@ -1,52 +1,292 @@
 """Lightweight metrics registry for NSS observability.
 
-Provides Counter and Histogram classes with a snapshot export,
+Provides Counter, Gauge and Histogram classes with a snapshot export,
 avoiding external Prometheus dependencies for the reference implementation.
+
+Histograms keep cumulative-compatible bucket counts for the Prometheus
+exposition and a :class:`QuantileSketch` for p50/p95/p99 in the JSON
+snapshot.  Both are mergeable, so per-process state can be aggregated.
+Histograms may declare ``labelnames``; observations then go through
+:meth:`Histogram.labels`.
+
+:func:`export_state` serialises the registry and :func:`merge_states`
+combines the states of several processes (see :mod:`nss.metrics_store`).
 """
 
 from __future__ import annotations
 
-import time
+import bisect
+import math
 import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from typing import Any
 
 
 class Counter:
-    """Thread-safe monotonic counter."""
+    """Thread-safe monotonic counter.
+
+    Parameters:
+        name: Metric name.
+        description: Help text.
+        labelnames: Label names; when given, count through :meth:`labels`
+            (the parent holds no data itself).
+    """
+
+    def __init__(
+        self, name: str, description: str = "", labelnames: tuple[str, ...] = (),
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], Counter] = {}
+        self._value: float = 0.0
+        self._lock = threading.Lock()
+
+    def labels(self, **labels: str) -> Counter:
+        """Return the child counter for *labels* (created on first use)."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, Counter(self.name, self.description))
+        return child
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def series(self) -> list[tuple[dict[str, str], Counter]]:
+        """``(labels, counter)`` pairs holding data (self when unlabelled)."""
+        if not self.labelnames:
+            return [({}, self)]
+        return [
+            (dict(zip(self.labelnames, key, strict=True)), child)
+            for key, child in sorted(self._children.items())
+        ]
+
+    def state(self) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "type": "counter",
+            "name": self.name,
+            "description": self.description,
+            "value": self._value,
+        }
+        if self.labelnames:
+            data["labelnames"] = list(self.labelnames)
+            data["series"] = [
+                {"labels": list(labels.values()), "value": child.value}
+                for labels, child in self.series()
+            ]
+        return data
 
-    def __init__(self, name: str, description: str = "") -> None:
+
+class Gauge:
+    """Thread-safe value that can go up and down.
+
+    Parameters:
+        name: Metric name.
+        description: Help text.
+        aggregate: How values from several processes combine: ``"sum"``,
+            ``"max"`` or ``"mean"``.
+    """
+
+    def __init__(self, name: str, description: str = "", aggregate: str = "sum") -> None:
+        if aggregate not in ("sum", "max", "mean"):
+            raise ValueError(f"Unknown gauge aggregation: {aggregate}")
         self.name = name
         self.description = description
+        self.aggregate = aggregate
         self._value: float = 0.0
         self._lock = threading.Lock()
 
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
     def inc(self, amount: float = 1.0) -> None:
         with self._lock:
             self._value += amount
 
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value -= amount
+
     @property
     def value(self) -> float:
         return self._value
 
+    def state(self) -> dict[str, Any]:
+        return {
+            "type": "gauge",
+            "name": self.name,
+            "description": self.description,
+            "aggregate": self.aggregate,
+            "value": self._value,
+        }
+
+
+DEFAULT_LATENCY_BUCKETS_MS: tuple[float, ...] = (
+    1, 5, 10, 25, 50, 100, 200, 300, 500, 750, 1000, 2000, 5000, 10000, 30000,
+)
+SIZE_BUCKETS: tuple[float, ...] = (1, 2, 4, 8, 16, 32, 64)
+LOOP_LAG_BUCKETS_MS: tuple[float, ...] = (
+    0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000,
+)
+
+
+class QuantileSketch:
+    """Streaming quantile sketch with bounded relative error (DDSketch-style).
+
+    Values are counted in logarithmic bins ``(gamma^(i-1), gamma^i]`` with
+    ``gamma = (1 + alpha) / (1 - alpha)``, so any reported quantile is within
+    *alpha* relative error of the true value.  The bin count grows with the
+    logarithm of the value range (about 900 bins for 0.01 ms .. 1000 s at
+    1 %), not with the number of observations.  Sketches with the same
+    *alpha* merge exactly by adding bin counts.
+
+    Parameters:
+        alpha: Relative accuracy (default 1 %).
+    """
+
+    def __init__(self, alpha: float = 0.01) -> None:
+        self.alpha = alpha
+        self._gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self._gamma)
+        self.bins: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        """Record one (non-negative) observation."""
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.bins[index] = self.bins.get(index, 0) + 1
+
+    def quantile(self, q: float) -> float:
+        """Return the estimated *q*-quantile (``0 <= q <= 1``)."""
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                return self.value_at(index)
+        return self.value_at(max(self.bins))
+
+    def value_at(self, index: int) -> float:
+        """Representative value of bin *index* (within ``alpha`` of any member)."""
+        return 2 * self._gamma**index / (self._gamma + 1)
+
+    def merge(self, other: QuantileSketch) -> None:
+        """Add the observations of *other* (same ``alpha``) to this sketch."""
+        if other.alpha != self.alpha:
+            raise ValueError("Cannot merge sketches with different accuracy.")
+        for index, n in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+
 
 class Histogram:
-    """Simple histogram that tracks count, sum, min, max, and recent values."""
+    """Histogram with Prometheus buckets and streaming percentiles.
+
+    Tracks count, sum, min, max, per-bucket counts and a
+    :class:`QuantileSketch`.
 
-    def __init__(self, name: str, description: str = "") -> None:
+    Parameters:
+        name: Metric name.
+        description: Help text.
+        buckets: Upper bounds of the buckets (``+Inf`` is implicit).
+        labelnames: Label names; when given, observe through
+            :meth:`labels` (the parent holds no data itself).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str = "",
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS_MS,
+        labelnames: tuple[str, ...] = (),
+    ) -> None:
         self.name = name
         self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], Histogram] = {}
         self._count: int = 0
         self._sum: float = 0.0
         self._min: float = float("inf")
         self._max: float = 0.0
+        self._bucket_counts = [0] * (len(self.buckets) + 1)
+        self._sketch = QuantileSketch()
         self._lock = threading.Lock()
 
+    def labels(self, **labels: str) -> Histogram:
+        """Return the child histogram for *labels* (created on first use)."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(
+                    key, Histogram(self.name, self.description, self.buckets),
+                )
+        return child
+
+    def set_buckets(self, buckets: tuple[float, ...]) -> None:
+        """Replace the bucket bounds (for this histogram and its children).
+
+        Existing observations are re-bucketed from the quantile sketch, so
+        their placement is accurate to the sketch's relative error.
+        """
+        with self._lock:
+            self.buckets = tuple(sorted(buckets))
+            counts = [0] * (len(self.buckets) + 1)
+            counts[0] += self._sketch.zero_count
+            for index, n in self._sketch.bins.items():
+                value = self._sketch.value_at(index)
+                counts[bisect.bisect_left(self.buckets, value)] += n
+            self._bucket_counts = counts
+        for child in list(self._children.values()):
+            child.set_buckets(buckets)
+
     def observe(self, value: float) -> None:
+        if self.labelnames:
+            raise ValueError(f"{self.name} is labelled; use .labels(...).observe()")
+        index = bisect.bisect_left(self.buckets, value)
         with self._lock:
             self._count += 1
             self._sum += value
-            self._min = min(self._min, value)
-            self._max = max(self._max, value)
+            if value < self._min:
+                self._min = value
+            if value > self._max:
+                self._max = value
+            self._bucket_counts[index] += 1
+            self._sketch.add(value)
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the wall-clock duration of the ``with`` block in ms."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe((time.perf_counter() - start) * 1000)
 
     @property
     def count(self) -> int:
@@ -56,6 +296,81 @@ class Histogram:
     def avg(self) -> float:
         return self._sum / self._count if self._count else 0.0
 
+    def quantile(self, q: float) -> float:
+        """Estimated *q*-quantile of the observations."""
+        if not self._count:
+            return 0.0
+        return min(max(self._sketch.quantile(q), self._min), self._max)
+
+    def series(self) -> list[tuple[dict[str, str], Histogram]]:
+        """``(labels, histogram)`` pairs holding data (self when unlabelled)."""
+        if not self.labelnames:
+            return [({}, self)]
+        return [
+            (dict(zip(self.labelnames, key, strict=True)), child)
+            for key, child in sorted(self._children.items())
+        ]
+
+    def cumulative_buckets(self) -> list[tuple[float, int]]:
+        """``(upper_bound, cumulative_count)`` pairs ending with ``+Inf``."""
+        total = 0
+        out = []
+        for bound, n in zip((*self.buckets, math.inf), self._bucket_counts, strict=True):
+            total += n
+            out.append((bound, total))
+        return out
+
+    def state(self) -> dict[str, Any]:
+        """Serialisable state of this metric and all of its series."""
+        series = []
+        for labels, h in self.series():
+            with h._lock:
+                series.append({
+                    "labels": list(labels.values()),
+                    "count": h._count,
+                    "sum": h._sum,
+                    "min": h._min if h._count else 0.0,
+                    "max": h._max,
+                    "buckets": list(h._bucket_counts),
+                    "zero": h._sketch.zero_count,
+                    "bins": {str(i): n for i, n in h._sketch.bins.items()},
+                })
+        return {
+            "type": "histogram",
+            "name": self.name,
+            "description": self.description,
+            "buckets": list(self.buckets),
+            "labelnames": list(self.labelnames),
+            "series": series,
+        }
+
+    def merge_series(self, data: dict[str, Any], buckets: list[float]) -> None:
+        """Add one serialised series (from :meth:`state`) to this histogram.
+
+        Bucket counts recorded with different bounds are re-derived from the
+        series' sketch bins.
+        """
+        sketch = QuantileSketch(self._sketch.alpha)
+        sketch.bins = {int(i): n for i, n in data["bins"].items()}
+        sketch.zero_count = data["zero"]
+        sketch.count = data["count"]
+        with self._lock:
+            if not data["count"]:
+                return
+            self._count += data["count"]
+            self._sum += data["sum"]
+            self._min = min(self._min, data["min"])
+            self._max = max(self._max, data["max"])
+            self._sketch.merge(sketch)
+            if tuple(buckets) == self.buckets:
+                for i, n in enumerate(data["buckets"]):
+                    self._bucket_counts[i] += n
+            else:
+                self._bucket_counts[0] += sketch.zero_count
+                for index, n in sketch.bins.items():
+                    value = sketch.value_at(index)
+                    self._bucket_counts[bisect.bisect_left(self.buckets, value)] += n
+
     def snapshot(self) -> dict[str, float]:
         return {
             "count": self._count,
@@ -63,53 +378,301 @@ class Histogram:
             "min": self._min if self._count else 0.0,
             "max": self._max,
             "avg": self.avg,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
         }
 
 
+# Every exported metric, in export order.
+REGISTRY: list[Counter | Gauge | Histogram] = []
+
+
+def _register(metric: Any) -> Any:
+    REGISTRY.append(metric)
+    return metric
+
+
+def parse_buckets(spec: str) -> tuple[float, ...]:
+    """Parse comma-separated bucket bounds, e.g. ``"10,50,100,300"``.
+
+    Raises:
+        ValueError: If the spec is empty or contains a non-positive bound.
+    """
+    bounds = tuple(sorted({float(part) for part in spec.split(",") if part.strip()}))
+    if not bounds or bounds[0] <= 0:
+        raise ValueError(f"Invalid histogram buckets: {spec!r}")
+    return bounds
+
+
+def configure_latency_buckets(buckets: tuple[float, ...]) -> None:
+    """Replace the buckets of every registered latency histogram.
+
+    Only histograms still on :data:`DEFAULT_LATENCY_BUCKETS_MS` change;
+    those with dedicated buckets (batch sizes, loop lag) are left alone.
+    """
+    for metric in REGISTRY:
+        if isinstance(metric, Histogram) and metric.buckets == DEFAULT_LATENCY_BUCKETS_MS:
+            metric.set_buckets(buckets)
+
+
 # Pre-defined NSS metrics
-nss_requests_total = Counter("nss_requests_total", "Total requests processed")
-nss_requests_blocked = Counter("nss_requests_blocked", "Requests blocked by Guardian Shield")
-nss_pii_entities_redacted = Counter("nss_pii_entities_redacted", "PII entities redacted")
-nss_privacy_budget_consumed = Counter("nss_privacy_budget_consumed", "Total epsilon consumed")
-nss_request_latency = Histogram("nss_request_latency_ms", "End-to-end request latency in ms")
-nss_guardian_latency = Histogram("nss_guardian_latency_ms", "Guardian Shield processing latency in ms")
+nss_requests_total = _register(Counter("nss_requests_total", "Total requests processed"))
+nss_requests_blocked = _register(
+    Counter("nss_requests_blocked", "Requests blocked by Guardian Shield"),
+)
+nss_pii_entities_redacted = _register(
+    Counter("nss_pii_entities_redacted", "PII entities redacted"),
+)
+nss_privacy_budget_consumed = _register(
+    Counter("nss_privacy_budget_consumed", "Total epsilon consumed"),
+)
+nss_classifier_input_truncated = _register(Counter(
+    "nss_classifier_input_truncated", "Guardian classifier inputs cut to fit the LLM context",
+    labelnames=("component",),
+))
+nss_sentinel_llm_skipped = _register(Counter(
+    "nss_sentinel_llm_skipped", "SENTINEL LLM votes skipped by consensus short-circuit",
+))
+nss_guardian_cache_hits = _register(Counter(
+    "nss_guardian_cache_hits", "SENTINEL/MARS decisions served from the guardian cache",
+))
+nss_guardian_cache_misses = _register(Counter(
+    "nss_guardian_cache_misses", "SENTINEL/MARS cache lookups that required analysis",
+))
+nss_blocklist_hits = _register(Counter(
+    "nss_blocklist_hits", "Requests rejected by the blocked-prompt Bloom filter",
+))
+nss_blocklist_fill_ratio = _register(Gauge(
+    "nss_blocklist_fill_ratio", "Fraction of bits set in the current blocklist generation",
+    aggregate="max",
+))
+nss_blocklist_saturated = _register(Counter(
+    "nss_blocklist_saturated", "Blocked prompts not remembered because the filter is full",
+))
+nss_mars_batch_fallbacks = _register(Counter(
+    "nss_mars_batch_fallbacks", "MARS batches re-scored singly after a parse failure",
+))
+nss_mars_local_resolved = _register(Counter(
+    "nss_mars_local_resolved", "MARS requests resolved by the local fast-path classifier",
+))
+nss_mars_local_deferred = _register(Counter(
+    "nss_mars_local_deferred", "MARS requests deferred from the local classifier to the LLM",
+))
+nss_request_latency = _register(
+    Histogram("nss_request_latency_ms", "End-to-end request latency in ms"),
+)
+nss_guardian_latency = _register(
+    Histogram("nss_guardian_latency_ms", "Guardian Shield processing latency in ms"),
+)
+nss_request_duration = _register(Histogram(
+    "nss_request_duration_ms",
+    "Gateway request latency in ms by model, privacy tier and outcome",
+    labelnames=("model", "privacy_tier", "outcome"),
+))
+nss_stage_latency = _register(Histogram(
+    "nss_stage_latency_ms", "Per-stage pipeline latency in ms", labelnames=("stage",),
+))
+nss_llm_latency = _register(Histogram(
+    "nss_llm_latency_ms", "Ollama generation latency in ms by model", labelnames=("model",),
+))
+nss_mars_batch_size = _register(Histogram(
+    "nss_mars_batch_size", "Texts per batched MARS LLM call", buckets=SIZE_BUCKETS,
+))
+nss_event_loop_lag = _register(Histogram(
+    "nss_event_loop_lag_ms", "Event-loop wake-up delay in ms", buckets=LOOP_LAG_BUCKETS_MS,
+))
+nss_event_loop_stalls = _register(Counter(
+    "nss_event_loop_stalls", "Event-loop lag samples above the stall threshold",
+))
+nss_mars_batch_wait = _register(Histogram(
+    "nss_mars_batch_wait_ms", "Time a MARS request waited in the batching window in ms",
+))
+nss_llm_queue_depth = _register(Gauge(
+    "nss_llm_queue_depth", "LLM calls waiting for a scheduler slot",
+))
+nss_llm_queue_wait = _register(Histogram(
+    "nss_llm_queue_wait_ms", "Time an LLM call waited for a scheduler slot in ms by lane",
+    labelnames=("lane",),
+))
+nss_llm_queue_timeouts = _register(Counter(
+    "nss_llm_queue_timeouts", "LLM calls rejected after the scheduler queue timeout",
+))
+nss_ollama_backends_healthy = _register(Gauge(
+    "nss_ollama_backends_healthy", "Ollama backends currently admitted to the pool",
+    aggregate="max",
+))
+nss_ollama_backend_ejections = _register(Counter(
+    "nss_ollama_backend_ejections", "Ollama backends ejected after consecutive failures",
+))
+nss_llm_circuit_open = _register(Gauge(
+    "nss_llm_circuit_open", "1 while the Ollama circuit breaker is open", aggregate="max",
+))
+nss_llm_circuit_opened = _register(Counter(
+    "nss_llm_circuit_opened", "Times the Ollama circuit breaker opened",
+))
+nss_degraded_requests = _register(Counter(
+    "nss_degraded_requests", "Gateway requests served in degraded (rules-only) mode",
+))
+nss_deadline_exceeded = _register(Counter(
+    "nss_deadline_exceeded", "Requests whose deadline ran out, by the stage that hit it",
+    labelnames=("stage",),
+))
+nss_requests_abandoned = _register(Counter(
+    "nss_requests_abandoned", "Requests cancelled because the client disconnected",
+))
+nss_admission_limit = _register(Gauge(
+    "nss_admission_limit", "Adaptive concurrency limit of /v1/process",
+))
+nss_admission_inflight = _register(Gauge(
+    "nss_admission_inflight", "Admitted /v1/process requests in flight",
+))
+nss_admission_rejected = _register(Counter(
+    "nss_admission_rejected", "Requests shed by the adaptive concurrency limit, by lane",
+    labelnames=("lane",),
+))
+nss_async_jobs = _register(Counter(
+    "nss_async_jobs", "Asynchronous processing jobs by status (submitted, succeeded, failed)",
+    labelnames=("status",),
+))
+nss_async_jobs_pending = _register(Gauge(
+    "nss_async_jobs_pending", "Asynchronous jobs waiting for a worker",
+))
+nss_async_job_webhook_failures = _register(Counter(
+    "nss_async_job_webhook_failures", "Job completion webhooks not delivered after all attempts",
+))
+
+
+def _series_name(name: str, labels: dict[str, str]) -> str:
+    if not labels:
+        return name
+    inner = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    return f"{name}{{{inner}}}"
+
+
+def export_state() -> dict[str, Any]:
+    """Serialise every registered metric for cross-process aggregation."""
+    return {"timestamp": time.time(), "metrics": [m.state() for m in REGISTRY]}
+
+
+def merge_states(states: list[dict[str, Any]]) -> list[Counter | Gauge | Histogram]:
+    """Combine states from :func:`export_state` into fresh metric objects.
+
+    Counters and histograms are summed; gauges use their ``aggregate``
+    mode.  Metrics keep the order in which they first appear.
+    """
+    merged: dict[str, Counter | Gauge | Histogram] = {}
+    gauge_values: dict[str, list[float]] = {}
+    for state in states:
+        for data in state.get("metrics", []):
+            name, kind = data["name"], data["type"]
+            metric = merged.get(name)
+            if kind == "counter":
+                if not isinstance(metric, Counter):
+                    metric = merged[name] = Counter(
+                        name, data["description"], tuple(data.get("labelnames", ())),
+                    )
+                _merge_counter(metric, data)
+            elif kind == "gauge":
+                if not isinstance(metric, Gauge):
+                    merged[name] = Gauge(name, data["description"], data["aggregate"])
+                gauge_values.setdefault(name, []).append(data["value"])
+            else:
+                if not isinstance(metric, Histogram):
+                    metric = merged[name] = Histogram(
+                        name, data["description"],
+                        buckets=tuple(data["buckets"]),
+                        labelnames=tuple(data["labelnames"]),
+                    )
+                _merge_histogram(metric, data)
+    for name, values in gauge_values.items():
+        gauge = merged[name]
+        if isinstance(gauge, Gauge):
+            _merge_gauge(gauge, values)
+    return list(merged.values())
+
 
+def _merge_counter(counter: Counter, data: dict[str, Any]) -> None:
+    if not counter.labelnames:
+        counter.inc(data["value"])
+        return
+    for series in data.get("series", []):
+        labels = dict(zip(counter.labelnames, series["labels"], strict=True))
+        counter.labels(**labels).inc(series["value"])
 
-def metrics_snapshot() -> dict[str, Any]:
-    """Export all metrics as a JSON-serializable dict."""
+
+def _merge_histogram(histogram: Histogram, data: dict[str, Any]) -> None:
+    for series in data["series"]:
+        target = histogram
+        if histogram.labelnames:
+            labels = dict(zip(histogram.labelnames, series["labels"], strict=True))
+            target = histogram.labels(**labels)
+        target.merge_series(series, data["buckets"])
+
+
+def _merge_gauge(gauge: Gauge, values: list[float]) -> None:
+    if gauge.aggregate == "max":
+        gauge.set(max(values))
+    elif gauge.aggregate == "mean":
+        gauge.set(sum(values) / len(values))
+    else:
+        gauge.set(sum(values))
+
+
+def metrics_snapshot(metrics: list[Counter | Gauge | Histogram] | None = None) -> dict[str, Any]:
+    """Export all metrics as a JSON-serializable dict.
+
+    Labelled counter and histogram series are keyed ``name{label="value",...}``.
+
+    Args:
+        metrics: Metrics to export (e.g. from :func:`merge_states`);
+            defaults to this process's registry.
+    """
+    metrics = REGISTRY if metrics is None else metrics
+    histograms: dict[str, dict[str, float]] = {}
+    for h in metrics:
+        if isinstance(h, Histogram):
+            for labels, series in h.series():
+                histograms[_series_name(h.name, labels)] = series.snapshot()
     return {
         "timestamp": int(time.time()),
         "counters": {
-            "nss_requests_total": nss_requests_total.value,
-            "nss_requests_blocked": nss_requests_blocked.value,
-            "nss_pii_entities_redacted": nss_pii_entities_redacted.value,
-            "nss_privacy_budget_consumed": nss_privacy_budget_consumed.value,
-        },
-        "histograms": {
-            "nss_request_latency_ms": nss_request_latency.snapshot(),
-            "nss_guardian_latency_ms": nss_guardian_latency.snapshot(),
+            _series_name(c.name, labels): series.value
+            for c in metrics
+            if isinstance(c, Counter)
+            for labels, series in c.series()
         },
+        "gauges": {g.name: g.value for g in metrics if isinstance(g, Gauge)},
+        "histograms": histograms,
     }
 
 
-def prometheus_export() -> str:
-    """Export all metrics in Prometheus/OpenMetrics text format."""
-    _counters = [
-        nss_requests_total,
-        nss_requests_blocked,
-        nss_pii_entities_redacted,
-        nss_privacy_budget_consumed,
-    ]
-    _histograms = [nss_request_latency, nss_guardian_latency]
+def _format_bound(bound: float) -> str:
+    return "+Inf" if math.isinf(bound) else f"{bound:g}"
+
+
+def prometheus_export(metrics: list[Counter | Gauge | Histogram] | None = None) -> str:
+    """Export all metrics in Prometheus/OpenMetrics text format.
 
+    Args:
+        metrics: Metrics to export; defaults to this process's registry.
+    """
     lines: list[str] = []
-    for c in _counters:
-        lines.append(f"# HELP {c.name} {c.description}")
-        lines.append(f"# TYPE {c.name} counter")
-        lines.append(f"{c.name} {c.value}")
-    for h in _histograms:
-        lines.append(f"# HELP {h.name} {h.description}")
-        lines.append(f"# TYPE {h.name} histogram")
-        lines.append(f"{h.name}_count {h.count}")
-        lines.append(f"{h.name}_sum {h._sum}")
+    for metric in REGISTRY if metrics is None else metrics:
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        if isinstance(metric, Counter):
+            lines.append(f"# TYPE {metric.name} counter")
+            for labels, series in metric.series():
+                lines.append(f"{_series_name(metric.name, labels)} {series.value}")
+        elif isinstance(metric, Gauge):
+            lines.append(f"# TYPE {metric.name} gauge")
+            lines.append(f"{metric.name} {metric.value}")
+        else:
+            lines.append(f"# TYPE {metric.name} histogram")
+            for labels, histogram in metric.series():
+                for bound, total in histogram.cumulative_buckets():
+                    le = {**labels, "le": _format_bound(bound)}
+                    lines.append(f"{_series_name(metric.name + '_bucket', le)} {total}")
+                lines.append(f"{_series_name(metric.name + '_count', labels)} {histogram.count}")
+                lines.append(f"{_series_name(metric.name + '_sum', labels)} {histogram._sum}")
     return "\n".join(lines) + "\n"
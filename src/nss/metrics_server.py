@@ -1,21 +1,45 @@
 """Metrics API server (Port 11340).
 
-Lightweight server exposing NSS operational metrics.
+Lightweight server exposing NSS operational metrics aggregated across
+all gateway, guardian and governance processes (see
+:mod:`nss.metrics_store`).
 """
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 
 from nss.auth import JWTMiddleware
 from nss.config import config
+from nss.loop_monitor import LoopLagMonitor
 from nss.metrics import metrics_snapshot, prometheus_export
+from nss.metrics_store import MetricsCollector
 from nss.middleware import SecurityHeadersMiddleware, TracingMiddleware
 
+_collector = MetricsCollector(config.redis_url, stale_after_s=config.metrics_stale_after_s)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    loop_monitor = LoopLagMonitor(
+        interval_s=config.loop_monitor_interval_s,
+        stall_threshold_ms=config.loop_monitor_stall_ms,
+        debug=config.loop_monitor_debug,
+    )
+    loop_monitor.start()
+    yield
+    loop_monitor.stop()
+    await _collector.close()
+
+
 app = FastAPI(
     title="NSS Metrics",
     version="3.1.1",
+    lifespan=lifespan,
 )
 
 app.add_middleware(TracingMiddleware)
@@ -30,13 +54,15 @@ async def health() -> dict[str, str]:
 
 @app.get("/metrics")
 async def metrics() -> dict:
-    return metrics_snapshot()
+    return metrics_snapshot(await _collector.collect())
 
 
 @app.get("/metrics/prometheus")
 async def metrics_prometheus():
     from starlette.responses import PlainTextResponse
-    return PlainTextResponse(prometheus_export(), media_type="text/plain; version=0.0.4")
+    return PlainTextResponse(
+        prometheus_export(await _collector.collect()), media_type="text/plain; version=0.0.4",
+    )
 
 
 if __name__ == "__main__":
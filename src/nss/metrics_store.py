@@ -0,0 +1,183 @@
+"""Cross-process metrics aggregation through a Redis hash.
+
+Every NSS process keeps its metrics in the module-level registry of
+:mod:`nss.metrics`, so one process only ever sees its own traffic.
+:class:`MetricsPublisher` periodically writes the serialised registry
+(:func:`~nss.metrics.export_state`) into the Redis hash
+``nss:metrics:processes`` under a per-process field
+(``service:host:pid``); :class:`MetricsCollector` reads the hash and
+merges all live entries (:func:`~nss.metrics.merge_states`) so the
+metrics server can expose one aggregated view.
+
+The hot path is untouched: publishing reads the registry from a
+background task every few seconds.  Entries that have not been refreshed
+within ``stale_after_s`` (crashed or scaled-down workers) are dropped, so
+aggregated counters may decrease when a process goes away -- Prometheus
+treats that as a counter reset.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import socket
+import time
+from typing import Any
+
+import structlog
+
+from nss.metrics import Counter, Gauge, Histogram, export_state, merge_states
+
+logger = structlog.get_logger(__name__)
+
+_REDIS_KEY = "nss:metrics:processes"
+
+# Seconds to wait before reconnecting after Redis was unreachable.
+_RETRY_AFTER_S = 10.0
+
+
+def process_id(service: str) -> str:
+    """Return the hash field identifying this process."""
+    return f"{service}:{socket.gethostname()}:{os.getpid()}"
+
+
+async def _connect(redis_url: str) -> Any:
+    import redis.asyncio as aioredis
+
+    client = aioredis.from_url(redis_url, socket_connect_timeout=1.0)
+    await client.ping()
+    return client
+
+
+class MetricsPublisher:
+    """Publishes this process's metrics registry to Redis.
+
+    Degrades to a no-op when Redis is unavailable.
+
+    Parameters:
+        redis_url: Redis connection URL.
+        service: Service name (``gateway``, ``guardian``, ``governance``).
+        interval_s: Seconds between publishes; ``0`` disables publishing.
+    """
+
+    def __init__(self, redis_url: str, service: str, interval_s: float = 5.0) -> None:
+        self._redis_url = redis_url
+        self._field = process_id(service)
+        self._interval_s = interval_s
+        self._client: Any | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        """Connect and start the background publish loop."""
+        if self._interval_s <= 0:
+            return
+        try:
+            self._client = await _connect(self._redis_url)
+        except Exception:
+            logger.warning("metrics_publisher_unavailable", url=self._redis_url)
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("metrics_publisher_started", field=self._field)
+
+    async def publish(self) -> None:
+        """Write the current registry state to the shared hash."""
+        if self._client is None:
+            return
+        try:
+            await self._client.hset(_REDIS_KEY, self._field, json.dumps(export_state()))
+        except Exception:
+            logger.warning("metrics_publish_failed")
+
+    async def _run(self) -> None:
+        while True:
+            await self.publish()
+            await asyncio.sleep(self._interval_s)
+
+    async def stop(self) -> None:
+        """Stop publishing and remove this process's entry."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._client is not None:
+            try:
+                await self._client.hdel(_REDIS_KEY, self._field)
+            except Exception:
+                logger.warning("metrics_unpublish_failed")
+            await self._client.aclose()
+            self._client = None
+
+
+class MetricsCollector:
+    """Reads and merges the metrics published by all processes.
+
+    Connects lazily on first use and retries at most every
+    ``_RETRY_AFTER_S`` seconds after a failure.
+
+    Parameters:
+        redis_url: Redis connection URL.
+        stale_after_s: Entries older than this are ignored and removed.
+    """
+
+    def __init__(self, redis_url: str, stale_after_s: float = 30.0) -> None:
+        self._redis_url = redis_url
+        self._stale_after_s = stale_after_s
+        self._client: Any | None = None
+        self._retry_at = 0.0
+
+    async def _ensure_client(self) -> Any | None:
+        if self._client is None and time.monotonic() >= self._retry_at:
+            try:
+                self._client = await _connect(self._redis_url)
+            except Exception:
+                self._retry_at = time.monotonic() + _RETRY_AFTER_S
+                logger.warning("metrics_collector_unavailable", url=self._redis_url)
+        return self._client
+
+    async def collect(self) -> list[Counter | Gauge | Histogram]:
+        """Return the merged metrics of all live processes.
+
+        The local registry is merged in as well, so every metric family is
+        present even before any process has published; without Redis the
+        result is the local registry alone.
+        """
+        states = [export_state(), *await self._live_states()]
+        return merge_states(states)
+
+    async def _live_states(self) -> list[dict[str, Any]]:
+        client = await self._ensure_client()
+        if client is None:
+            return []
+        try:
+            raw = await client.hgetall(_REDIS_KEY)
+        except Exception:
+            logger.warning("metrics_collect_failed")
+            self._client = None
+            self._retry_at = time.monotonic() + _RETRY_AFTER_S
+            return []
+
+        now = time.time()
+        states: list[dict[str, Any]] = []
+        stale: list[Any] = []
+        for field, value in raw.items():
+            try:
+                state = json.loads(value)
+            except ValueError:
+                stale.append(field)
+                continue
+            if now - state.get("timestamp", 0) > self._stale_after_s:
+                stale.append(field)
+            else:
+                states.append(state)
+        if stale:
+            try:
+                await client.hdel(_REDIS_KEY, *stale)
+            except Exception:
+                logger.warning("metrics_stale_cleanup_failed")
+        return states
+
+    async def close(self) -> None:
+        """Close the Redis connection."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
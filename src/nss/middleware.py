@@ -1,24 +1,34 @@
-"""HTTP middleware for security headers, request tracing, and rate limiting."""
+"""HTTP middleware: security headers, tracing, stage timing, deadlines and rate limiting."""
 
 from __future__ import annotations
 
+import asyncio
+import json
 import time
 import uuid
 from collections import defaultdict
 from typing import Any
 
 import structlog
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.requests import Request
 from starlette.responses import JSONResponse, Response
 
+from nss.deadline import DeadlineExceededError, end_deadline, start_deadline
+from nss.flight_recorder import FlightRecorder
+from nss.metrics import nss_requests_abandoned
+from nss.timing import end_timeline, start_timeline
+
 logger = structlog.get_logger(__name__)
 
+# Probe and scrape endpoints are not timed or flight-recorded.
+_UNTIMED_PATHS = frozenset({"/health", "/metrics", "/metrics/prometheus"})
+
 
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     """Add security headers to all responses."""
 
-    async def dispatch(self, request: Request, call_next: Any) -> Response:
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
         response = await call_next(request)
         response.headers["X-Content-Type-Options"] = "nosniff"
         response.headers["X-Frame-Options"] = "DENY"
@@ -31,7 +41,7 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
 class TracingMiddleware(BaseHTTPMiddleware):
     """Generate and propagate X-Trace-ID for distributed tracing."""
 
-    async def dispatch(self, request: Request, call_next: Any) -> Response:
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
         trace_id = request.headers.get("X-Trace-ID", str(uuid.uuid4()))
         request.state.trace_id = trace_id
         
@@ -45,6 +55,179 @@ class TracingMiddleware(BaseHTTPMiddleware):
         return response
 
 
+class ServerTimingMiddleware(BaseHTTPMiddleware):
+    """Record a stage timeline per request and emit a ``Server-Timing`` header.
+
+    Args:
+        app: The ASGI application.
+        enabled: Emit the ``Server-Timing`` header and ``request_timeline``
+            log event.
+        recorder: Optional :class:`~nss.flight_recorder.FlightRecorder`
+            that receives every finished timeline.  With neither option
+            active requests pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        enabled: bool = True,
+        recorder: FlightRecorder | None = None,
+    ) -> None:
+        super().__init__(app)
+        self._enabled = enabled
+        self._recorder = recorder
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        if not (self._enabled or self._recorder) or request.url.path in _UNTIMED_PATHS:
+            return await call_next(request)
+        timeline, token = start_timeline()
+        try:
+            response = await call_next(request)
+        finally:
+            end_timeline(token)
+        if self._recorder is not None:
+            self._recorder.observe(
+                timeline,
+                method=request.method,
+                path=request.url.path,
+                status=response.status_code,
+                trace_id=getattr(request.state, "trace_id", ""),
+            )
+        if self._enabled:
+            response.headers["Server-Timing"] = timeline.server_timing()
+            if timeline.stages:
+                logger.info(
+                    "request_timeline",
+                    path=request.url.path,
+                    status=response.status_code,
+                    stages=timeline.as_list(),
+                )
+        return response
+
+
+class DeadlineMiddleware:
+    """Give every request a deadline and cancel it when the client goes away.
+
+    The timeout comes from ``X-Request-Timeout`` (seconds) or
+    ``X-Request-Deadline`` (unix epoch seconds), else the endpoint's
+    default, and is capped at *max_s*.  It is installed with
+    :func:`~nss.deadline.start_deadline` so awaited stages can bound
+    themselves by the remaining budget; a
+    :class:`~nss.deadline.DeadlineExceededError` that escapes the app is
+    answered with ``504``.
+
+    The app runs in its own task while the request's ``receive`` channel
+    is watched: an ``http.disconnect`` before the response is complete
+    cancels the task, so no further LLM, Redis or Qdrant work is done for
+    a client that stopped waiting.  This is plain ASGI middleware, because
+    :class:`BaseHTTPMiddleware` does not expose the disconnect.
+
+    Args:
+        app: The ASGI application.
+        default_s: Timeout for endpoints without their own default.
+        endpoints: Default timeout per path (``0`` = no deadline).
+        max_s: Upper bound on any client-supplied timeout.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        default_s: float = 30.0,
+        endpoints: dict[str, float] | None = None,
+        max_s: float = 300.0,
+    ) -> None:
+        self.app = app
+        self._default_s = default_s
+        self._endpoints = endpoints or {}
+        self._max_s = max_s
+
+    def timeout_for(self, path: str, headers: dict[str, str]) -> float | None:
+        """Timeout in seconds for a request (``None`` = no deadline)."""
+        return self._resolve(path, headers)[0]
+
+    def _resolve(self, path: str, headers: dict[str, str]) -> tuple[float | None, bool]:
+        """Timeout for a request and whether the client supplied it."""
+        if path in _UNTIMED_PATHS:
+            return None, False
+        requested: float | None = None
+        try:
+            if "x-request-timeout" in headers:
+                requested = float(headers["x-request-timeout"])
+            elif "x-request-deadline" in headers:
+                requested = float(headers["x-request-deadline"]) - time.time()
+        except ValueError:
+            logger.warning("deadline_header_invalid", path=path)
+        if requested is not None:
+            return min(max(requested, 0.0), self._max_s), True
+        default = self._endpoints.get(path, self._default_s)
+        return (default if default > 0 else None), False
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        timeout, client = self._resolve(scope["path"], headers)
+        if timeout is None:
+            await self.app(scope, receive, send)
+            return
+
+        messages: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        started = False
+        complete = False
+        abandoned = False
+
+        async def send_wrapper(message: dict[str, Any]) -> None:
+            nonlocal started, complete
+            if message["type"] == "http.response.start":
+                started = True
+            elif message["type"] == "http.response.body" and not message.get("more_body"):
+                complete = True
+            await send(message)
+
+        token = start_deadline(timeout, client=client)
+        try:
+            app_task = asyncio.create_task(self.app(scope, messages.get, send_wrapper))
+        finally:
+            end_deadline(token)
+
+        async def watch() -> None:
+            nonlocal abandoned
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    if not complete and not app_task.done():
+                        abandoned = True
+                        app_task.cancel()
+                    return
+
+        watcher = asyncio.create_task(watch())
+        try:
+            await app_task
+        except asyncio.CancelledError:
+            current = asyncio.current_task()
+            if not abandoned or (current is not None and current.cancelling()):
+                raise
+            nss_requests_abandoned.inc()
+            logger.info("request_abandoned", path=scope["path"])
+        except DeadlineExceededError as exc:
+            if started:
+                raise
+            body = json.dumps({"detail": str(exc)}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 504,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+        finally:
+            watcher.cancel()
+
+
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """Sliding-window rate limiter per client IP.
     
@@ -69,7 +252,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         cutoff = time.time() - self._window_seconds
         return [t for t in timestamps if t > cutoff]
 
-    async def dispatch(self, request: Request, call_next: Any) -> Response:
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
         # Skip rate limiting for health checks
         if request.url.path in ("/health", "/metrics"):
             return await call_next(request)
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import BaseModel, Field
 
@@ -43,6 +43,42 @@ class NSSResponse(BaseModel):
     audit_id: str
 
 
+class AsyncNSSRequest(NSSRequest):
+    """Inbound request to ``/v1/process/async``.
+
+    Attributes:
+        webhook_url: Optional URL that receives the finished :class:`JobStatus`
+            as a signed ``POST`` (host must be allow-listed).
+    """
+
+    webhook_url: str | None = None
+
+
+class JobStatus(BaseModel):
+    """State of an asynchronous processing job.
+
+    Attributes:
+        job_id: Identifier to poll at ``/v1/jobs/{job_id}``.
+        status: ``queued``, ``running``, ``succeeded`` or ``failed``.
+        audit_id: Audit trail identifier shared with the guardian checks.
+        created_at: Submission time (unix epoch seconds).
+        updated_at: Time of the last status change.
+        result: The response, once succeeded.
+        status_code: HTTP status ``/v1/process`` would have answered with,
+            once failed.
+        error: Failure detail, once failed.
+    """
+
+    job_id: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    audit_id: str
+    created_at: float
+    updated_at: float
+    result: NSSResponse | None = None
+    status_code: int | None = None
+    error: str | None = None
+
+
 class RiskScore(BaseModel):
     """Result of a MARS risk evaluation.
 
@@ -65,14 +101,36 @@ class SentinelResult(BaseModel):
     Attributes:
         is_safe: ``True`` when the input passes all checks.
         confidence: Aggregated confidence score in [0, 1].
-        method_results: Per-method pass/fail mapping.
+        method_results: Per-method pass/fail mapping; ``None`` marks a method
+            that was skipped because its vote could not change the outcome.
         consensus: Human-readable summary of the consensus decision.
+        matched_rules: Ids of the signature rules that fired (empty when
+            the rules method was skipped or nothing matched).
+        llm_error: The LLM vote failed and was counted as safe (fail
+            open); such results are not cached.
     """
 
     is_safe: bool
     confidence: float = Field(ge=0.0, le=1.0)
-    method_results: dict[str, bool]
+    method_results: dict[str, bool | None]
     consensus: str
+    matched_rules: list[str] = Field(default_factory=list)
+    llm_error: bool = False
+
+
+class GuardianAnalysis(BaseModel):
+    """Result of a fused SENTINEL + MARS LLM analysis (one model call).
+
+    Attributes:
+        llm_suspicious: SENTINEL LLM vote (``True`` = injection suspected).
+        risk: MARS risk evaluation derived from the same call.
+        llm_error: The call failed; *llm_suspicious* is the fail-open
+            ``False`` and *risk* the ``ERROR`` fallback.
+    """
+
+    llm_suspicious: bool
+    risk: RiskScore
+    llm_error: bool = False
 
 
 class APEXDecision(BaseModel):
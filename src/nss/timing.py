@@ -0,0 +1,128 @@
+"""Per-request stage timeline propagated through contextvars.
+
+:class:`~nss.middleware.ServerTimingMiddleware` installs a
+:class:`Timeline` for every request; pipeline code wraps each step in
+:func:`stage`, which records the step's start and end on the current
+timeline and observes
+``nss_stage_latency_ms``.  When the request finishes, the timeline is
+returned as a standard ``Server-Timing`` header and logged as a
+``request_timeline`` event (which carries the request's ``trace_id`` from
+the structlog context).
+
+Outside a request, or with the middleware disabled, :func:`stage` only
+records the histogram.  The per-stage cost is two ``perf_counter`` calls
+and one list append.
+"""
+
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar, Token
+from typing import Any
+
+from nss.metrics import Histogram, nss_stage_latency
+
+
+class Timeline:
+    """Start/end timestamps of the stages of one request.
+
+    ``annotations`` holds small diagnostic facts set via :func:`annotate`
+    (model chosen, cache hits, queue depths) -- never payload text.
+    """
+
+    __slots__ = ("origin", "stages", "annotations")
+
+    def __init__(self) -> None:
+        self.origin = time.perf_counter()
+        self.stages: list[tuple[str, float, float]] = []
+        self.annotations: dict[str, Any] = {}
+
+    def record(self, name: str, start: float, end: float) -> None:
+        """Append a stage given ``perf_counter`` timestamps."""
+        self.stages.append((name, start, end))
+
+    def durations(self) -> dict[str, float]:
+        """Total milliseconds per stage name, in first-seen order."""
+        totals: dict[str, float] = {}
+        for name, start, end in self.stages:
+            totals[name] = totals.get(name, 0.0) + (end - start) * 1000
+        return totals
+
+    def server_timing(self) -> str:
+        """Render the timeline as a ``Server-Timing`` header value."""
+        total = (time.perf_counter() - self.origin) * 1000
+        parts = [f"{name};dur={ms:.2f}" for name, ms in self.durations().items()]
+        parts.append(f"total;dur={total:.2f}")
+        return ", ".join(parts)
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Stages with start/end offsets (ms since the request began)."""
+        return [
+            {
+                "stage": name,
+                "start_ms": round((start - self.origin) * 1000, 3),
+                "end_ms": round((end - self.origin) * 1000, 3),
+            }
+            for name, start, end in self.stages
+        ]
+
+
+_timeline: ContextVar[Timeline | None] = ContextVar("nss_timeline", default=None)
+
+
+def start_timeline() -> tuple[Timeline, Token[Timeline | None]]:
+    """Install a fresh timeline for the current context.
+
+    Returns:
+        The timeline and the token to pass to :func:`end_timeline`.
+    """
+    timeline = Timeline()
+    return timeline, _timeline.set(timeline)
+
+
+def end_timeline(token: Token[Timeline | None]) -> None:
+    """Restore the context from before :func:`start_timeline`."""
+    _timeline.reset(token)
+
+
+def current_timeline() -> Timeline | None:
+    """Return the timeline of the current request, if one is recorded."""
+    return _timeline.get()
+
+
+def annotate(**fields: Any) -> None:
+    """Attach diagnostic *fields* to the current request's timeline, if any."""
+    timeline = _timeline.get()
+    if timeline is not None:
+        timeline.annotations.update(fields)
+
+
+class _Stage:
+    """Context manager behind :func:`stage` (a class keeps the overhead low)."""
+
+    __slots__ = ("_name", "_histogram", "_start")
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        histogram = _stage_histograms.get(name)
+        if histogram is None:
+            histogram = _stage_histograms[name] = nss_stage_latency.labels(stage=name)
+        self._histogram = histogram
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc: object) -> None:
+        end = time.perf_counter()
+        self._histogram.observe((end - self._start) * 1000)
+        timeline = _timeline.get()
+        if timeline is not None:
+            timeline.stages.append((self._name, self._start, end))
+
+
+_stage_histograms: dict[str, Histogram] = {}
+
+
+def stage(name: str) -> _Stage:
+    """Time a ``with`` block as pipeline stage *name*."""
+    return _Stage(name)
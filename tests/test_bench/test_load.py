@@ -0,0 +1,131 @@
+"""Tests for the nss-bench load generator."""
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from nss.auth import JWTMiddleware
+from nss.bench.load import (
+    LoadGenerator,
+    LoadSettings,
+    latency_summary,
+    parse_mix,
+    parse_server_timing,
+    percentile,
+    render_markdown,
+)
+from nss.gateway.hmac_signing import verify_request
+
+SECRET = "bench-secret-of-at-least-thirty-two-bytes"
+
+
+def _stub_app() -> FastAPI:
+    """Gateway/guardian stand-in that checks signatures like the real services."""
+    app = FastAPI()
+    app.add_middleware(JWTMiddleware, secret=SECRET)
+
+    @app.post("/v1/process")
+    async def process(request: Request) -> JSONResponse:
+        body = (await request.body()).decode()
+        ok = verify_request(
+            body,
+            request.headers.get("X-HMAC-Signature", ""),
+            SECRET,
+            request.headers.get("X-HMAC-Timestamp", ""),
+            request.headers.get("X-HMAC-Nonce", ""),
+        )
+        if not ok:
+            return JSONResponse({"detail": "bad signature"}, status_code=401)
+        # cache_miss prompts carry a "(ref ...)" suffix; everything else in
+        # the mix is an attack.
+        status = 200 if "(ref " in body else 422
+        return JSONResponse(
+            {"response": "ok"},
+            status_code=status,
+            headers={"Server-Timing": "pii;dur=0.50, llm;dur=2.00, total;dur=3.00"},
+        )
+
+    @app.post("/v1/sentinel/check")
+    async def sentinel() -> dict[str, bool]:
+        return {"is_safe": True}
+
+    @app.get("/metrics")
+    async def metrics() -> dict[str, object]:
+        return {"nss_stage_latency_ms{stage=\"pii\"}": {"count": 1}, "nss_requests_total": 1}
+
+    return app
+
+
+def _settings(**overrides: object) -> LoadSettings:
+    base = {
+        "gateway_url": "http://gw",
+        "guardian_url": "http://gd",
+        "duration_s": 0.3,
+        "hmac_secret": SECRET,
+        "jwt_secret": SECRET,
+    }
+    return LoadSettings(**{**base, **overrides})
+
+
+def test_parse_mix() -> None:
+    assert parse_mix("cache_hit=3, attack") == {"cache_hit": 3.0, "attack": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("nope=1")
+    with pytest.raises(ValueError):
+        parse_mix("attack=0")
+
+
+def test_parse_server_timing() -> None:
+    header = "policy;dur=0.12, sentinel;desc=x;dur=4.5, total;dur=9"
+    assert parse_server_timing(header) == {"policy": 0.12, "sentinel": 4.5, "total": 9.0}
+    assert parse_server_timing("") == {}
+
+
+def test_percentiles_nearest_rank() -> None:
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 0.95) == 95.0
+    assert percentile([], 0.5) == 0.0
+    summary = latency_summary(values)
+    assert summary["p50"] == 50.0
+    assert summary["p99"] == 99.0
+    assert summary["max"] == 100.0
+
+
+async def test_open_loop_run_signs_requests() -> None:
+    settings = _settings(rps=100, arrival="constant", mix=parse_mix("cache_miss=1,attack=1"))
+    report = await LoadGenerator(settings, httpx.ASGITransport(app=_stub_app())).run()
+
+    overall = report["overall"]
+    # 0.3 s at 100 rps with constant spacing: exactly 30 arrivals.
+    assert overall["requests"] == 30
+    assert set(overall["status_codes"]) <= {"200", "422"}
+    assert report["scenarios"]["attack"]["status_codes"] == {
+        "422": report["scenarios"]["attack"]["requests"],
+    }
+    assert report["server_stages_ms"]["llm"]["p50"] == 2.0
+    assert list(report["server_metrics"]) == ['nss_stage_latency_ms{stage="pii"}']
+    assert "hmac_secret" not in report["settings"]
+
+
+async def test_closed_loop_run_and_markdown() -> None:
+    settings = _settings(concurrency=2, mix=parse_mix("guardian_sentinel=1"))
+    report = await LoadGenerator(settings, httpx.ASGITransport(app=_stub_app())).run()
+
+    assert report["overall"]["requests"] > 0
+    assert report["overall"]["error_rate"] == 0.0
+    markdown = render_markdown(report)
+    assert "closed loop, 2 workers" in markdown
+    assert "| guardian_sentinel |" in markdown
+
+
+async def test_transport_errors_are_reported() -> None:
+    def refuse(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("refused", request=request)
+
+    settings = _settings(rps=50, arrival="constant", duration_s=0.1)
+    report = await LoadGenerator(settings, httpx.MockTransport(refuse)).run()
+
+    assert report["overall"]["error_rate"] == 1.0
+    assert list(report["overall"]["status_codes"]) == ["error:ConnectError"]
+    assert report["server_metrics"] == {}
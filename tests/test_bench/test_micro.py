@@ -0,0 +1,57 @@
+"""Tests for the pipeline micro-benchmark suite."""
+
+import json
+
+from nss.bench.micro import MicroBenchmark, compare, corpus, main, measure, run_suite
+
+
+def test_corpus_has_exact_size_and_pii() -> None:
+    text = corpus(5_000)
+    assert len(text) == 5_000
+    assert "@example.com" in text
+    assert corpus(100, seed=1) == corpus(100, seed=1)
+
+
+def test_measure_reports_ops_and_allocations() -> None:
+    bench = MicroBenchmark(name="test.join", setup=lambda n: lambda: "x" * n)
+    (small, large) = measure(bench, sizes=(100, 100_000), repeats=2, min_time=0.001)
+    assert small.ops_per_s > 0
+    assert large.peak_alloc_bytes >= 100_000 > small.peak_alloc_bytes
+
+
+def test_fixed_benchmarks_ignore_byte_sizes() -> None:
+    bench = MicroBenchmark(name="test.fixed", unit="fixed", sizes=(0,), setup=lambda n: dict)
+    assert [r.size for r in measure(bench, sizes=(100, 1_000), repeats=1, min_time=0.001)] == [0]
+
+
+def test_run_suite_covers_every_stage() -> None:
+    report = run_suite(sizes=(100,), repeats=1, min_time=0.001, only=["pii", "policy", "dp"])
+    names = {r["name"] for r in report["results"]}
+    assert names == {"pii.redact_pii", "policy.evaluate", "dp.add_dp_noise"}
+    assert report["python"]
+
+
+def test_compare_flags_slowdowns_and_allocation_growth() -> None:
+    row = {"name": "pii.redact_pii", "size": 100, "ops_per_s": 1000.0, "peak_alloc_bytes": 4096}
+    baseline = {"results": [row]}
+    assert compare({"results": [dict(row, ops_per_s=900.0)]}, baseline) == []
+
+    slower = compare({"results": [dict(row, ops_per_s=500.0)]}, baseline)
+    assert [(r["metric"], r["change"]) for r in slower] == [("ops_per_s", -0.5)]
+
+    bigger = compare({"results": [dict(row, peak_alloc_bytes=8192)]}, baseline)
+    assert [r["metric"] for r in bigger] == ["peak_alloc_bytes"]
+    # Growth below 1 KiB is allocator noise.
+    assert compare({"results": [dict(row, peak_alloc_bytes=4600)]}, baseline) == []
+
+
+def test_main_exits_nonzero_on_regression(tmp_path) -> None:
+    baseline = tmp_path / "baseline.json"
+    argv = ["--sizes", "100", "--repeats", "1", "--min-time", "0.001", "--only", "shield"]
+    assert main([*argv, "--out", str(baseline)]) == 0
+
+    report = json.loads(baseline.read_text())
+    for row in report["results"]:
+        row["ops_per_s"] *= 1000
+    baseline.write_text(json.dumps(report))
+    assert main([*argv, "--out", str(tmp_path / "now.json"), "--baseline", str(baseline)]) == 1
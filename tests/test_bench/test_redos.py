@@ -0,0 +1,40 @@
+"""Adversarial regression suite: hot-path regexes must scan in linear time."""
+
+import pytest
+
+from nss.bench.redos import default_targets, growth_slope, measure, run_suite
+
+# Smaller than the CLI defaults to keep the suite fast; quadratic patterns
+# still show a slope near 2 at these sizes.
+_SIZES = (1_000, 2_000, 4_000, 8_000)
+_MAX_SLOPE = 1.5
+
+_CASES = [
+    (target, generator)
+    for target in default_targets()
+    for generator in target.generators
+]
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize(
+    ("target", "generator"),
+    _CASES,
+    ids=[f"{t.name}-{g}" for t, g in _CASES],
+)
+def test_linear_growth(target, generator) -> None:
+    single = target.model_copy(update={"generators": {generator: target.generators[generator]}})
+    (result,) = measure(single, sizes=_SIZES, max_slope=_MAX_SLOPE)
+    assert result.ok, f"{target.name} [{generator}] grows with exponent {result.slope}"
+
+
+def test_growth_slope_fits_exponent() -> None:
+    sizes = [1, 2, 4, 8]
+    assert growth_slope(sizes, [s * 1e-3 for s in sizes]) == pytest.approx(1.0)
+    assert growth_slope(sizes, [s * s * 1e-3 for s in sizes]) == pytest.approx(2.0)
+
+
+def test_run_suite_report_shape() -> None:
+    report = run_suite(sizes=(200, 400), max_slope=10.0, repeats=1)
+    assert report["passed"] is True
+    assert {"target", "generator", "sizes", "seconds", "slope", "ok"} <= set(report["results"][0])
@@ -0,0 +1,88 @@
+"""Tests for the trace replay tool."""
+
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+
+from nss.bench.replay import (
+    Replayer,
+    ReplaySettings,
+    load_trace,
+    render_markdown,
+    request_for,
+    synthetic_message,
+)
+from nss.gateway.capture import CaptureRecord
+from nss.gateway.pii_redaction import redact_pii
+
+
+def _record(t: float, **overrides: object) -> CaptureRecord:
+    fields = {"t": t, "endpoint": "process", "status": 200, "duration_ms": 40.0}
+    return CaptureRecord(**{**fields, **overrides})
+
+
+def test_load_trace_orders_and_skips_bad_lines(tmp_path) -> None:
+    path = tmp_path / "trace.jsonl"
+    path.write_text(
+        _record(2.0).model_dump_json() + "\n"
+        + "not json\n\n"
+        + _record(1.0).model_dump_json() + "\n",
+    )
+    assert [r.t for r in load_trace(str(path))] == [1.0, 2.0]
+
+
+def test_synthetic_message_matches_shape() -> None:
+    record = _record(0, message_chars=400, pii_entities=3, cache_key="abcd1234abcd1234")
+    message = synthetic_message(record)
+    assert len(message) == 400
+    assert len(redact_pii(message)[1]) == 3
+    assert synthetic_message(record) == message
+    assert synthetic_message(record.model_copy(update={"cache_key": "ffff"})) != message
+
+
+def test_tool_request_preserves_argument_size() -> None:
+    path, body = request_for(_record(0, endpoint="tool", tool="search", args_chars=50))
+    assert path == "/v1/tools/execute"
+    assert len(json.dumps(body["args"])) == 50
+
+
+def test_speed_is_limited_to_ten() -> None:
+    with pytest.raises(ValidationError):
+        ReplaySettings(speed=20)
+
+
+async def test_replay_scales_time_and_reports() -> None:
+    app = FastAPI()
+    seen: list[dict[str, object]] = []
+
+    @app.post("/v1/process")
+    async def process(request: Request) -> JSONResponse:
+        assert request.headers["X-HMAC-Signature"]
+        seen.append(await request.json())
+        return JSONResponse({}, headers={"Server-Timing": "llm;dur=5.0"})
+
+    @app.post("/v1/tools/execute")
+    async def tool() -> dict[str, str]:
+        return {"output": "ok"}
+
+    records = [
+        _record(100.0, message_chars=50, user="u1"),
+        _record(100.4, endpoint="tool", tool="search", args_chars=20),
+        _record(100.8, message_chars=80, privacy_tier=2),
+    ]
+    settings = ReplaySettings(gateway_url="http://gw", speed=4)
+    report = await Replayer(settings, httpx.ASGITransport(app=app)).run(records)
+
+    # 0.8 s of traffic at 4x takes about 0.2 s.
+    assert 0.2 <= report["elapsed_s"] < 0.8
+    assert report["overall"]["requests"] == 3
+    assert report["endpoints"]["tool"]["status_codes"] == {"200": 1}
+    assert report["overall"]["captured_latency_ms"]["p50"] == 40.0
+    assert report["server_stages_ms"]["llm"]["count"] == 2
+    assert [m["privacy_tier"] for m in seen] == [0, 2]
+    assert seen[0]["user_id"] == "replay-u1"
+    assert "| process | 2 |" in render_markdown(report)
@@ -0,0 +1,18 @@
+"""Tests for the rule-engine benchmark."""
+
+from nss.bench.rules import run_benchmark, synthetic_input, synthetic_rules
+
+
+def test_synthetic_input_contains_hits() -> None:
+    rules = synthetic_rules(20)
+    text = synthetic_input(2048, rules, hits=3)
+    assert sum(r.literals[0] in text for r in rules) == 3
+
+
+def test_run_benchmark_report() -> None:
+    report = run_benchmark(rule_count=50, input_kb=4, repeats=1)
+    assert report["rules"] == 50
+    assert [row["input_kb"] for row in report["results"]] == [1, 2, 4]
+    for row in report["results"]:
+        assert row["matches"] == 5
+        assert row["engine_python_ms"] >= 0
@@ -0,0 +1,218 @@
+"""Tests for request deadlines and client-disconnect cancellation."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from nss.cache import CacheLayer
+from nss.deadline import (
+    DeadlineExceededError,
+    bounded,
+    end_deadline,
+    overload_miss,
+    parse_endpoint_timeouts,
+    record_queue_wait,
+    remaining,
+    start_deadline,
+    timeout_for,
+)
+from nss.llm.circuit_breaker import CircuitBreaker
+from nss.llm.ollama_client import OllamaClient
+from nss.llm.scheduler import LLMScheduler
+from nss.metrics import nss_deadline_exceeded, nss_requests_abandoned
+from nss.middleware import DeadlineMiddleware
+
+
+def _misses(stage: str) -> float:
+    return nss_deadline_exceeded.labels(stage=stage).value
+
+
+def test_timeout_for_is_capped_by_remaining_budget() -> None:
+    assert timeout_for("redis", 5.0) == 5.0  # no deadline outside a request
+    assert remaining() is None
+    token = start_deadline(0.5)
+    try:
+        assert 0.4 < timeout_for("redis", 5.0) <= 0.5
+        assert timeout_for("redis", 0.1) == 0.1
+    finally:
+        end_deadline(token)
+
+    before = _misses("redis")
+    token = start_deadline(0)
+    try:
+        with pytest.raises(DeadlineExceededError):
+            timeout_for("redis", 5.0)
+    finally:
+        end_deadline(token)
+    assert _misses("redis") == before + 1
+
+
+async def test_bounded_raises_when_budget_runs_out() -> None:
+    before = _misses("qdrant")
+    token = start_deadline(0.02)
+    try:
+        with pytest.raises(DeadlineExceededError) as info:
+            await bounded(asyncio.sleep(1), "qdrant")
+    finally:
+        end_deadline(token)
+    assert info.value.stage == "qdrant"
+    assert _misses("qdrant") == before + 1
+    assert await bounded(asyncio.sleep(0, result="ok"), "qdrant") == "ok"
+
+
+def test_only_server_deadlines_or_queueing_signal_overload() -> None:
+    assert overload_miss() is False  # no deadline outside a request
+    token = start_deadline(10)
+    try:
+        assert overload_miss() is True
+    finally:
+        end_deadline(token)
+
+    token = start_deadline(1, client=True)
+    try:
+        assert overload_miss() is False  # client chose a tight deadline
+        record_queue_wait(0.6)
+        assert overload_miss() is True  # but most of it went to the LLM queue
+    finally:
+        end_deadline(token)
+
+
+async def test_scheduler_queue_and_ollama_respect_deadline() -> None:
+    scheduler = LLMScheduler(default_concurrency=1, queue_timeout_s=10)
+    release = asyncio.Event()
+
+    async def blocker() -> None:
+        async with scheduler.slot("m"):
+            await release.wait()
+
+    holder = asyncio.create_task(blocker())
+    await asyncio.sleep(0)
+    token = start_deadline(0.05)
+    try:
+        with pytest.raises(DeadlineExceededError) as info:
+            async with scheduler.slot("m"):
+                pass
+    finally:
+        end_deadline(token)
+    assert info.value.stage == "llm_queue"
+    release.set()
+    await holder
+
+    async def stall(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(1)
+        return httpx.Response(200, json={"response": "late"})
+
+    breaker = CircuitBreaker(failure_threshold=1)
+    client = OllamaClient(breaker=breaker)
+    client._client = httpx.AsyncClient(
+        base_url="http://ollama", transport=httpx.MockTransport(stall),
+    )
+    token = start_deadline(0.05)
+    try:
+        with pytest.raises(DeadlineExceededError):
+            await client.generate("x")
+    finally:
+        end_deadline(token)
+    assert breaker.state == "closed"  # a spent budget says nothing about Ollama
+    await client.close()
+
+
+async def test_cache_miss_when_redis_exceeds_deadline() -> None:
+    class SlowRedis:
+        async def get(self, key: str) -> str:
+            await asyncio.sleep(1)
+            return '"value"'
+
+    cache = CacheLayer()
+    cache._client = SlowRedis()
+    cache._available = True
+    token = start_deadline(0.02)
+    try:
+        assert await cache.get("gateway", "k") is None
+    finally:
+        end_deadline(token)
+
+
+def _make_app(**kwargs: object) -> tuple[FastAPI, dict]:
+    app = FastAPI()
+    app.add_middleware(DeadlineMiddleware, **kwargs)
+    seen: dict = {}
+
+    @app.get("/budget")
+    async def budget() -> dict:
+        return {"remaining": remaining()}
+
+    @app.get("/slow")
+    async def slow() -> dict:
+        await bounded(asyncio.sleep(1), "ollama")
+        return {}
+
+    @app.get("/hang")
+    async def hang() -> dict:
+        seen["started"] = True
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            seen["cancelled"] = True
+            raise
+        return {}
+
+    return app, seen
+
+
+async def test_middleware_applies_headers_and_endpoint_defaults() -> None:
+    app, _ = _make_app(default_s=10, endpoints={"/slow": 0.05}, max_s=20)
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://t",
+    ) as client:
+        assert 9 < (await client.get("/budget")).json()["remaining"] <= 10
+        r = await client.get("/budget", headers={"X-Request-Timeout": "2.5"})
+        assert 2 < r.json()["remaining"] <= 2.5
+        r = await client.get("/budget", headers={"X-Request-Timeout": "999"})
+        assert r.json()["remaining"] <= 20
+        deadline = str(time.time() + 3)
+        r = await client.get("/budget", headers={"X-Request-Deadline": deadline})
+        assert 2 < r.json()["remaining"] <= 3
+        r = await client.get("/budget", headers={"X-Request-Timeout": "soon"})
+        assert 9 < r.json()["remaining"] <= 10
+
+        r = await client.get("/slow")
+        assert r.status_code == 504
+        assert "ollama" in r.json()["detail"]
+    assert parse_endpoint_timeouts("/v1/process=150, ,/x=0") == {"/v1/process": 150, "/x": 0}
+
+
+async def test_middleware_cancels_work_when_client_disconnects() -> None:
+    app, seen = _make_app()
+    disconnect = asyncio.Event()
+    sent: list[dict] = []
+    body_sent = False
+
+    async def receive() -> dict:
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/hang", "raw_path": b"/hang", "query_string": b"",
+        "root_path": "", "headers": [], "client": ("c", 1), "server": ("s", 80),
+    }
+    before = nss_requests_abandoned.value
+    task = asyncio.create_task(app(scope, receive, send))
+    while not seen.get("started"):
+        await asyncio.sleep(0.01)
+    disconnect.set()
+    await asyncio.wait_for(task, timeout=1)
+    assert seen.get("cancelled")
+    assert sent == []
+    assert nss_requests_abandoned.value == before + 1
@@ -0,0 +1,96 @@
+"""Tests for the slow-request flight recorder."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from nss.flight_recorder import FlightRecorder
+from nss.llm.scheduler import LLMScheduler
+from nss.models import NSSRequest
+from nss.timing import Timeline, end_timeline, start_timeline
+
+
+def _timeline(duration_ms: float, **annotations) -> Timeline:
+    timeline = Timeline()
+    timeline.origin = time.perf_counter() - duration_ms / 1000
+    timeline.record("pii", timeline.origin, timeline.origin + 0.001)
+    timeline.annotations.update(annotations)
+    return timeline
+
+
+def test_keeps_slowest_n_in_descending_order() -> None:
+    recorder = FlightRecorder(slowest_n=3, threshold_ms=10_000)
+    for ms in (5, 50, 1, 30, 20, 40):
+        recorder.observe(_timeline(ms), "POST", "/v1/process", 200)
+    durations = [r["duration_ms"] for r in recorder.dump()["slowest"]]
+    assert len(durations) == 3
+    assert durations == sorted(durations, reverse=True)
+    assert durations[-1] >= 30
+
+
+def test_keeps_every_request_over_threshold_up_to_capacity() -> None:
+    recorder = FlightRecorder(slowest_n=0, threshold_ms=100, capacity=2)
+    for ms in (150, 10, 200, 300):
+        recorder.observe(_timeline(ms), "POST", "/v1/process", 200, trace_id=str(ms))
+    over = recorder.dump()["over_threshold"]
+    assert [r["trace_id"] for r in over] == ["200", "300"]
+
+
+def test_records_annotations_and_stages() -> None:
+    recorder = FlightRecorder(slowest_n=1)
+    recorder.observe(_timeline(5, model="llama", response_cache_hit=False), "POST", "/x", 200)
+    (record,) = recorder.dump()["slowest"]
+    assert record["annotations"] == {"model": "llama", "response_cache_hit": False}
+    assert record["stages"][0]["stage"] == "pii"
+
+
+def test_expires_records_outside_window() -> None:
+    recorder = FlightRecorder(slowest_n=5, threshold_ms=1, window_s=60)
+    recorder.observe(_timeline(5), "POST", "/x", 200)
+    (record,) = recorder._over_threshold
+    record.timestamp = time.time() - 120  # the same record is in the slowest heap
+    dump = recorder.dump()
+    assert dump["slowest"] == []
+    assert dump["over_threshold"] == []
+
+
+async def test_records_llm_queue_wait_and_request_sizes(monkeypatch) -> None:
+    """Dumps separate queueing from inference and carry the request size."""
+    from nss.gateway import server
+
+    scheduler = LLMScheduler(default_concurrency=1)
+    monkeypatch.setattr(server, "_policy_engine", MagicMock())
+    monkeypatch.setattr(server, "_privacy_budget", MagicMock(remaining=MagicMock(return_value=1)))
+    audit = MagicMock()
+    audit.log_event.side_effect = RuntimeError("stop after PII redaction")
+    for name in ("_mars_scorer", "_apex_router", "_sentinel"):
+        monkeypatch.setattr(server, name, MagicMock())
+    monkeypatch.setattr(server, "_audit_logger", audit)
+
+    async def queued_call() -> None:
+        async with scheduler.slot("m"):
+            pass
+
+    timeline, token = start_timeline()
+    try:
+        async with scheduler.slot("m"):
+            waiter = asyncio.create_task(queued_call())
+            await asyncio.sleep(0.02)
+        await waiter
+        request = SimpleNamespace(state=SimpleNamespace(role="admin"))
+        nss_request = NSSRequest(message="Mail max@example.com now", user_id="u1")
+        with pytest.raises(RuntimeError):
+            await server._guard(request, nss_request, {}, {})
+    finally:
+        end_timeline(token)
+
+    recorder = FlightRecorder(slowest_n=1)
+    recorder.observe(timeline, "POST", "/v1/process", 200)
+    (record,) = recorder.dump()["slowest"]
+    queued = [s for s in record["stages"] if s["stage"] == "llm_queue"]
+    assert len(queued) == 1 and queued[0]["end_ms"] - queued[0]["start_ms"] >= 10
+    assert record["annotations"]["message_chars"] == len(nss_request.message)
+    assert 0 < record["annotations"]["redacted_chars"]
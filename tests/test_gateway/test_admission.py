@@ -0,0 +1,66 @@
+"""Tests for the adaptive concurrency limit and load shedding."""
+
+from nss.config import NSSConfig
+from nss.gateway.admission import AdaptiveLimiter, limiter_from_config
+from nss.metrics import nss_admission_limit, nss_admission_rejected
+
+
+def _run(limiter: AdaptiveLimiter, latency_ms: float, requests: int) -> None:
+    """Complete *requests* at *latency_ms* each with the limit saturated."""
+    for _ in range(requests):
+        limiter.inflight = limiter.limit
+        limiter.release(latency_ms)
+
+
+def test_low_priority_lanes_are_shed_first() -> None:
+    limiter = AdaptiveLimiter(initial_limit=10, lane_shares={"batch": 0.5})
+    before = nss_admission_rejected.labels(lane="batch").value
+    assert all(limiter.try_acquire("batch") for _ in range(5))
+    assert not limiter.try_acquire("batch")
+    assert all(limiter.try_acquire("interactive") for _ in range(5))
+    assert not limiter.try_acquire("interactive")
+    assert limiter.stats()["rejected"] == 2
+    assert nss_admission_rejected.labels(lane="batch").value == before + 1
+
+    limiter.release()
+    assert limiter.try_acquire("interactive")
+    assert not limiter.try_acquire("batch")
+
+
+def test_limit_grows_at_steady_latency_and_shrinks_when_it_rises() -> None:
+    limiter = AdaptiveLimiter(initial_limit=20, min_limit=4, max_limit=200)
+    _run(limiter, 50, 50)
+    grown = limiter.limit
+    assert grown > 20
+    assert nss_admission_limit.value == grown
+
+    _run(limiter, 400, 30)  # latency far beyond twice the baseline
+    assert limiter.limit < grown
+    _run(limiter, 400, 500)
+    assert limiter.limit >= 4
+
+
+def test_idle_gateway_does_not_grow_and_drops_cut_the_limit() -> None:
+    limiter = AdaptiveLimiter(initial_limit=20, min_limit=4)
+    for _ in range(100):
+        assert limiter.try_acquire()
+        limiter.release(10)  # one request in flight: far below the limit
+    assert limiter.limit == 20
+
+    for _ in range(5):
+        limiter.try_acquire()
+        limiter.release(dropped=True)
+    assert limiter.limit == 11
+    for _ in range(50):
+        limiter.release(dropped=True)
+    assert limiter.limit == 4
+    assert limiter.inflight == 0
+    assert limiter.retry_after() == 1
+
+
+def test_limiter_from_config() -> None:
+    limiter = limiter_from_config(NSSConfig(admission_lane_shares="batch=0.25"))
+    assert limiter is not None
+    assert limiter.threshold("batch") == 5.0
+    assert limiter.threshold("interactive") == 20.0
+    assert limiter_from_config(NSSConfig(admission_enabled=False)) is None
@@ -0,0 +1,112 @@
+"""Tests for the gateway traffic capture."""
+
+import json
+import time
+
+from nss.gateway import capture
+from nss.gateway.capture import CaptureRecord, TrafficCapture
+
+
+def _record(**overrides: object) -> CaptureRecord:
+    fields = {"t": 1700000000.0, "endpoint": "process", "status": 200, "duration_ms": 12.5}
+    return CaptureRecord(**{**fields, **overrides})
+
+
+def test_records_are_appended_as_compact_lines(tmp_path) -> None:
+    path = tmp_path / "capture.jsonl"
+    path.write_text('{"t": 1, "endpoint": "tool", "status": 200, "duration_ms": 1}\n')
+    tc = TrafficCapture(str(path), secret="s")
+    tc.record(_record(message_chars=120, pii_entities=2, stages={"pii": 0.4}))
+    tc.close()
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2
+    data = json.loads(lines[1])
+    assert data["message_chars"] == 120
+    assert data["stages"] == {"pii": 0.4}
+    # Default-valued fields are omitted to keep the file compact.
+    assert "tool" not in data
+
+
+def test_records_are_buffered_until_flush(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(capture, "_FLUSH_INTERVAL_S", 3600.0)
+    path = tmp_path / "capture.jsonl"
+    tc = TrafficCapture(str(path), secret="s")
+    tc.record(_record())
+    assert path.read_text() == ""
+    tc.flush()
+    assert len(path.read_text().splitlines()) == 1
+    tc.close()
+
+
+def test_record_does_not_wait_for_file_writes(tmp_path, monkeypatch) -> None:
+    """The writer thread appends full buffers; record() never blocks on the disk."""
+    monkeypatch.setattr(capture, "_FLUSH_LINES", 2)
+    path = tmp_path / "capture.jsonl"
+    tc = TrafficCapture(str(path), secret="s")
+    with tc._write_lock:  # a slow write in progress
+        tc.record(_record())
+        tc.record(_record())
+    deadline = time.monotonic() + 2.0
+    while len(path.read_text().splitlines()) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(path.read_text().splitlines()) == 2
+    tc.close()
+    assert not tc._writer.is_alive()
+
+
+def test_capture_stops_at_max_bytes(tmp_path) -> None:
+    path = tmp_path / "capture.jsonl"
+    tc = TrafficCapture(str(path), secret="s", max_bytes=150)
+    for _ in range(5):
+        tc.record(_record())
+        tc.flush()
+    tc.close()
+    assert 0 < path.stat().st_size <= 150
+    assert tc.sampled() is False
+
+
+def test_pseudonyms_are_keyed_and_stable(tmp_path) -> None:
+    a = TrafficCapture(str(tmp_path / "a.jsonl"), secret="one")
+    b = TrafficCapture(str(tmp_path / "b.jsonl"), secret="two")
+    assert a.pseudonym("alice") == a.pseudonym("alice")
+    assert a.pseudonym("alice") != b.pseudonym("alice")
+    assert "alice" not in a.pseudonym("alice")
+    a.close()
+    b.close()
+
+
+def test_sample_rate_zero_records_nothing(tmp_path) -> None:
+    tc = TrafficCapture(str(tmp_path / "c.jsonl"), secret="s", sample_rate=0.0)
+    assert tc.sampled() is False
+    tc.close()
+
+
+def test_gateway_capture_hook_records_shape_and_stages(tmp_path, monkeypatch) -> None:
+    from types import SimpleNamespace
+
+    from nss.gateway import server
+    from nss.timing import end_timeline, stage, start_timeline
+
+    path = tmp_path / "gateway.jsonl"
+    tc = TrafficCapture(str(path), secret="s")
+    monkeypatch.setattr(server, "_traffic_capture", tc)
+    request = SimpleNamespace(state=SimpleNamespace(role="data_processor"))
+
+    _, token = start_timeline()
+    try:
+        with stage("pii"):
+            pass
+        server._capture(
+            request, "alice", 1700000000.0, 422, 8.0,
+            {"endpoint": "process", "privacy_tier": 2, "message_chars": 64},
+        )
+    finally:
+        end_timeline(token)
+    tc.close()
+
+    data = json.loads(path.read_text())
+    assert data["role"] == "data_processor"
+    assert data["status"] == 422
+    assert data["user"] == tc.pseudonym("alice")
+    assert set(data["stages"]) == {"pii"}
@@ -0,0 +1,176 @@
+"""Tests for asynchronous processing jobs (/v1/process/async, /v1/jobs/{id})."""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from nss.auth import create_token
+from nss.config import config
+from nss.gateway import server as gw
+from nss.gateway.hmac_signing import generate_nonce, sign_request, verify_request
+from nss.gateway.jobs import (
+    JobRecord,
+    JobRunner,
+    JobStore,
+    WebhookDispatcher,
+    owner_key,
+    send_webhook,
+    webhook_allowed,
+)
+from nss.models import NSSResponse
+
+
+def _record(**fields: object) -> JobRecord:
+    defaults = {
+        "job_id": "j1", "status": "queued", "audit_id": "a1",
+        "created_at": 1.0, "updated_at": 1.0, "owner": "o",
+    }
+    return JobRecord(**{**defaults, **fields})
+
+
+async def test_store_falls_back_to_memory_with_ttl() -> None:
+    store = JobStore(redis_url="redis://127.0.0.1:1/0", ttl_seconds=60)
+    await store.connect()
+    await store.put(_record())
+    stored = await store.get("j1")
+    assert stored is not None and stored.owner == "o"
+    assert "owner" not in stored.public().model_dump()
+    assert await store.get("unknown") is None
+
+    short = JobStore(redis_url="redis://127.0.0.1:1/0", ttl_seconds=0)
+    await short.put(_record())
+    assert await short.get("j1") is None
+
+
+async def test_runner_processes_jobs_and_refuses_when_full() -> None:
+    done: list[int] = []
+
+    async def handler(n: int) -> None:
+        if n == 2:
+            raise RuntimeError("boom")  # logged; the worker carries on
+        done.append(n)
+
+    runner: JobRunner[int] = JobRunner(handler, workers=2, max_pending=3)
+    assert all(runner.submit(n) for n in range(3))
+    assert runner.full() and not runner.submit(99)
+    await runner.start()
+    await asyncio.wait_for(runner.join(), timeout=1)
+    assert sorted(done) == [0, 1]
+    assert runner.submit(3)
+    await asyncio.wait_for(runner.join(), timeout=1)
+    await runner.stop()
+    assert sorted(done) == [0, 1, 3]
+
+
+async def test_webhook_is_signed_and_retried() -> None:
+    calls: list[httpx.Request] = []
+
+    def receive(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(500 if len(calls) == 1 else 204)
+
+    status = _record(status="succeeded").public()
+    delivered = await send_webhook(
+        "http://hooks.local/done", status, "s3cret",
+        backoff_s=0, transport=httpx.MockTransport(receive),
+    )
+    assert delivered and len(calls) == 2
+    request = calls[-1]
+    assert json.loads(request.content)["job_id"] == "j1"
+    assert verify_request(
+        request.content.decode(),
+        request.headers["X-HMAC-Signature"],
+        "s3cret",
+        request.headers["X-HMAC-Timestamp"],
+        request.headers["X-HMAC-Nonce"],
+    )
+    hosts = frozenset({"hooks.local"})
+    assert webhook_allowed("https://hooks.local/x", hosts)
+    assert not webhook_allowed("http://169.254.169.254/x", hosts)
+    assert not webhook_allowed("file://hooks.local/x", hosts)
+
+
+async def test_webhook_dispatch_does_not_block_caller() -> None:
+    release = asyncio.Event()
+    delivered: list[str] = []
+
+    async def receive(request: httpx.Request) -> httpx.Response:
+        await release.wait()  # a slow receiver
+        delivered.append(json.loads(request.content)["job_id"])
+        return httpx.Response(204)
+
+    dispatcher = WebhookDispatcher(
+        "s3cret", max_in_flight=1, transport=httpx.MockTransport(receive),
+    )
+    status = _record(status="succeeded").public()
+    assert dispatcher.dispatch("http://hooks.local/done", status)
+    assert not dispatcher.dispatch("http://hooks.local/done", status)  # over the cap
+    assert dispatcher.in_flight == 1 and delivered == []
+
+    release.set()
+    await dispatcher.close(grace_s=1)
+    assert delivered == ["j1"]
+    assert dispatcher.in_flight == 0
+
+
+def _headers(user: str, body: str, role: str = "operator") -> dict[str, str]:
+    timestamp = str(int(time.time()))
+    nonce = generate_nonce()
+    return {
+        "Authorization": f"Bearer {create_token(user, role, config.jwt_secret)}",
+        "X-HMAC-Signature": sign_request(body, config.hmac_secret, timestamp, nonce),
+        "X-HMAC-Timestamp": timestamp,
+        "X-HMAC-Nonce": nonce,
+        "Content-Type": "application/json",
+    }
+
+
+async def test_async_process_round_trip(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def guard(request, nss_request, labels, shape):  # noqa: ANN001, ANN202
+        return gw._Guarded("audit-1", nss_request.user_id, 1, time.perf_counter(), 0.1, "m", "p")
+
+    async def generate(guarded, shape):  # noqa: ANN001, ANN202
+        return NSSResponse(
+            response="done", risk_score=guarded.risk_score, model_used=guarded.model,
+            latency_ms=1.0, privacy_tier=guarded.privacy_tier, audit_id=guarded.audit_id,
+        )
+
+    monkeypatch.setattr(gw, "_guard", guard)
+    monkeypatch.setattr(gw, "_generate", generate)
+    monkeypatch.setattr(gw, "_admission", None)
+    monkeypatch.setattr(gw, "_job_store", JobStore(redis_url="redis://127.0.0.1:1/0"))
+    runner = JobRunner(gw._run_job, workers=1)
+    monkeypatch.setattr(gw, "_job_runner", runner)
+    await runner.start()
+
+    body = json.dumps({"user_id": "alice", "message": "hi", "privacy_tier": 1})
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=gw.app), base_url="http://test",
+    ) as client:
+        r = await client.post("/v1/process/async", content=body, headers=_headers("alice", body))
+        assert r.status_code == 202
+        job = r.json()
+        assert job["status"] == "queued" and job["audit_id"] == "audit-1"
+        assert r.headers["Location"] == f"/v1/jobs/{job['job_id']}"
+
+        await asyncio.wait_for(runner.join(), timeout=1)
+        r = await client.get(r.headers["Location"], headers=_headers("alice", ""))
+        assert r.json()["status"] == "succeeded"
+        assert r.json()["result"]["response"] == "done"
+        assert "owner" not in r.json()
+
+        r = await client.get(f"/v1/jobs/{job['job_id']}", headers=_headers("mallory", ""))
+        assert r.status_code == 404
+        r = await client.get(f"/v1/jobs/{job['job_id']}", headers=_headers("root", "", "admin"))
+        assert r.status_code == 200
+
+        hooked = json.dumps({"user_id": "alice", "message": "hi", "webhook_url": "http://x/y"})
+        r = await client.post(
+            "/v1/process/async", content=hooked, headers=_headers("alice", hooked),
+        )
+        assert r.status_code == 422
+    await runner.stop()
+    assert owner_key("alice", "k") != owner_key("bob", "k")
@@ -48,3 +48,15 @@ def test_multiple_pii() -> None:
     assert "[REDACTED_EMAIL]" in result
     assert "[REDACTED_PHONE]" in result
     assert len(entities) >= 2
+
+
+def test_overlapping_matches_redacted_once() -> None:
+    """Card numbers also match PHONE; the span is replaced by one tag."""
+    result, entities = redact_pii("Card 4111 1111 1111 1111 end")
+    assert result == "Card [REDACTED_CREDIT_CARD] end"
+    assert {e.entity_type for e in entities} == {"CREDIT_CARD", "PHONE"}
+
+
+def test_iban_with_nested_matches() -> None:
+    result, _ = redact_pii("IBAN DE89 3704 0044 0532 0130 00 ok")
+    assert result == "IBAN [REDACTED_IBAN] ok"
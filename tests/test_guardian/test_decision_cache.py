@@ -0,0 +1,89 @@
+"""Tests for the guardian decision cache."""
+
+from unittest.mock import AsyncMock
+
+from nss.cache import CacheLayer
+from nss.guardian.decision_cache import MARS_LAYER, GuardianDecisionCache
+from nss.metrics import nss_guardian_cache_hits
+from nss.models import RiskScore, SentinelResult
+
+
+def _memory_cache() -> CacheLayer:
+    """CacheLayer backed by an in-memory dict instead of Redis."""
+    store: dict[str, str] = {}
+    cache = CacheLayer()
+    cache._available = True
+    cache._client = AsyncMock()
+    cache._client.get = AsyncMock(side_effect=lambda key: store.get(key))
+    cache._client.setex = AsyncMock(
+        side_effect=lambda key, ttl, value: store.__setitem__(key, value),
+    )
+    return cache
+
+
+def _sentinel_result() -> SentinelResult:
+    return SentinelResult(
+        is_safe=True,
+        confidence=1.0,
+        method_results={"rules": False, "embedding": False, "llm": None},
+        consensus="0/3 methods flagged injection.",
+    )
+
+
+async def test_sentinel_round_trip() -> None:
+    dc = GuardianDecisionCache(_memory_cache())
+    assert await dc.get_sentinel("hello") is None
+
+    await dc.set_sentinel("hello", _sentinel_result())
+    before = nss_guardian_cache_hits.value
+    cached = await dc.get_sentinel("hello")
+
+    assert cached == _sentinel_result()
+    assert nss_guardian_cache_hits.value == before + 1
+
+
+async def test_risk_round_trip_and_ttl() -> None:
+    cache = _memory_cache()
+    dc = GuardianDecisionCache(cache, mars_ttl=120)
+    risk = RiskScore(score=0.2, tier=3, category="LOW", details="ok")
+
+    await dc.set_risk("hello", risk)
+
+    assert await dc.get_risk("hello") == risk
+    assert cache._client.setex.call_args.args[1] == 120
+    assert f":{MARS_LAYER}:" in cache._client.setex.call_args.args[0]
+
+
+async def test_error_scores_not_cached() -> None:
+    cache = _memory_cache()
+    dc = GuardianDecisionCache(cache)
+    await dc.set_risk("hello", RiskScore(score=0.5, tier=2, category="ERROR", details="x"))
+    cache._client.setex.assert_not_called()
+
+
+async def test_failed_llm_votes_not_cached() -> None:
+    cache = _memory_cache()
+    dc = GuardianDecisionCache(cache)
+    await dc.set_sentinel("hello", _sentinel_result().model_copy(update={"llm_error": True}))
+    cache._client.setex.assert_not_called()
+
+
+async def test_fingerprint_separates_entries() -> None:
+    cache = _memory_cache()
+    await GuardianDecisionCache(cache, fingerprint="a").set_sentinel("hi", _sentinel_result())
+    assert await GuardianDecisionCache(cache, fingerprint="b").get_sentinel("hi") is None
+    assert await GuardianDecisionCache(cache, fingerprint="a").get_sentinel("hi") is not None
+
+
+async def test_zero_ttl_disables_layer() -> None:
+    cache = _memory_cache()
+    dc = GuardianDecisionCache(cache, sentinel_ttl=0)
+    await dc.set_sentinel("hi", _sentinel_result())
+    assert await dc.get_sentinel("hi") is None
+    cache._client.setex.assert_not_called()
+
+
+async def test_degrades_without_redis() -> None:
+    dc = GuardianDecisionCache(CacheLayer())
+    await dc.set_sentinel("hi", _sentinel_result())
+    assert await dc.get_sentinel("hi") is None
@@ -1,8 +1,9 @@
 """Tests for Guardian Shield API server."""
 
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
-from httpx import AsyncClient, ASGITransport
+from httpx import ASGITransport, AsyncClient
 
 from nss.auth import create_token
 from nss.guardian.server import app
@@ -21,7 +22,9 @@ def _mock_guardian_components(monkeypatch):
     import nss.guardian.server as srv
 
     mock_ollama = AsyncMock()
-    mock_ollama.generate = AsyncMock(return_value='{"score": 0.15, "category": "LOW", "details": "safe"}')
+    mock_ollama.generate = AsyncMock(
+        return_value='{"score": 0.15, "category": "LOW", "details": "safe"}',
+    )
     mock_ollama.close = AsyncMock()
 
     mock_mars = AsyncMock()
@@ -30,14 +33,17 @@ def _mock_guardian_components(monkeypatch):
         model_dump=lambda: {"score": 0.15, "tier": 3, "category": "LOW", "details": "safe"},
     ))
 
+    methods = {"rules": True, "llm": True, "embedding": True}
     mock_sentinel = AsyncMock()
     mock_sentinel.check_injection = AsyncMock(return_value=MagicMock(
-        is_safe=True, confidence=0.95, method_results={"rules": True, "llm": True, "embedding": True}, consensus="PASS",
-        model_dump=lambda: {"is_safe": True, "confidence": 0.95, "method_results": {"rules": True, "llm": True, "embedding": True}, "consensus": "PASS"},
+        is_safe=True, confidence=0.95, method_results=methods, consensus="PASS",
+        model_dump=lambda: {
+            "is_safe": True, "confidence": 0.95, "method_results": methods, "consensus": "PASS",
+        },
     ))
 
-    from nss.guardian.apex import APEXRouter
     from nss.config import NSSConfig
+    from nss.guardian.apex import APEXRouter
     mock_apex = APEXRouter(NSSConfig())
 
     monkeypatch.setattr(srv, "_ollama_client", mock_ollama)
@@ -53,9 +59,47 @@ async def test_health(_mock_guardian_components) -> None:
         assert resp.json()["service"] == "guardian-shield"
 
 
+async def test_degraded_mode_skips_llm(_mock_guardian_components, monkeypatch) -> None:
+    import nss.guardian.server as srv
+    from nss.llm.circuit_breaker import CircuitBreaker
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=60)
+    breaker.record_failure()
+    monkeypatch.setattr(srv, "_llm_breaker", breaker)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        health = (await client.get("/health")).json()
+        await client.post("/v1/sentinel/check", json={"text": "hi"}, headers=_auth_headers())
+    assert health["status"] == "degraded"
+    assert health["llm_circuit"] == "open"
+    assert srv._sentinel.check_injection.call_args.kwargs["use_llm"] is False
+
+
+async def test_degraded_mars_score_uses_heuristic(_mock_guardian_components, monkeypatch) -> None:
+    import nss.guardian.server as srv
+    from nss.llm.circuit_breaker import CircuitBreaker
+    from nss.models import SentinelResult
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=60)
+    breaker.record_failure()
+    monkeypatch.setattr(srv, "_llm_breaker", breaker)
+    srv._sentinel.check_injection.return_value = SentinelResult(
+        is_safe=False, confidence=1.0, method_results={"rules": False}, consensus="BLOCK",
+    )
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        resp = await client.post(
+            "/v1/mars/score", json={"text": "DROP TABLE users"}, headers=_auth_headers(),
+        )
+    data = resp.json()
+    assert data["category"] == "HEURISTIC"
+    assert data["score"] == pytest.approx(0.92)  # signature match
+    srv._mars_scorer.score_risk.assert_not_called()
+
+
 async def test_mars_score(_mock_guardian_components) -> None:
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-        resp = await client.post("/v1/mars/score", json={"text": "Hello world"}, headers=_auth_headers())
+        resp = await client.post(
+            "/v1/mars/score", json={"text": "Hello world"}, headers=_auth_headers(),
+        )
         assert resp.status_code == 200
         data = resp.json()
         assert "score" in data
@@ -63,7 +107,9 @@ async def test_mars_score(_mock_guardian_components) -> None:
 
 async def test_sentinel_check(_mock_guardian_components) -> None:
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-        resp = await client.post("/v1/sentinel/check", json={"text": "normal query"}, headers=_auth_headers())
+        resp = await client.post(
+            "/v1/sentinel/check", json={"text": "normal query"}, headers=_auth_headers(),
+        )
         assert resp.status_code == 200
         data = resp.json()
         assert "is_safe" in data
@@ -71,7 +117,11 @@ async def test_sentinel_check(_mock_guardian_components) -> None:
 
 async def test_apex_route(_mock_guardian_components) -> None:
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-        resp = await client.post("/v1/apex/route", json={"query": "test", "confidence": 0.9, "budget_remaining": 10.0}, headers=_auth_headers())
+        resp = await client.post(
+            "/v1/apex/route",
+            json={"query": "test", "confidence": 0.9, "budget_remaining": 10.0},
+            headers=_auth_headers(),
+        )
         assert resp.status_code == 200
         data = resp.json()
         assert "model_selected" in data
@@ -79,13 +129,52 @@ async def test_apex_route(_mock_guardian_components) -> None:
 
 async def test_shield_enhance(_mock_guardian_components) -> None:
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-        resp = await client.post("/v1/shield/enhance", json={"prompt": "Hello"}, headers=_auth_headers())
+        resp = await client.post(
+            "/v1/shield/enhance", json={"prompt": "Hello"}, headers=_auth_headers(),
+        )
         assert resp.status_code == 200
         assert "enhanced_prompt" in resp.json()
 
 
 async def test_vigil_check(_mock_guardian_components) -> None:
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-        resp = await client.post("/v1/vigil/check", json={"tool_name": "search", "args": {"q": "test"}, "user_id": "u1"}, headers=_auth_headers())
+        resp = await client.post(
+            "/v1/vigil/check",
+            json={"tool_name": "search", "args": {"q": "test"}, "user_id": "u1"},
+            headers=_auth_headers(),
+        )
         assert resp.status_code == 200
         assert "verdict" in resp.json()
+
+
+async def test_sentinel_check_blocklist_hit(_mock_guardian_components, monkeypatch) -> None:
+    import nss.guardian.server as srv
+    from nss.guardian.blocklist import BlockedPromptFilter
+
+    blocklist = BlockedPromptFilter(size_bits=1 << 12)
+    blocklist.add("replayed attack")
+    monkeypatch.setattr(srv, "_blocklist", blocklist)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        resp = await client.post(
+            "/v1/sentinel/check", json={"text": "replayed attack"}, headers=_auth_headers(),
+        )
+        assert resp.status_code == 200
+        assert resp.json()["is_safe"] is False
+    srv._sentinel.check_injection.assert_not_called()
+
+
+async def test_flight_recorder_requires_admin(_mock_guardian_components) -> None:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        resp = await client.get("/v1/admin/flight-recorder", headers=_auth_headers("viewer"))
+        assert resp.status_code == 403
+
+
+async def test_flight_recorder_dumps_timelines(_mock_guardian_components) -> None:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.post("/v1/mars/score", json={"text": "Hello world"}, headers=_auth_headers())
+        resp = await client.get("/v1/admin/flight-recorder", headers=_auth_headers())
+        assert resp.status_code == 200
+        data = resp.json()
+        assert any(r["path"] == "/v1/mars/score" for r in data["slowest"])
+        assert "Hello world" not in resp.text
@@ -2,8 +2,9 @@
 
 import pytest
 
-from nss.guardian.mars import MARSScorer, classify_tier
-from nss.models import RiskScore
+from nss.guardian.mars import MARSScorer, classify_tier, heuristic_risk, parse_risk_response
+from nss.llm.model_config import CLASSIFIER_PROFILE
+from nss.models import RiskScore, SentinelResult
 
 
 class TestClassifyTier:
@@ -44,3 +45,67 @@ class TestMARSScorer:
         assert result.details == "No issues found."
         assert result.tier == 3  # 0.15 is below 0.80 -> tier 3
         mock_ollama_client.generate.assert_awaited_once()
+
+    async def test_score_risk_uses_classifier_profile(self, mock_ollama_client) -> None:
+        """MARS must call the LLM with the classifier profile."""
+        scorer = MARSScorer(ollama_client=mock_ollama_client)
+        await scorer.score_risk("Test input text")
+
+        assert mock_ollama_client.generate.call_args.kwargs["profile"] is CLASSIFIER_PROFILE
+
+    async def test_score_risk_invalid_json_defaults(self, mock_ollama_client) -> None:
+        """Non-JSON output is not scraped; MARS falls back to the error score."""
+        mock_ollama_client.generate.return_value = 'Sure! "score": 0.99 looks right.'
+        scorer = MARSScorer(ollama_client=mock_ollama_client)
+        result = await scorer.score_risk("Test input text")
+
+        assert result.score == pytest.approx(0.5)
+        assert result.category == "ERROR"
+
+
+class TestParseRiskResponse:
+    """Tests for the strict MARS JSON parser."""
+
+    def test_parse_valid(self) -> None:
+        score, category, details = parse_risk_response(
+            '{"score": 1.7, "category": "ABUSE", "details": "x"}'
+        )
+        assert score == 1.0
+        assert category == "ABUSE"
+        assert details == "x"
+
+    def test_parse_missing_score_raises(self) -> None:
+        with pytest.raises(ValueError):
+            parse_risk_response('{"category": "ABUSE"}')
+
+    def test_parse_non_object_raises(self) -> None:
+        with pytest.raises(ValueError):
+            parse_risk_response("[0.5]")
+
+
+class TestHeuristicRisk:
+    """Tests for the degraded-mode MARS heuristic."""
+
+    @staticmethod
+    def _sentinel(rules: bool | None, embedding: bool | None) -> SentinelResult:
+        return SentinelResult(
+            is_safe=True,
+            confidence=0.7,
+            method_results={"rules": rules, "embedding": embedding, "llm": None},
+            consensus="PASS",
+            matched_rules=["sqli-union"] if rules is False else [],
+        )
+
+    def test_signature_hit_is_high(self) -> None:
+        risk = heuristic_risk(self._sentinel(rules=False, embedding=True))
+        assert risk.tier == 1
+        assert risk.category == "HEURISTIC"
+        assert "sqli-union" in risk.details
+
+    def test_embedding_hit_is_medium(self) -> None:
+        assert heuristic_risk(self._sentinel(rules=True, embedding=False)).tier == 2
+
+    def test_clean_input_is_low(self) -> None:
+        risk = heuristic_risk(self._sentinel(rules=True, embedding=None))
+        assert risk.tier == 3
+        assert risk.score < 0.8
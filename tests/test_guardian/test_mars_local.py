@@ -0,0 +1,159 @@
+"""Tests for the local fast-path MARS classifier."""
+
+import json
+import random
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from nss.guardian.mars_local import (
+    LocalRiskModel,
+    TieredMARSScorer,
+    TrainingSampleStore,
+    export_training_samples,
+    main,
+    train_local_model,
+)
+from nss.metrics import nss_mars_local_resolved
+from nss.models import RiskScore
+
+
+def _synthetic_samples(n: int = 200) -> list[tuple[list[float], float]]:
+    """Benign texts cluster at +x, attacks at -x (8-dim features)."""
+    rng = random.Random(42)
+    samples = []
+    for i in range(n):
+        attack = i % 2 == 0
+        centre = -1.0 if attack else 1.0
+        features = [centre + rng.gauss(0, 0.1)] + [rng.gauss(0, 0.1) for _ in range(7)]
+        samples.append((features, 0.99 if attack else 0.05))
+    return samples
+
+
+class TestLocalRiskModel:
+    """Tests for training, prediction and persistence."""
+
+    def test_train_separates_classes(self) -> None:
+        model = train_local_model(_synthetic_samples())
+        assert model.predict([1.0] + [0.0] * 7) < 0.2
+        assert model.predict([-1.0] + [0.0] * 7) > 0.9
+
+    def test_train_requires_samples(self) -> None:
+        with pytest.raises(ValueError):
+            train_local_model(_synthetic_samples(4))
+
+    def test_save_load_round_trip(self, tmp_path) -> None:
+        model = LocalRiskModel(weights=[0.5, -0.5], bias=0.1, margin=0.07, samples=12)
+        path = tmp_path / "model.json"
+        model.save(path)
+
+        loaded = LocalRiskModel.load(path)
+        assert loaded.weights == [0.5, -0.5]
+        assert loaded.margin == pytest.approx(0.07)
+        assert loaded.predict([1.0, 1.0]) == pytest.approx(model.predict([1.0, 1.0]))
+
+    def test_predict_dimension_mismatch(self) -> None:
+        model = LocalRiskModel(weights=[1.0, 1.0], bias=0.0, margin=0.1)
+        with pytest.raises(ValueError):
+            model.predict([1.0])
+
+
+class TestTieredMARSScorer:
+    """Tests for local resolution vs. LLM deferral."""
+
+    def _scorer(self, features: list[float], margin: float = 0.05):
+        llm = AsyncMock()
+        llm.score_risk.return_value = RiskScore(
+            score=0.86, tier=2, category="LLM", details="from llm",
+        )
+        embedder = MagicMock()
+        embedder.embed.return_value = features
+        # predict() == sigmoid(features[0]): steer the score via the feature.
+        model = LocalRiskModel(weights=[1.0], bias=0.0, margin=margin)
+        return TieredMARSScorer(llm, model=model, embedding_service=embedder), llm
+
+    async def test_confident_prediction_resolved_locally(self) -> None:
+        scorer, llm = self._scorer([-3.0])  # sigmoid(-3) ~ 0.047 -> clearly tier 3
+        before = nss_mars_local_resolved.value
+
+        risk, source, _ = await scorer.score_risk_with_source("hello")
+
+        assert source == "local"
+        assert risk.tier == 3
+        assert risk.category == "LOCAL_LOW"
+        llm.score_risk.assert_not_awaited()
+        assert nss_mars_local_resolved.value == before + 1
+
+    async def test_uncertain_band_defers_to_llm(self) -> None:
+        scorer, llm = self._scorer([1.8])  # sigmoid(1.8) ~ 0.858, near 0.85/0.90
+
+        risk = await scorer.score_risk("borderline")
+
+        assert risk.category == "LLM"
+        llm.score_risk.assert_awaited_once()
+
+    async def test_capture_returns_features_for_llm_verdicts(self) -> None:
+        llm = AsyncMock()
+        llm.score_risk.return_value = RiskScore(score=0.1, tier=3, category="LOW", details="")
+        embedder = MagicMock()
+        embedder.embed.return_value = [0.25, 0.5]
+        scorer = TieredMARSScorer(
+            llm, model=None, embedding_service=embedder, capture_features=True,
+        )
+
+        _risk, source, features = await scorer.score_risk_with_source("text")
+
+        assert source == "llm"
+        assert features == [0.25, 0.5]
+
+
+class TestTrainingSampleStore:
+    """Tests for the purgeable training-sample store."""
+
+    async def test_put_and_purge_user(self) -> None:
+        store = TrainingSampleStore(ttl_seconds=60)
+        pipe = MagicMock()
+        pipe.execute = AsyncMock()
+        store._client = MagicMock()
+        store._client.pipeline.return_value = pipe
+        store._client.smembers = AsyncMock(return_value={"a1", "a2"})
+        store._client.delete = AsyncMock(return_value=2)
+        risk = RiskScore(score=0.1, tier=3, category="LOW", details="")
+
+        assert await store.put("a1", "user-1", [0.123456], risk) is True
+
+        key, ttl, raw = pipe.setex.call_args.args
+        assert (key, ttl) == ("nss:mars:samples:a1", 60)
+        assert json.loads(raw) == {"features": [0.12346], "score": 0.1, "category": "LOW"}
+        pipe.sadd.assert_called_once_with("nss:mars:samples_by_user:user-1", "a1")
+        assert await store.purge_user("user-1") == 2
+        assert set(store._client.delete.await_args_list[0].args) == {
+            "nss:mars:samples:a1", "nss:mars:samples:a2",
+        }
+
+    async def test_put_without_redis_is_skipped(self) -> None:
+        risk = RiskScore(score=0.1, tier=3, category="LOW", details="")
+        assert await TrainingSampleStore().put("a1", "u", [0.1], risk) is False
+
+
+class TestExport:
+    """Tests for training-sample export and the CLI."""
+
+    def test_export_filters_samples_with_features(self) -> None:
+        samples = [
+            {"features": [1.0], "score": 0.2, "category": "LOW"},
+            {"features": [1.0], "score": 0.5, "category": "ERROR"},
+            {"features": [], "score": 0.2, "category": "LOW"},
+        ]
+        assert export_training_samples(samples) == [{"features": [1.0], "score": 0.2}]
+
+    def test_cli_train(self, tmp_path) -> None:
+        data = tmp_path / "verdicts.jsonl"
+        data.write_text("".join(
+            json.dumps({"features": f, "score": s}) + "\n" for f, s in _synthetic_samples(50)
+        ))
+        out = tmp_path / "model.json"
+
+        main(["train", "--data", str(data), "--out", str(out), "--epochs", "50"])
+
+        assert LocalRiskModel.load(out).samples == 50
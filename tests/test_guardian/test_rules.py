@@ -0,0 +1,151 @@
+"""Tests for the SENTINEL signature rule engine."""
+
+import json
+import re
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from nss.guardian.rules import (
+    DEFAULT_PACK,
+    LiteralAutomaton,
+    RuleEngine,
+    SignatureRule,
+    load_rule_engine,
+)
+from nss.guardian.sentinel import SentinelDefense
+
+
+def _rule(rule_id: str, literal: str, pattern: str, **kwargs) -> SignatureRule:
+    return SignatureRule(id=rule_id, category="test", literals=[literal], pattern=pattern, **kwargs)
+
+
+class TestLiteralAutomaton:
+    """The pure-Python Aho-Corasick automaton finds every occurrence."""
+
+    def test_overlapping_literals(self) -> None:
+        literals = ["he", "she", "his", "hers"]
+        hits = sorted(
+            (end - len(literals[i]), literals[i])
+            for end, i in LiteralAutomaton(literals).iter("ushers")
+        )
+        assert hits == [(1, "she"), (2, "he"), (2, "hers")]
+
+    def test_matches_naive_search(self) -> None:
+        literals = ["ab", "bab", "abab", "b"]
+        text = "abababbab"
+        expected = sorted(
+            (i + len(lit), idx)
+            for idx, lit in enumerate(literals)
+            for i in range(len(text))
+            if text.startswith(lit, i)
+        )
+        assert sorted(LiteralAutomaton(literals).iter(text)) == expected
+
+
+class TestRuleEngine:
+    """Matching, reporting and pack loading."""
+
+    @pytest.mark.parametrize("native", [True, False])
+    def test_default_pack_reports_rule_ids(self, native: bool) -> None:
+        engine = RuleEngine.from_packs([DEFAULT_PACK], native=native)
+        ids = [m.rule_id for m in engine.scan("'; DROP TABLE users; --")]
+        assert ids == ["sqli.drop_table", "sqli.comment_terminator"]
+        assert engine.scan("What is the weather today?") == []
+
+    def test_literal_prefilter_is_case_insensitive(self) -> None:
+        engine = RuleEngine([_rule("r1", "select", r"(?i)select\s+\*")])
+        match = engine.scan("please SELECT * from t")[0]
+        assert (match.rule_id, match.start, match.end) == ("r1", 7, 15)
+
+    def test_regex_confined_to_window(self) -> None:
+        engine = RuleEngine([_rule("r1", "key", r"key.*secret", after=20)])
+        assert engine.matches("key = my secret")
+        assert not engine.matches("key" + "x" * 50 + "secret")
+
+    def test_first_only_stops_early(self) -> None:
+        engine = RuleEngine([_rule("a", "foo", "foo"), _rule("b", "bar", "bar")])
+        assert len(engine.scan("foo bar")) == 2
+        assert len(engine.scan("foo bar", first_only=True)) == 1
+
+    def test_offsets_survive_expanding_lowercase(self) -> None:
+        engine = RuleEngine([_rule("r1", "drop", r"(?i)drop\s+table")])
+        match = engine.scan("İİ DROP TABLE x")[0]
+        assert (match.start, match.end) == (3, 13)
+
+    def test_offsets_refer_to_uncollapsed_text(self) -> None:
+        engine = RuleEngine([_rule("r1", "drop", r"(?i)drop\s+table", anchored=True, after=8)])
+        text = "x  DROP" + " " * 80 + "TABLE"
+        match = engine.scan(text)[0]
+        assert (match.start, match.end) == (3, len(text))
+
+    def test_duplicate_ids_rejected(self) -> None:
+        with pytest.raises(ValueError):
+            RuleEngine([_rule("x", "a", "a"), _rule("x", "b", "b")])
+
+    def test_oversized_window_rejected(self) -> None:
+        with pytest.raises(ValueError):
+            _rule("x", "a", "a", before=4096)
+
+    def test_load_extra_pack_directory(self, tmp_path) -> None:
+        pack = {
+            "name": "custom",
+            "rules": [{"id": "custom.jailbreak", "category": "prompt_injection",
+                       "literals": ["jailbreak"], "pattern": "(?i)jailbreak\\s+mode"}],
+        }
+        (tmp_path / "custom.json").write_text(json.dumps(pack))
+
+        engine = load_rule_engine(str(tmp_path))
+
+        assert [m.rule_id for m in engine.scan("enable Jailbreak mode")] == ["custom.jailbreak"]
+        assert engine.matches("; cat /etc/passwd")  # default pack still loaded
+
+
+async def test_sentinel_reports_matched_rules() -> None:
+    sentinel = SentinelDefense(AsyncMock())
+    with patch.object(sentinel, "check_embedding_similarity", return_value=True):
+        result = await sentinel.check_injection("<script>alert(1)</script>")
+    assert result.is_safe is False
+    assert result.matched_rules == ["xss.script_tag"]
+    assert "xss.script_tag" in result.consensus
+
+
+def test_anchored_rule_matches_only_at_literal() -> None:
+    engine = RuleEngine([_rule("r1", "on", r"(?i)on\w+\s*=", anchored=True, after=32)])
+    assert engine.matches("<img onload = x>")
+    assert not engine.matches("x" * 10 + "onon")
+
+
+# SENTINEL's unwindowed regexes before the signature engine replaced them.
+_BASELINE_PATTERNS = [
+    re.compile(
+        r"(?i)(?:union\s+select|drop\s+table|insert\s+into|delete\s+from|"
+        r"update\s+\w+\s+set|;\s*--)",
+    ),
+    re.compile(r"(?i)<\s*script[^>]*>|javascript\s*:|on\w+\s*="),
+    re.compile(r"(?:;|\||&&|\$\(|`)\s*(?:cat|ls|rm|curl|wget|bash|sh|python|nc)\b"),
+    re.compile(r"[()\*|&].*?(?:objectClass|userPassword|cn=|uid=)"),
+]
+
+
+@pytest.mark.parametrize("pad", [" " * 80, "\t \n " * 200, "\n" + " " * 600])
+@pytest.mark.parametrize(
+    "template",
+    [
+        "DROP{pad}TABLE users",
+        "1 UNION{pad}SELECT password",
+        "UPDATE{pad}accounts{pad}SET admin=1",
+        "x';{pad}-- comment",
+        "<{pad}script src=x>",
+        "javascript{pad}:alert(1)",
+        "<img onerror{pad}= alert(1)>",
+        "a |{pad}curl http://x",
+        "(|{pad}(uid=*))",
+        "harmless{pad}text",
+    ],
+)
+def test_padding_matches_baseline(template: str, pad: str) -> None:
+    """Whitespace padding cannot push a match out of a rule's window."""
+    text = template.format(pad=pad)
+    baseline = any(p.search(text) for p in _BASELINE_PATTERNS)
+    assert RuleEngine.from_packs([DEFAULT_PACK]).matches(text) is baseline
@@ -1,10 +1,9 @@
 """Async tests for the SENTINEL injection-defence system."""
 
-from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+from unittest.mock import MagicMock, patch
 
-import pytest
-
-from nss.guardian.sentinel import SentinelDefense
+from nss.guardian.sentinel import SentinelDefense, split_windows
 from nss.models import SentinelResult
 
 
@@ -13,7 +12,7 @@ class TestCheckLLM:
 
     async def test_check_llm_safe(self, mock_ollama_client) -> None:
         """LLM returning 'SAFE' should not flag as suspicious."""
-        mock_ollama_client.generate.return_value = "SAFE"
+        mock_ollama_client.generate.return_value = '{"verdict": "SAFE"}'
         sentinel = SentinelDefense(ollama_client=mock_ollama_client)
 
         result = await sentinel.check_llm("Hello, how are you?")
@@ -21,7 +20,7 @@ class TestCheckLLM:
 
     async def test_check_llm_suspicious(self, mock_ollama_client) -> None:
         """LLM returning 'SUSPICIOUS' should flag as suspicious."""
-        mock_ollama_client.generate.return_value = "SUSPICIOUS"
+        mock_ollama_client.generate.return_value = '{"verdict": "SUSPICIOUS"}'
         sentinel = SentinelDefense(ollama_client=mock_ollama_client)
 
         result = await sentinel.check_llm("'; DROP TABLE users; --")
@@ -35,14 +34,46 @@ class TestCheckLLM:
         result = await sentinel.check_llm("test input")
         assert result is False
 
+    async def test_check_llm_non_json_fails_open(self, mock_ollama_client) -> None:
+        """A free-text answer is rejected by the strict parser (fail open)."""
+        mock_ollama_client.generate.return_value = "This looks SUSPICIOUS to me."
+        sentinel = SentinelDefense(ollama_client=mock_ollama_client)
+
+        result = await sentinel.check_llm("test input")
+        assert result is False
+
+    async def test_check_llm_uses_classifier_profile(self, mock_ollama_client) -> None:
+        """The LLM check must use the capped, JSON-mode classifier profile."""
+        from nss.llm.model_config import CLASSIFIER_PROFILE
+
+        mock_ollama_client.generate.return_value = '{"verdict": "SAFE"}'
+        sentinel = SentinelDefense(ollama_client=mock_ollama_client)
+
+        await sentinel.check_llm("Hello")
+        assert mock_ollama_client.generate.call_args.kwargs["profile"] is CLASSIFIER_PROFILE
+
+    async def test_check_llm_records_stage_latency(self, mock_ollama_client) -> None:
+        """Each LLM vote is observed in the per-stage latency histogram."""
+        from nss.metrics import nss_stage_latency
+
+        mock_ollama_client.generate.return_value = '{"verdict": "SAFE"}'
+        sentinel = SentinelDefense(ollama_client=mock_ollama_client)
+        stage = nss_stage_latency.labels(stage="sentinel_llm")
+        before = stage.count
+
+        await sentinel.check_llm("Hello")
+        assert stage.count == before + 1
+
 
 class TestCheckInjection:
     """Tests for the aggregated consensus-based injection check."""
 
     async def test_check_injection_all_safe(self, mock_ollama_client) -> None:
         """When all methods report safe, is_safe should be True."""
-        mock_ollama_client.generate.return_value = "SAFE"
-        sentinel = SentinelDefense(ollama_client=mock_ollama_client, consensus_threshold=2)
+        mock_ollama_client.generate.return_value = '{"verdict": "SAFE"}'
+        sentinel = SentinelDefense(
+            ollama_client=mock_ollama_client, consensus_threshold=2, short_circuit=False,
+        )
 
         with patch.object(sentinel, "check_embedding_similarity", return_value=False):
             result = await sentinel.check_injection("Hello, how are you?")
@@ -55,7 +86,7 @@ class TestCheckInjection:
 
     async def test_check_injection_rules_flagged(self, mock_ollama_client) -> None:
         """SQL injection text should trigger rules but not reach consensus with threshold=2."""
-        mock_ollama_client.generate.return_value = "SAFE"
+        mock_ollama_client.generate.return_value = '{"verdict": "SAFE"}'
         sentinel = SentinelDefense(ollama_client=mock_ollama_client, consensus_threshold=2)
 
         # This text matches the SQL injection regex ("; --" pattern)
@@ -66,3 +97,163 @@ class TestCheckInjection:
         assert result.method_results["rules"] is False  # rules flagged it
         # Only 1 of 3 methods flagged it (rules), threshold is 2, so still safe
         assert result.is_safe is True
+
+    async def test_llm_failure_is_recorded(self, mock_ollama_client) -> None:
+        """A failed LLM vote counts as safe but marks the result as errored."""
+        mock_ollama_client.generate.side_effect = RuntimeError("connection failed")
+        sentinel = SentinelDefense(
+            ollama_client=mock_ollama_client, consensus_threshold=2, short_circuit=False,
+        )
+
+        with patch.object(sentinel, "check_embedding_similarity", return_value=False):
+            result = await sentinel.check_injection("Hello, how are you?")
+
+        assert result.is_safe is True
+        assert result.llm_error is True
+        assert result.method_results["llm"] is True
+
+
+class TestShortCircuit:
+    """Tests for consensus-aware skipping of the LLM vote."""
+
+    async def test_llm_skipped_when_local_methods_pass(self, mock_ollama_client) -> None:
+        """Rules and embedding pass: the LLM alone cannot reach threshold 2."""
+        sentinel = SentinelDefense(ollama_client=mock_ollama_client, consensus_threshold=2)
+
+        with patch.object(sentinel, "check_embedding_similarity", return_value=False):
+            result = await sentinel.check_injection("Hello, how are you?")
+
+        assert result.is_safe is True
+        assert result.method_results["llm"] is None
+        assert result.method_results["rules"] is True
+        assert "llm" in result.consensus
+        mock_ollama_client.generate.assert_not_awaited()
+
+    async def test_llm_skipped_when_local_methods_block(self, mock_ollama_client) -> None:
+        """Rules and embedding both flag: the verdict is BLOCK without the LLM."""
+        sentinel = SentinelDefense(ollama_client=mock_ollama_client, consensus_threshold=2)
+
+        with patch.object(sentinel, "check_embedding_similarity", return_value=True):
+            result = await sentinel.check_injection("'; DROP TABLE users; --")
+
+        assert result.is_safe is False
+        assert result.method_results["llm"] is None
+        assert result.method_results["embedding"] is False
+        mock_ollama_client.generate.assert_not_awaited()
+
+    async def test_llm_consulted_when_it_decides(self, mock_ollama_client) -> None:
+        """Exactly one local flag: the LLM vote decides the outcome."""
+        mock_ollama_client.generate.return_value = '{"verdict": "SUSPICIOUS"}'
+        sentinel = SentinelDefense(ollama_client=mock_ollama_client, consensus_threshold=2)
+
+        with patch.object(sentinel, "check_embedding_similarity", return_value=False):
+            result = await sentinel.check_injection("'; DROP TABLE users; --")
+
+        assert result.is_safe is False
+        assert result.method_results["llm"] is False
+        mock_ollama_client.generate.assert_awaited_once()
+
+    async def test_threshold_one_skips_after_rules(self, mock_ollama_client) -> None:
+        """With threshold 1, a rules hit decides and nothing else runs."""
+        sentinel = SentinelDefense(ollama_client=mock_ollama_client, consensus_threshold=1)
+
+        with patch.object(sentinel, "check_embedding_similarity") as emb:
+            result = await sentinel.check_injection("<script>alert(1)</script>")
+
+        assert result.is_safe is False
+        assert result.method_results["embedding"] is None
+        assert result.method_results["llm"] is None
+        emb.assert_not_called()
+        mock_ollama_client.generate.assert_not_awaited()
+
+    async def test_degraded_mode_votes_without_llm(self, mock_ollama_client) -> None:
+        """use_llm=False: rules and embedding decide, the LLM is never called."""
+        sentinel = SentinelDefense(ollama_client=mock_ollama_client, consensus_threshold=2)
+
+        with patch.object(sentinel, "check_embedding_similarity", return_value=False):
+            result = await sentinel.check_injection("'; DROP TABLE users; --", use_llm=False)
+
+        assert result.is_safe is True
+        assert result.method_results["llm"] is None
+        assert "Degraded mode" in result.consensus
+        assert "Skipped" not in result.consensus
+        mock_ollama_client.generate.assert_not_awaited()
+
+
+class TestWindowedAnalysis:
+    """Tests for overlapping-window analysis of long inputs."""
+
+    def test_split_windows_short_input_unchanged(self) -> None:
+        assert split_windows("short  text", window_words=10) == ["short  text"]
+
+    def test_split_windows_overlap_and_coverage(self) -> None:
+        text = " ".join(f"w{i}" for i in range(300))
+        windows = split_windows(text, window_words=128, overlap_words=32)
+
+        assert len(windows) == 3
+        assert all(len(w.split()) <= 128 for w in windows)
+        assert windows[0].split()[-32:] == windows[1].split()[:32]
+        assert windows[-1].endswith("w299")
+
+    async def test_llm_only_for_undecided_windows(self, mock_ollama_client) -> None:
+        """Only the window with one local flag needs the LLM vote."""
+        mock_ollama_client.generate.return_value = '{"verdict": "SUSPICIOUS"}'
+        sentinel = SentinelDefense(
+            ollama_client=mock_ollama_client, window_words=10, window_overlap=2,
+        )
+        text = " ".join(f"word{i}" for i in range(24))
+
+        with patch.object(sentinel, "_check_embedding_windows", return_value=[False, True, False]):
+            result = await sentinel.check_injection(text)
+
+        assert result.is_safe is False
+        assert "Window 2/3" in result.consensus
+        mock_ollama_client.generate.assert_awaited_once()
+
+    async def test_early_exit_cancels_remaining_windows(self, mock_ollama_client) -> None:
+        """The first blocking window ends the analysis."""
+        async def slow_generate(**kwargs):
+            await asyncio.sleep(0.01)
+            return '{"verdict": "SUSPICIOUS"}'
+
+        mock_ollama_client.generate.side_effect = slow_generate
+        sentinel = SentinelDefense(
+            ollama_client=mock_ollama_client,
+            short_circuit=False,
+            window_words=10,
+            window_overlap=0,
+            llm_parallelism=1,
+        )
+        text = "DROP TABLE users " + " ".join(f"word{i}" for i in range(60))
+
+        with patch.object(
+            sentinel, "_check_embedding_windows", side_effect=lambda w: [False] * len(w),
+        ):
+            result = await sentinel.check_injection(text)
+
+        assert result.is_safe is False
+        assert result.matched_rules == ["sqli.drop_table"]
+        assert mock_ollama_client.generate.await_count <= 2
+
+    async def test_clean_long_input_passes(self, mock_ollama_client) -> None:
+        sentinel = SentinelDefense(ollama_client=mock_ollama_client, window_words=10)
+        text = " ".join(f"word{i}" for i in range(40))
+
+        with patch.object(
+            sentinel, "_check_embedding_windows", side_effect=lambda w: [False] * len(w),
+        ):
+            result = await sentinel.check_injection(text)
+
+        assert result.is_safe is True
+        mock_ollama_client.generate.assert_not_awaited()
+
+    def test_embedding_windows_use_one_batch(self, mock_ollama_client) -> None:
+        sentinel = SentinelDefense(ollama_client=mock_ollama_client)
+        with patch("nss.guardian.sentinel.EmbeddingService") as mock_emb_cls:
+            mock_emb = MagicMock()
+            mock_emb.embed_batch.return_value = [[1.0, 0.0], [0.0, 1.0]]
+            mock_emb.embed.return_value = [0.0, 1.0]  # every known attack
+            mock_emb_cls.return_value = mock_emb
+
+            assert sentinel._check_embedding_windows(["a", "b"]) == [False, True]
+        mock_emb.embed_batch.assert_called_once_with(["a", "b"])
@@ -0,0 +1,124 @@
+"""Tests for multi-backend Ollama routing against mock Ollama servers."""
+
+import httpx
+
+from nss.bench.mock_ollama import MockProfile, create_app, serve_in_thread
+from nss.config import NSSConfig
+from nss.llm.backend_pool import BackendPool, pool_from_config, prefix_key
+from nss.llm.ollama_client import OllamaClient
+
+SMALL = "mistral:7b-instruct-v0.3"
+LARGE = "mistral-nemo:12b"
+
+
+def _mock(**profile: object) -> httpx.ASGITransport:
+    return httpx.ASGITransport(app=create_app(MockProfile(mode="echo", **profile)))
+
+
+class _Switchable(httpx.AsyncBaseTransport):
+    """Transport that refuses connections while ``down`` is set."""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport) -> None:
+        self.inner = inner
+        self.down = False
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.down:
+            raise httpx.ConnectError("refused", request=request)
+        return await self.inner.handle_async_request(request)
+
+
+async def test_discovers_models_and_prefers_warm_backend() -> None:
+    pool = BackendPool(
+        ["http://a", "http://b", "http://c"],
+        health_interval_s=0,
+        transports={
+            "http://a": _mock(models=[SMALL]),
+            "http://b": _mock(models=[SMALL, LARGE], loaded_models=[SMALL]),
+            "http://c": _mock(models=[SMALL, LARGE], loaded_models=[LARGE]),
+        },
+    )
+    await pool.start()
+    assert pool.backends[1].models == {SMALL, LARGE}
+    assert pool.backends[2].loaded == {LARGE}
+
+    assert (pool.replicas(SMALL), pool.replicas(LARGE), pool.replicas("other")) == (3, 2, 3)
+    for i in range(10):
+        assert pool.choose(LARGE, prefix_key(LARGE, "", f"prompt {i}")).url == "http://c"
+    # Not loaded anywhere: any backend that has it pulled.
+    pool.backends[2].loaded.clear()
+    assert pool.choose(LARGE, "k").url in {"http://b", "http://c"}
+    await pool.close()
+
+
+async def test_sticky_by_prefix_until_overloaded() -> None:
+    urls = [f"http://b{i}" for i in range(4)]
+    pool = BackendPool(urls, health_interval_s=0, sticky_slack=1)
+    key = prefix_key(SMALL, "system", "same opening")
+    preferred = pool.choose(SMALL, key)
+    assert all(pool.choose(SMALL, key) is preferred for _ in range(5))
+    # Other prefixes spread over the backends.
+    assert len({pool.choose(SMALL, prefix_key(SMALL, "s", str(i))).url for i in range(40)}) > 1
+
+    preferred.outstanding = 2  # least-loaded has 0; slack 1 is exceeded
+    assert pool.choose(SMALL, key) is not preferred
+    preferred.outstanding = 1
+    assert pool.choose(SMALL, key) is preferred
+    await pool.close()
+
+
+async def test_ejects_and_readmits_backend() -> None:
+    flaky = _Switchable(_mock())
+    pool = BackendPool(
+        ["http://ok", "http://flaky"],
+        health_interval_s=0,
+        eject_after=2,
+        transports={"http://ok": _mock(), "http://flaky": flaky},
+    )
+    flaky.down = True
+    await pool.refresh()
+    assert pool.backends[1].healthy
+    await pool.refresh()
+    assert not pool.backends[1].healthy
+    assert all(pool.choose(SMALL, str(i)).url == "http://ok" for i in range(20))
+    assert pool.replicas(SMALL) == 1
+
+    flaky.down = False
+    await pool.refresh()
+    assert pool.backends[1].healthy
+    await pool.close()
+
+
+async def test_client_routes_and_retries_refused_backend() -> None:
+    down = _Switchable(_mock())
+    down.down = True
+    pool = BackendPool(
+        ["http://up", "http://down"],
+        health_interval_s=0,
+        transports={"http://up": _mock(), "http://down": down},
+    )
+    client = OllamaClient(pool=pool)
+    # Before any probe both backends are eligible; refused calls move over.
+    for i in range(6):
+        assert await client.generate(f"hello {i}") == f"hello {i}"
+    assert pool.backends[0].served == 6
+    assert pool.backends[1].failures > 0
+    assert all(b.outstanding == 0 for b in pool.backends)
+    await client.close()
+
+
+async def test_against_local_mock_servers() -> None:
+    with (
+        serve_in_thread(MockProfile(mode="echo", models=[SMALL])) as small_url,
+        serve_in_thread(MockProfile(mode="echo", models=[LARGE])) as large_url,
+    ):
+        pool = pool_from_config(NSSConfig(ollama_base_urls=f"{small_url}, {large_url}"))
+        assert pool is not None
+        client = OllamaClient(pool=pool)
+        await pool.start()
+        assert await client.health_check()
+        await client.generate("large", model=LARGE)
+        await client.generate("small", model=SMALL)
+        assert [b.served for b in pool.backends] == [1, 1]
+        await client.close()
+    assert pool_from_config(NSSConfig()) is None
@@ -0,0 +1,91 @@
+"""Tests for the Ollama circuit breaker."""
+
+import time
+
+import httpx
+import pytest
+
+from nss.llm.circuit_breaker import CircuitBreaker, CircuitOpenError
+from nss.llm.model_config import CLASSIFIER_PROFILE
+from nss.llm.ollama_client import OllamaClient
+from nss.metrics import nss_llm_circuit_open
+
+
+def test_opens_after_threshold_and_closes_after_trial() -> None:
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout_s=0.05)
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success()  # the count is of consecutive failures
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == "open"
+    assert nss_llm_circuit_open.value == 1
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    breaker.before_call()  # the trial
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one trial at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert nss_llm_circuit_open.value == 0
+
+
+def test_failed_trial_reopens() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert 0 < breaker.retry_after() <= 0.05
+
+
+async def test_client_fails_fast_once_open() -> None:
+    calls = []
+
+    def stall(request: httpx.Request) -> httpx.Response:
+        calls.append(request.extensions["timeout"]["read"])
+        raise httpx.ReadTimeout("stalled", request=request)
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_s=60)
+    client = OllamaClient(timeout=120, classifier_timeout=2.5, breaker=breaker)
+    client._client = httpx.AsyncClient(
+        base_url="http://ollama", transport=httpx.MockTransport(stall),
+    )
+    for _ in range(2):
+        with pytest.raises(httpx.ReadTimeout):
+            await client.generate("classify", profile=CLASSIFIER_PROFILE)
+    assert calls == [2.5, 2.5]
+
+    started = time.perf_counter()
+    with pytest.raises(CircuitOpenError):
+        await client.generate("answer")
+    assert time.perf_counter() - started < 0.05
+    assert len(calls) == 2
+    await client.close()
+
+
+async def test_server_errors_count_and_success_resets() -> None:
+    status = {"code": 500}
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status["code"], json={"response": "ok"})
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_s=60)
+    client = OllamaClient(breaker=breaker)
+    client._client = httpx.AsyncClient(
+        base_url="http://ollama", transport=httpx.MockTransport(respond),
+    )
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.generate("x")
+    status["code"] = 200
+    assert await client.generate("x") == "ok"
+    status["code"] = 500
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.generate("x")
+    assert breaker.state == "closed"
+    await client.close()
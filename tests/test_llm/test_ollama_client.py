@@ -4,7 +4,15 @@ from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
-from nss.llm.ollama_client import OllamaClient
+from nss.llm.model_config import (
+    CLASSIFIER_PROFILE,
+    CLASSIFIER_PROMPT_RESERVE,
+    GenerationProfile,
+    estimate_tokens,
+    fit_classifier_input,
+)
+from nss.llm.ollama_client import OllamaClient, parse_confidence_tag, parse_json_response
+from nss.metrics import nss_classifier_input_truncated
 
 
 class TestOllamaClient:
@@ -26,6 +34,39 @@ class TestOllamaClient:
         call_args = client._client.post.call_args
         assert call_args[0][0] == "/api/generate"
 
+    async def test_generate_without_profile_sends_no_options(self) -> None:
+        """Without a profile the payload must not carry options or format."""
+        client = OllamaClient()
+
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"response": "Hello"}
+        mock_response.raise_for_status = MagicMock()
+        client._client.post = AsyncMock(return_value=mock_response)
+
+        await client.generate(prompt="Say hello")
+
+        payload = client._client.post.call_args.kwargs["json"]
+        assert "options" not in payload
+        assert "format" not in payload
+        assert "keep_alive" not in payload
+
+    async def test_generate_with_classifier_profile(self) -> None:
+        """The classifier profile should set JSON mode and capped sampling options."""
+        client = OllamaClient()
+
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"response": "{}"}
+        mock_response.raise_for_status = MagicMock()
+        client._client.post = AsyncMock(return_value=mock_response)
+
+        await client.generate(prompt="Classify", profile=CLASSIFIER_PROFILE)
+
+        payload = client._client.post.call_args.kwargs["json"]
+        assert payload["format"] == "json"
+        assert payload["keep_alive"] == CLASSIFIER_PROFILE.keep_alive
+        assert payload["options"]["temperature"] == 0.0
+        assert payload["options"]["num_predict"] == CLASSIFIER_PROFILE.num_predict
+
     async def test_generate_with_confidence_tag(self) -> None:
         """generate_with_confidence() should extract [CONFIDENCE: X.X] tag."""
         client = OllamaClient()
@@ -82,3 +123,52 @@ class TestOllamaClient:
 
         await client.close()
         client._client.aclose.assert_awaited_once()
+
+
+class TestGenerationProfile:
+    """Tests for request-option profiles and strict JSON parsing."""
+
+    def test_options_omit_unset_fields(self) -> None:
+        profile = GenerationProfile(name="custom", num_predict=16)
+        assert profile.options() == {"num_predict": 16}
+
+    def test_classifier_context_fits_the_gateway_input_budget(self) -> None:
+        # ~3150 words (the PNC cap) of German prose at 3 characters per token.
+        text = " ".join("Bitte fasse den Bericht zum Quartal kurz zusammen".split() * 450)
+        assert CLASSIFIER_PROFILE.num_ctx is not None
+        assert estimate_tokens(text) > 2048
+        assert estimate_tokens(text) + CLASSIFIER_PROMPT_RESERVE <= CLASSIFIER_PROFILE.num_ctx
+        before = nss_classifier_input_truncated.labels(component="mars").value
+        assert fit_classifier_input(text, "mars") == text
+        assert nss_classifier_input_truncated.labels(component="mars").value == before
+
+    def test_oversized_classifier_input_is_truncated_and_counted(self) -> None:
+        before = nss_classifier_input_truncated.labels(component="mars").value
+        fitted = fit_classifier_input("x" * 100_000, "mars")
+        assert CLASSIFIER_PROFILE.num_ctx is not None
+        assert estimate_tokens(fitted) + CLASSIFIER_PROMPT_RESERVE <= CLASSIFIER_PROFILE.num_ctx
+        assert nss_classifier_input_truncated.labels(component="mars").value == before + 1
+
+    def test_parse_json_response_valid(self) -> None:
+        assert parse_json_response(' {"verdict": "SAFE"} ') == {"verdict": "SAFE"}
+
+    def test_parse_json_response_rejects_prose(self) -> None:
+        with pytest.raises(ValueError):
+            parse_json_response('Here you go: {"verdict": "SAFE"}')
+
+    def test_parse_json_response_rejects_array(self) -> None:
+        with pytest.raises(ValueError):
+            parse_json_response("[1, 2]")
+
+
+class TestParseConfidenceTag:
+    """Tests for confidence-tag extraction."""
+
+    def test_tag_and_preceding_whitespace_removed(self) -> None:
+        assert parse_confidence_tag("Wien.\n\n  [CONFIDENCE: 0.8]") == ("Wien.", 0.8)
+
+    def test_value_clamped(self) -> None:
+        assert parse_confidence_tag("x [CONFIDENCE: 3] y") == ("x y", 1.0)
+
+    def test_missing_tag_defaults(self) -> None:
+        assert parse_confidence_tag("  plain answer ") == ("plain answer", 0.5)
@@ -0,0 +1,171 @@
+"""Tests for the LLM scheduler (slots, lanes, fair queuing, timeouts)."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from nss.config import NSSConfig
+from nss.llm.model_config import CLASSIFIER_PROFILE
+from nss.llm.ollama_client import OllamaClient
+from nss.llm.scheduler import (
+    LLMContext,
+    LLMQueueTimeoutError,
+    LLMScheduler,
+    context_for,
+    lane_for,
+    parse_mapping,
+    reset_llm_context,
+    scheduler_from_config,
+    set_llm_context,
+)
+from nss.metrics import nss_llm_queue_timeouts
+
+
+async def _run_in_order(
+    scheduler: LLMScheduler, calls: list[tuple[str, str, str]],
+) -> list[str]:
+    """Hold the only slot, queue *calls* (name, lane, user), return grant order."""
+    order: list[str] = []
+    release = asyncio.Event()
+
+    async def call(name: str, lane: str, user: str) -> None:
+        async with scheduler.slot("m", lane=lane, user=user):
+            order.append(name)
+
+    async def blocker() -> None:
+        async with scheduler.slot("m"):
+            await release.wait()
+
+    holder = asyncio.create_task(blocker())
+    await asyncio.sleep(0)
+    tasks = []
+    for name, lane, user in calls:
+        tasks.append(asyncio.create_task(call(name, lane, user)))
+        await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(holder, *tasks)
+    return order
+
+
+async def test_concurrency_is_capped_per_model() -> None:
+    scheduler = LLMScheduler(default_concurrency=2, model_concurrency={"big": 1})
+    running = {"m": 0, "big": 0}
+    peak = {"m": 0, "big": 0}
+
+    async def call(model: str) -> None:
+        async with scheduler.slot(model):
+            running[model] += 1
+            peak[model] = max(peak[model], running[model])
+            await asyncio.sleep(0.01)
+            running[model] -= 1
+
+    await asyncio.gather(*(call("m") for _ in range(6)), *(call("big") for _ in range(3)))
+    assert peak == {"m": 2, "big": 1}
+    assert scheduler.stats()["m"] == {"active": 0, "queued": 0, "limit": 2}
+
+
+async def test_slots_scale_with_backend_replicas() -> None:
+    replicas = {"m": 3}
+    scheduler = LLMScheduler(default_concurrency=2, replicas=lambda model: replicas[model])
+    release = asyncio.Event()
+    running = 0
+
+    async def call() -> None:
+        nonlocal running
+        async with scheduler.slot("m"):
+            running += 1
+            await release.wait()
+
+    tasks = [asyncio.create_task(call()) for _ in range(8)]
+    await asyncio.sleep(0.01)
+    assert running == 6
+    replicas["m"] = 4  # a backend was readmitted; the next call picks it up
+    tasks.append(asyncio.create_task(call()))
+    await asyncio.sleep(0.01)
+    assert running == 8
+    assert scheduler.stats()["m"] == {"active": 8, "queued": 1, "limit": 8}
+    release.set()
+    await asyncio.gather(*tasks)
+
+
+async def test_classifier_lane_overtakes_generation() -> None:
+    order = await _run_in_order(
+        LLMScheduler(default_concurrency=1),
+        [("gen", "generation", "a"), ("batch", "batch", "a"), ("mars", "classifier", "b")],
+    )
+    assert order == ["mars", "gen", "batch"]
+
+
+async def test_fair_queuing_across_users() -> None:
+    burst = [(f"a{i}", "generation", "alice") for i in range(4)]
+    order = await _run_in_order(
+        LLMScheduler(default_concurrency=1), [*burst, ("b0", "generation", "bob")],
+    )
+    # Bob's single call is not stuck behind Alice's whole burst.
+    assert order.index("b0") == 1
+
+
+async def test_queue_timeout_raises_without_leaking_slots() -> None:
+    scheduler = LLMScheduler(default_concurrency=1, queue_timeout_s=0.05)
+    before = nss_llm_queue_timeouts.value
+    release = asyncio.Event()
+
+    async def blocker() -> None:
+        async with scheduler.slot("m"):
+            await release.wait()
+
+    holder = asyncio.create_task(blocker())
+    await asyncio.sleep(0)
+    with pytest.raises(LLMQueueTimeoutError) as info:
+        async with scheduler.slot("m", lane="generation"):
+            pass
+    assert info.value.lane == "generation"
+    assert nss_llm_queue_timeouts.value == before + 1
+
+    release.set()
+    await holder
+    async with scheduler.slot("m"):
+        assert scheduler.stats()["m"]["active"] == 1
+    assert scheduler.stats()["m"] == {"active": 0, "queued": 0, "limit": 1}
+
+
+def test_lane_and_context_mapping() -> None:
+    assert parse_mapping(" admin=interactive, ,3=batch") == {"admin": "interactive", "3": "batch"}
+    with pytest.raises(ValueError):
+        parse_mapping("admin")
+    assert lane_for("admin", 0, {"admin": "interactive"}, {"0": "batch"}) == "interactive"
+    assert lane_for("viewer", 0, {"admin": "interactive"}, {"0": "batch"}) == "batch"
+    assert lane_for("viewer", 1, {}, {"1": "nonsense"}) == "generation"
+
+    cfg = NSSConfig(llm_role_lanes="admin=interactive", llm_role_weights="admin=2")
+    assert context_for(cfg, "u1", "admin", 1) == LLMContext("u1", "interactive", 2.0)
+    assert scheduler_from_config(NSSConfig(llm_scheduler_enabled=False)) is None
+
+
+async def test_ollama_client_uses_profile_lane_and_request_context() -> None:
+    scheduler = LLMScheduler()
+    client = OllamaClient(scheduler=scheduler)
+    response = MagicMock()
+    response.json.return_value = {"response": "{}"}
+    client._client.post = AsyncMock(return_value=response)
+
+    seen = []
+    slot = scheduler.slot
+
+    def spy(model: str, **kwargs: object) -> object:
+        seen.append((model, kwargs["lane"], kwargs["user"]))
+        return slot(model, **kwargs)
+
+    scheduler.slot = spy  # type: ignore[method-assign]
+    token = set_llm_context(LLMContext(user="u1", lane="interactive"))
+    try:
+        await client.generate("Classify", profile=CLASSIFIER_PROFILE)
+        await client.generate("Answer", model="big")
+    finally:
+        reset_llm_context(token)
+    assert seen == [
+        ("mistral:7b-instruct-v0.3", "classifier", "u1"),
+        ("big", "interactive", "u1"),
+    ]
+    await client.close()
@@ -0,0 +1,45 @@
+"""Tests for the event-loop lag monitor."""
+
+import asyncio
+import time
+
+from nss.loop_monitor import LoopLagMonitor
+from nss.metrics import nss_event_loop_lag, nss_event_loop_stalls
+
+
+def _block_the_loop(seconds: float) -> None:
+    time.sleep(seconds)  # deliberately synchronous
+
+
+async def test_measures_lag_of_blocking_call() -> None:
+    monitor = LoopLagMonitor(interval_s=0.01, stall_threshold_ms=50)
+    stalls = nss_event_loop_stalls.value
+    monitor.start()
+    try:
+        await asyncio.sleep(0.03)
+        _block_the_loop(0.15)
+        await asyncio.sleep(0.03)
+    finally:
+        monitor.stop()
+    assert nss_event_loop_lag.snapshot()["max"] >= 100
+    assert nss_event_loop_stalls.value > stalls
+
+
+async def test_debug_watchdog_captures_blocking_stack() -> None:
+    monitor = LoopLagMonitor(interval_s=0.01, stall_threshold_ms=30, debug=True)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.03)
+        _block_the_loop(0.2)
+        await asyncio.sleep(0.03)
+    finally:
+        monitor.stop()
+    assert monitor.last_blocked_stack is not None
+    assert "_block_the_loop" in monitor.last_blocked_stack
+
+
+async def test_disabled_with_zero_interval() -> None:
+    monitor = LoopLagMonitor(interval_s=0)
+    monitor.start()
+    assert monitor._task is None
+    monitor.stop()
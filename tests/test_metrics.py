@@ -1,6 +1,18 @@
 """Tests for lightweight metrics registry."""
 
-from nss.metrics import Counter, Histogram, metrics_snapshot
+import pytest
+
+from nss.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    QuantileSketch,
+    merge_states,
+    metrics_snapshot,
+    nss_stage_latency,
+    parse_buckets,
+    prometheus_export,
+)
 
 
 def test_counter_increment() -> None:
@@ -12,6 +24,14 @@ def test_counter_increment() -> None:
     assert c.value == 6.0
 
 
+def test_gauge_set_inc_dec() -> None:
+    g = Gauge("test_gauge")
+    g.set(0.5)
+    g.inc(1.0)
+    g.dec(0.25)
+    assert g.value == 1.25
+
+
 def test_histogram_observe() -> None:
     h = Histogram("test_histogram")
     h.observe(10.0)
@@ -37,3 +57,110 @@ def test_metrics_snapshot_structure() -> None:
     assert "histograms" in snap
     assert "nss_requests_total" in snap["counters"]
     assert "nss_request_latency_ms" in snap["histograms"]
+    assert "gauges" in snap
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    h = Histogram("test_histogram", buckets=(10, 100))
+    for value in (5.0, 10.0, 50.0, 500.0):
+        h.observe(value)
+    assert h.cumulative_buckets() == [(10, 2), (100, 3), (float("inf"), 4)]
+
+
+def test_histogram_percentiles_within_relative_error() -> None:
+    h = Histogram("test_histogram")
+    for value in range(1, 1001):
+        h.observe(float(value))
+    snap = h.snapshot()
+    assert abs(snap["p50"] - 500) <= 500 * 0.02
+    assert abs(snap["p95"] - 950) <= 950 * 0.02
+    assert abs(snap["p99"] - 990) <= 990 * 0.02
+
+
+def test_quantile_sketch_merge_matches_combined_stream() -> None:
+    a, b, combined = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for value in range(1, 501):
+        a.add(float(value))
+        combined.add(float(value))
+    for value in range(501, 1001):
+        b.add(float(value))
+        combined.add(float(value))
+    a.merge(b)
+    assert a.count == 1000
+    assert a.quantile(0.95) == combined.quantile(0.95)
+
+
+def test_labelled_histogram_requires_labels() -> None:
+    h = Histogram("test_histogram", labelnames=("stage",))
+    with pytest.raises(ValueError):
+        h.observe(1.0)
+    with pytest.raises(ValueError):
+        h.labels(model="x")
+    h.labels(stage="pii").observe(1.0)
+    assert h.labels(stage="pii").count == 1
+    assert h.series()[0][0] == {"stage": "pii"}
+
+
+def test_histogram_time_context_manager() -> None:
+    h = Histogram("test_histogram")
+    with h.time():
+        pass
+    assert h.count == 1
+    assert h.snapshot()["max"] >= 0.0
+
+
+def test_set_buckets_rebuckets_existing_observations() -> None:
+    h = Histogram("test_histogram", buckets=(10,))
+    h.observe(5.0)
+    h.observe(50.0)
+    h.set_buckets((1, 100))
+    assert h.cumulative_buckets() == [(1, 0), (100, 2), (float("inf"), 2)]
+
+
+def test_parse_buckets() -> None:
+    assert parse_buckets("100, 10,50") == (10.0, 50.0, 100.0)
+    with pytest.raises(ValueError):
+        parse_buckets("")
+    with pytest.raises(ValueError):
+        parse_buckets("0,10")
+
+
+def test_prometheus_export_has_buckets_and_labels() -> None:
+    nss_stage_latency.labels(stage="pii").observe(3.0)
+    text = prometheus_export()
+    assert 'nss_request_latency_ms_bucket{le="+Inf"}' in text
+    assert 'nss_stage_latency_ms_bucket{stage="pii",le="5"}' in text
+    assert 'nss_stage_latency_ms_count{stage="pii"}' in text
+
+
+def test_metrics_snapshot_reports_labelled_percentiles() -> None:
+    nss_stage_latency.labels(stage="steer").observe(2.0)
+    histograms = metrics_snapshot()["histograms"]
+    assert "p95" in histograms['nss_stage_latency_ms{stage="steer"}']
+
+
+def test_merge_states_aggregates_gauges_by_mode() -> None:
+    def state(ratio: float, load: float) -> dict:
+        return {"metrics": [
+            Gauge("ratio", aggregate="mean").state() | {"value": ratio},
+            Gauge("load", aggregate="max").state() | {"value": load},
+        ]}
+
+    merged = {m.name: m.value for m in merge_states([state(0.2, 1.0), state(0.6, 5.0)])}
+    assert merged == {"ratio": pytest.approx(0.4), "load": 5.0}
+
+
+def test_labelled_counter_exports_and_merges_series() -> None:
+    c = Counter("test_misses", labelnames=("stage",))
+    c.labels(stage="redis").inc()
+    c.labels(stage="ollama").inc(2)
+    with pytest.raises(ValueError):
+        c.labels(model="x")
+    assert metrics_snapshot([c])["counters"] == {
+        'test_misses{stage="ollama"}': 2.0,
+        'test_misses{stage="redis"}': 1.0,
+    }
+    assert 'test_misses{stage="redis"} 1.0' in prometheus_export([c])
+
+    merged = merge_states([{"metrics": [c.state()]}, {"metrics": [c.state()]}])[0]
+    assert merged.labels(stage="ollama").value == 4.0
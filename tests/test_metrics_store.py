@@ -0,0 +1,100 @@
+"""Tests for cross-process metrics publishing and aggregation."""
+
+import json
+import time
+from unittest.mock import patch
+
+from nss.metrics import Counter, Histogram, export_state, nss_requests_total
+from nss.metrics_store import MetricsCollector, MetricsPublisher
+
+
+class _FakeRedisHash:
+    """Minimal async Redis stand-in supporting the hash commands used."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+
+    async def ping(self) -> bool:
+        return True
+
+    async def hset(self, key: str, field: str, value: str) -> None:
+        self.data[field] = value
+
+    async def hgetall(self, key: str) -> dict[str, str]:
+        return dict(self.data)
+
+    async def hdel(self, key: str, *fields: str) -> None:
+        for field in fields:
+            self.data.pop(field, None)
+
+    async def aclose(self) -> None:
+        pass
+
+
+def _state(requests: float, timestamp: float | None = None) -> str:
+    state = export_state()
+    state["timestamp"] = time.time() if timestamp is None else timestamp
+    for metric in state["metrics"]:
+        if metric["name"] == "nss_requests_total":
+            metric["value"] = requests
+    return json.dumps(state)
+
+
+async def test_publisher_writes_and_removes_entry() -> None:
+    fake = _FakeRedisHash()
+    with patch("nss.metrics_store._connect", return_value=fake):
+        publisher = MetricsPublisher("redis://test", "gateway", interval_s=60)
+        await publisher.start()
+        await publisher.publish()
+        (field,) = fake.data
+        assert field.startswith("gateway:")
+        assert json.loads(fake.data[field])["metrics"]
+        await publisher.stop()
+    assert fake.data == {}
+
+
+async def test_publisher_disabled_with_zero_interval() -> None:
+    with patch("nss.metrics_store._connect") as connect:
+        publisher = MetricsPublisher("redis://test", "gateway", interval_s=0)
+        await publisher.start()
+        await publisher.publish()
+    connect.assert_not_called()
+
+
+async def test_collector_sums_live_processes_and_drops_stale() -> None:
+    fake = _FakeRedisHash()
+    fake.data = {
+        "gateway:a:1": _state(3),
+        "gateway:a:2": _state(4),
+        "guardian:b:1": _state(100, timestamp=time.time() - 3600),
+    }
+    with patch("nss.metrics_store._connect", return_value=fake):
+        collector = MetricsCollector("redis://test", stale_after_s=30)
+        metrics = await collector.collect()
+    total = next(m for m in metrics if m.name == "nss_requests_total")
+    assert total.value == 3 + 4 + nss_requests_total.value
+    assert "guardian:b:1" not in fake.data
+
+
+async def test_collector_falls_back_to_local_registry() -> None:
+    with patch("nss.metrics_store._connect", side_effect=ConnectionError("down")) as connect:
+        collector = MetricsCollector("redis://test")
+        metrics = await collector.collect()
+        assert {m.name for m in metrics} >= {"nss_requests_total", "nss_request_latency_ms"}
+        # No reconnect attempt until the retry delay has passed.
+        await collector.collect()
+    assert connect.call_count == 1
+
+
+def test_histogram_state_round_trip() -> None:
+    h = Histogram("test_histogram", labelnames=("stage",))
+    h.labels(stage="pii").observe(4.0)
+    merged = Histogram("test_histogram", labelnames=("stage",))
+    state = h.state()
+    for _ in range(2):
+        for series in state["series"]:
+            merged.labels(stage=series["labels"][0]).merge_series(series, state["buckets"])
+    child = merged.labels(stage="pii")
+    assert child.count == 2
+    assert child.cumulative_buckets()[-1][1] == 2
+    assert isinstance(Counter("test_counter").state()["value"], float)
@@ -0,0 +1,73 @@
+"""Tests for the per-request stage timeline and Server-Timing header."""
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from nss.metrics import nss_stage_latency
+from nss.middleware import ServerTimingMiddleware, TracingMiddleware
+from nss.timing import current_timeline, end_timeline, stage, start_timeline
+
+
+def _make_app(enabled: bool = True) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware, enabled=enabled)
+    app.add_middleware(TracingMiddleware)
+
+    @app.get("/work")
+    async def work():
+        with stage("pii"):
+            pass
+        with stage("policy"):
+            pass
+        with stage("policy"):
+            pass
+        return {"ok": True}
+
+    return app
+
+
+def test_stage_records_on_timeline_and_histogram() -> None:
+    before = nss_stage_latency.labels(stage="steer").count
+    timeline, token = start_timeline()
+    try:
+        with stage("steer"):
+            pass
+    finally:
+        end_timeline(token)
+    assert [name for name, _, _ in timeline.stages] == ["steer"]
+    assert timeline.as_list()[0]["end_ms"] >= timeline.as_list()[0]["start_ms"]
+    assert nss_stage_latency.labels(stage="steer").count == before + 1
+    assert current_timeline() is None
+
+
+def test_stage_without_timeline_only_observes() -> None:
+    with stage("pnc"):
+        pass
+    assert current_timeline() is None
+
+
+def test_durations_sum_repeated_stages() -> None:
+    timeline, token = start_timeline()
+    end_timeline(token)
+    timeline.record("policy", 0.0, 0.001)
+    timeline.record("pii", 0.001, 0.002)
+    timeline.record("policy", 0.002, 0.004)
+    assert list(timeline.durations()) == ["policy", "pii"]
+    assert timeline.durations()["policy"] == 3.0
+
+
+async def test_server_timing_header() -> None:
+    async with AsyncClient(transport=ASGITransport(app=_make_app()), base_url="http://test") as c:
+        resp = await c.get("/work")
+    header = resp.headers["Server-Timing"]
+    names = [part.split(";")[0] for part in header.split(", ")]
+    assert names == ["pii", "policy", "total"]
+    assert "X-Trace-ID" in resp.headers
+
+
+async def test_server_timing_disabled() -> None:
+    app = _make_app(enabled=False)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        resp = await c.get("/work")
+    assert resp.status_code == 200
+    assert "Server-Timing" not in resp.headers